@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Multi-Algorithm Rush Hour Solver Test Interface
-Supports BFS, DFS, UCS, and A* search algorithms
+Supports BFS, DFS, UCS, A*, anytime A* (ARA*), bidirectional BFS, IDA*, distance-table and beam search algorithms
 """
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
@@ -10,7 +10,6 @@ import sys
 import os
 import time
 import threading
-import tracemalloc
 
 # Add parent directory to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,18 +18,33 @@ sys.path.insert(0, parent_dir)
 
 from utils.utils import import_map
 from utils.state import State
+from utils.solution_cache import SolutionCache
+from utils.search_stats import SearchStats
+from utils.results import is_incomplete
+from utils.timeline import PlaybackTimeline
+from utils.board import STANDARD_BOARD
 
 from solver.bfs_solver import bfs_solver
 from solver.dfs_solver import dfs_solver
 from solver.ucs_solver import ucs
 from solver.aStar_solver import aStar_solver
+from solver.anytime_astar import anytime_astar
+from solver.bidirectional_bfs import bidirectional_bfs
+from solver.ida_star_solver import ida_star_solver
+from solver.retrograde_solver import retrograde_solver
+from solver.beam_search import beam_search
+from solver.worker import SolverWorker
+from solver.portfolio import Portfolio, parse_guarantee
 
 class MultiAlgorithmTestGUI:
     
-    CELL_SIZE = 75  # tile size in pixels
+    CELL_SIZE = 75  # largest tile size in pixels
+    BOARD_PIXELS = 600  # canvas size the tiles of bigger boards are shrunk to fit
     NUM_OF_MAPS = 15 # total testing maps
+    FRAME_MS = 16  # animation frame interval (about 60 fps)
+    PLAY_SPEEDS = ["0.5", "1", "2", "4", "8", "16"]  # auto-play steps per second
     
-    def __init__(self, root):
+    def __init__(self, root, warm_up=False):
         self.root = root
         self.root.title("Rush Hour Multi-Algorithm Solver - Test Interface")
         self.root.geometry("1200x800")
@@ -39,9 +53,11 @@ class MultiAlgorithmTestGUI:
         self.current_state = None
         self.original_state = None
         self.solution_path = []
+        self.timeline = None  # PlaybackTimeline of solution_path
         self.current_step = 0
         self.is_running_test = False
         self.is_auto_playing = False
+        self._play_job = None  # pending root.after() of auto-play
         
         # Available algorithms
         self.algorithms = {}
@@ -53,12 +69,42 @@ class MultiAlgorithmTestGUI:
             self.algorithms['UCS'] = {'func': ucs, 'name': 'Uniform Cost Search'}
         if aStar_solver:
             self.algorithms['A*'] = {'func': aStar_solver, 'name': 'A* Search'}
+        if anytime_astar:
+            # Anytime: every improved path is shown while the search goes on
+            self.algorithms['ARA*'] = {'func': anytime_astar, 'name': 'Anytime A* (ARA*)', 'anytime': True}
+        if bidirectional_bfs:
+            self.algorithms['Bi-BFS'] = {'func': bidirectional_bfs, 'name': 'Bidirectional BFS'}
+        if ida_star_solver:
+            self.algorithms['IDA*'] = {'func': ida_star_solver, 'name': 'IDA* Search'}
+        if retrograde_solver:
+            self.algorithms['Table'] = {'func': retrograde_solver, 'name': 'Retrograde Distance Table'}
+        if beam_search:
+            self.algorithms['Beam'] = {'func': beam_search, 'name': 'Beam Search'}
         
         if not self.algorithms:
             messagebox.showerror("Error", "No solver algorithms found!")
             return
         
+        # Results are cached per (puzzle, algorithm, move mode), in memory and on disk
+        self.solution_cache = SolutionCache()
+        self.warm_up_cancel = threading.Event()
+        if warm_up:
+            self.start_warm_up()
+        
+        # Solver process used in "Process" mode; started on the first solve and reused
+        self.solver_worker = SolverWorker()
+        # One process per algorithm for "Race" mode, created on the first race
+        self.portfolio = None
+        
+        # Background tiles, and car sprites keyed by (id, length, orientation, cell size)
         self.image_refs = []
+        self.sprites = {}
+        self.cell_size = self.CELL_SIZE
+        self.drawn_board = None
+        # Canvas items of the vehicles on the board (see update_board_display)
+        self.drawn_layout = None
+        self.vehicle_tags = []
+        self.vehicle_origins = []
         
         # Colors for vehicles
         self.vehicle_colors = {
@@ -117,30 +163,45 @@ class MultiAlgorithmTestGUI:
                                      values=list(self.algorithms.keys()), width=10, state="readonly")
         self.algorithm_combo.grid(row=0, column=1, padx=(0, 10))
         
+        # Move mode selection: one cell per move or whole slides
+        ttk.Label(first_row, text="Moves:").grid(row=0, column=2, padx=(0, 5))
+        self.move_mode_var = tk.StringVar(value="Step")
+        self.move_mode_combo = ttk.Combobox(first_row, textvariable=self.move_mode_var,
+                                     values=["Step", "Slide"], width=6, state="readonly")
+        self.move_mode_combo.grid(row=0, column=3, padx=(0, 10))
+        
         # Map selection
-        ttk.Label(first_row, text="Map:").grid(row=0, column=2, padx=(0, 5))
+        ttk.Label(first_row, text="Map:").grid(row=0, column=4, padx=(0, 5))
         
         # Decrease button
         self.decrease_map_button = ttk.Button(first_row, text="←", width=2, command=self.decrease_map)
-        self.decrease_map_button.grid(row=0, column=3, padx=(0, 2))
+        self.decrease_map_button.grid(row=0, column=5, padx=(0, 2))
 
         # Map combobox
         self.map_var = tk.StringVar(value="")
         self.map_combo = ttk.Combobox(first_row, textvariable=self.map_var, values=[str(i) for i in range(1, self.NUM_OF_MAPS + 1)], width=5, state="readonly")
-        self.map_combo.grid(row=0, column=4, padx=(0, 2))
+        self.map_combo.grid(row=0, column=6, padx=(0, 2))
         self.map_combo.bind("<<ComboboxSelected>>", lambda e: self.load_map())
 
         # Increase button
         self.increase_map_button = ttk.Button(first_row, text="→", width=2, command=self.increase_map)
-        self.increase_map_button.grid(row=0, column=5, padx=(0, 10))
+        self.increase_map_button.grid(row=0, column=7, padx=(0, 10))
         
         # Test button
         self.test_button = ttk.Button(first_row, text="Solve Puzzle", command=self.test_map)
-        self.test_button.grid(row=0, column=6, padx=(0, 10))
+        self.test_button.grid(row=0, column=8, padx=(0, 10))
         
         # Clear results button
         self.clear_button = ttk.Button(first_row, text="Clear", command=self.clear_results)
-        self.clear_button.grid(row=0, column=7, padx=(0, 10))
+        self.clear_button.grid(row=0, column=9, padx=(0, 10))
+        
+        # Instrumentation options: per-phase timing and tracemalloc deep memory (slow)
+        self.phase_timing_var = tk.BooleanVar(value=False)
+        self.phase_timing_check = ttk.Checkbutton(first_row, text="Phase timing", variable=self.phase_timing_var)
+        self.phase_timing_check.grid(row=0, column=10, padx=(0, 5))
+        self.deep_memory_var = tk.BooleanVar(value=False)
+        self.deep_memory_check = ttk.Checkbutton(first_row, text="Deep memory", variable=self.deep_memory_var)
+        self.deep_memory_check.grid(row=0, column=11, padx=(0, 10))
         
         # Second row of controls - Interactive Solution Controls
         second_row = ttk.Frame(control_frame)
@@ -167,54 +228,48 @@ class MultiAlgorithmTestGUI:
         self.step_label = ttk.Label(second_row, text="Step: 0/0", font=('Arial', 10))
         self.step_label.grid(row=0, column=6, padx=(20, 0))
         
+        # Scrub bar: drag to jump to any step
+        self.scrub_var = tk.DoubleVar(value=0)
+        self.scrub_scale = ttk.Scale(second_row, from_=0, to=1, orient=tk.HORIZONTAL, length=200,
+                                     variable=self.scrub_var, command=self._on_scrub)
+        self.scrub_scale.grid(row=0, column=7, padx=(10, 0))
+        self.scrub_scale.state(['disabled'])
+        
+        # Auto-play speed
+        ttk.Label(second_row, text="Steps/s:").grid(row=0, column=8, padx=(10, 5))
+        self.speed_var = tk.StringVar(value="1")
+        self.speed_combo = ttk.Combobox(second_row, textvariable=self.speed_var,
+                                     values=self.PLAY_SPEEDS, width=4, state="readonly")
+        self.speed_combo.grid(row=0, column=9)
+        
+        # Third row - where the solver runs and its live progress
+        third_row = ttk.Frame(control_frame)
+        third_row.grid(row=2, column=0, sticky="ew", pady=(5, 0))
+        # Process: search in a worker process so the UI stays responsive and Cancel is immediate
+        # Race: run every algorithm at once and keep the first answer meeting the guarantee
+        ttk.Label(third_row, text="Run in:").grid(row=0, column=0, padx=(0, 5))
+        self.run_mode_var = tk.StringVar(value="Process")
+        self.run_mode_combo = ttk.Combobox(third_row, textvariable=self.run_mode_var,
+                                     values=["Process", "Thread", "Race"], width=8, state="readonly")
+        self.run_mode_combo.grid(row=0, column=1, padx=(0, 10))
+        ttk.Label(third_row, text="Guarantee:").grid(row=0, column=2, padx=(0, 5))
+        self.guarantee_var = tk.StringVar(value="any")
+        self.guarantee_combo = ttk.Combobox(third_row, textvariable=self.guarantee_var,
+                                     values=["any", "optimal:steps", "optimal:slides", "optimal:length"],
+                                     width=14, state="readonly")
+        self.guarantee_combo.grid(row=0, column=3, padx=(0, 20))
+        ttk.Label(third_row, text="Progress:").grid(row=0, column=4, padx=(0, 5))
+        self.progress_label = ttk.Label(third_row, text="-", font=('Arial', 10))
+        self.progress_label.grid(row=0, column=5, sticky="w")
+        
         # Left Panel - Game Board
         board_frame = ttk.LabelFrame(main_frame, text="Rush Hour Board", padding="10")
         board_frame.grid(row=1, column=0, sticky="nsew", padx=(0, 10))
         
-        # Game grid
-        self.canvas = tk.Canvas(board_frame, width=(6 + 2) * self.CELL_SIZE, height=(6 + 2) * self.CELL_SIZE)
+        # Game grid, sized for the classic board until a map says otherwise
+        self.canvas = tk.Canvas(board_frame)
         self.canvas.grid(row=0, column=0)
-        
-        ground = Image.open(os.path.join(current_dir,"images","ground.jpg")).resize((self.CELL_SIZE, self.CELL_SIZE))
-        ground = ImageTk.PhotoImage(ground)
-        self.image_refs.append(ground)
-        
-        road = Image.open(os.path.join(current_dir, "images","road.png")).resize((self.CELL_SIZE, self.CELL_SIZE))
-        road = ImageTk.PhotoImage(road)
-        self.image_refs.append(road)
-        
-        # Background
-        for i in range(8):
-            for j in range(8):
-                self.canvas.create_image(self.CELL_SIZE * i, self.CELL_SIZE * j, anchor="nw", image=ground)
-        
-        # Top
-        for i in range(1, 7):
-            self.canvas.create_image(self.CELL_SIZE * i, 0, anchor="nw", image=road)
-        
-        # Left
-        for i in range(8):
-            self.canvas.create_image(0, self.CELL_SIZE * i, anchor="nw", image=road)
-        self.canvas.create_image(0, self.CELL_SIZE * 3, anchor="nw", image=ground)
-        
-        # Right
-        for i in range(8):
-            self.canvas.create_image(self.CELL_SIZE * 7, self.CELL_SIZE * i, anchor="nw", image=road)
-        self.canvas.create_image(self.CELL_SIZE * 7, self.CELL_SIZE * 3, anchor="nw", image=ground)
-        
-        # Bottom
-        for i in range(1, 7):
-            self.canvas.create_image(self.CELL_SIZE * i, self.CELL_SIZE * 7, anchor="nw", image=road)
-        
-        # Enter indicator
-        enter_x = 0 * self.CELL_SIZE + self.CELL_SIZE // 2
-        enter_y = 3 * self.CELL_SIZE + self.CELL_SIZE // 2
-        self.canvas.create_text(enter_x, enter_y, text="→", font=('Arial', 24, 'bold'), fill='white', tags="static")
-        
-        # Exit indicator
-        exit_x = 7 * self.CELL_SIZE + self.CELL_SIZE // 2
-        exit_y = 3 * self.CELL_SIZE + self.CELL_SIZE // 2
-        self.canvas.create_text(exit_x, exit_y, text="→", font=('Arial', 24, 'bold'), fill='white', tags="static")
+        self._draw_background(STANDARD_BOARD)
         
         # Board info
         self.board_info_frame = ttk.Frame(board_frame)
@@ -255,52 +310,124 @@ class MultiAlgorithmTestGUI:
                 self.map_var.set(str(num - 1))
         self.load_map()
        
+    def _draw_background(self, board):
+        """Draw the ground, the surrounding road and the exit for ``board``; scales the cells to fit"""
+        self.drawn_board = board
+        cell = min(self.CELL_SIZE, self.BOARD_PIXELS // (max(board.rows, board.cols) + 2))
+        if cell != self.cell_size or not self.image_refs:
+            self.cell_size = cell
+            ground = Image.open(os.path.join(current_dir,"images","ground.jpg")).resize((cell, cell))
+            road = Image.open(os.path.join(current_dir, "images","road.png")).resize((cell, cell))
+            self.image_refs = [ImageTk.PhotoImage(ground), ImageTk.PhotoImage(road)]
+        ground, road = self.image_refs
+        
+        width, height = board.cols + 2, board.rows + 2
+        self.canvas.delete("static")
+        self.canvas.config(width=width * cell, height=height * cell)
+        
+        # Exit cell (on the exit edge) and entry cell (opposite edge) in canvas cells
+        line = board.exit_line + 1
+        exit_cell, entry_cell, arrow = {
+            'right': ((width - 1, line), (0, line), "→"),
+            'left': ((0, line), (width - 1, line), "←"),
+            'top': ((line, 0), (line, height - 1), "↑"),
+            'bottom': ((line, height - 1), (line, 0), "↓"),
+        }[board.exit_side]
+        
+        # Ground inside, road around the board except at the entry and the exit
+        for i in range(width):
+            for j in range(height):
+                on_border = i in (0, width - 1) or j in (0, height - 1)
+                image = road if on_border and (i, j) not in (exit_cell, entry_cell) else ground
+                self.canvas.create_image(cell * i, cell * j, anchor="nw", image=image, tags="static")
+        
+        # Enter and exit indicators
+        for i, j in (entry_cell, exit_cell):
+            self.canvas.create_text(i * cell + cell // 2, j * cell + cell // 2, text=arrow,
+                                    font=('Arial', max(10, cell // 3), 'bold'), fill='white', tags="static")
+        self.canvas.tag_lower("static")
+    
     def update_board_display(self, state):
         """Update the visual display of the board"""
         
-        # Clear previous vehicles
-        self.canvas.delete("vehicle") # có nhãn để dễ delete
-        
         if not state:
+            self._clear_vehicle_items()
             return
         
-        # Draw vehicles
-        for vehicle in state.vehicles:
-            color = self.vehicle_colors.get(vehicle.id, '#AAAAAA')
-            positions = vehicle.get_occupied_possitions()
-            if not positions:
-                continue
-
-            x0 = (positions[0][1] + 1) * self.CELL_SIZE
-            y0 = (positions[0][0] + 1) * self.CELL_SIZE
-
+        # Canvas items are created once per map; later states only move them
+        layout = state.layout
+        if layout.board != self.drawn_board:
+            self._draw_background(layout.board)
+        if layout is not self.drawn_layout:
+            self._create_vehicle_items(state)
+        
+        for index, pos in enumerate(state.positions):
+            x0, y0 = self._vehicle_origin(layout, index, pos)
+            old_x, old_y = self.vehicle_origins[index]
+            if x0 != old_x or y0 != old_y:
+                self.canvas.move(self.vehicle_tags[index], x0 - old_x, y0 - old_y)
+                self.vehicle_origins[index] = (x0, y0)
+    
+    def _vehicle_origin(self, layout, index, pos):
+        """Top-left pixel of vehicle ``index`` at position ``pos``"""
+        if layout.orientations[index] == 'H':
+            row, col = layout.lines[index], pos
+        else:
+            row, col = pos, layout.lines[index]
+        return (col + 1) * self.cell_size, (row + 1) * self.cell_size
+    
+    def _clear_vehicle_items(self):
+        self.canvas.delete("vehicle") # có nhãn để dễ delete
+        self.drawn_layout = None
+        self.vehicle_tags = []
+        self.vehicle_origins = []
+    
+    def _create_vehicle_items(self, state):
+        """Create the canvas items of every vehicle (one image, or rectangle plus label)"""
+        self._clear_vehicle_items()
+        layout = state.layout
+        for index, vehicle in enumerate(state.vehicles):
+            tag = f"vehicle:{vehicle.id}"
+            pos = vehicle.col if vehicle.orientation == 'H' else vehicle.row
+            x0, y0 = self._vehicle_origin(layout, index, pos)
+            
             img = self.get_resized_car_image(vehicle)
             if img:
-                self.canvas.create_image(x0, y0, anchor="nw", image=img, tags="vehicle")
-                self.image_refs.append(img) # Prevent garbage collection 
+                self.canvas.create_image(x0, y0, anchor="nw", image=img, tags=("vehicle", tag))
             else:
                 # fallback to rectangle if image missing
+                color = self.vehicle_colors.get(vehicle.id, '#AAAAAA')
                 if vehicle.orientation == 'H':
-                    x1 = x0 + vehicle.length * self.CELL_SIZE
-                    y1 = y0 + self.CELL_SIZE
+                    x1 = x0 + vehicle.length * self.cell_size
+                    y1 = y0 + self.cell_size
                 else:
-                    x1 = x0 + self.CELL_SIZE
-                    y1 = y0 + vehicle.length * self.CELL_SIZE
+                    x1 = x0 + self.cell_size
+                    y1 = y0 + vehicle.length * self.cell_size
                 
-                self.canvas.create_rectangle(x0, y0, x1, y1, fill=color, outline='black', tags="vehicle")
-                self.canvas.create_text((x0 + x1) // 2, (y0 + y1) // 2, text=vehicle.id, font=("Arial", 16, "bold"), tags="vehicle")
+                self.canvas.create_rectangle(x0, y0, x1, y1, fill=color, outline='black', tags=("vehicle", tag))
+                self.canvas.create_text((x0 + x1) // 2, (y0 + y1) // 2, text=vehicle.id, font=("Arial", max(8, self.cell_size // 5), "bold"), tags=("vehicle", tag))
+            
+            self.vehicle_tags.append(tag)
+            self.vehicle_origins.append((x0, y0))
+        self.drawn_layout = layout
                 
     def get_resized_car_image(self, vehicle): # lấy ảnh xe và cả resize
+        # Each sprite is decoded and resized once, then shared by every map and step
+        key = (vehicle.id, vehicle.length, vehicle.orientation, self.cell_size)
+        if key in self.sprites:
+            return self.sprites[key]
         path = os.path.join(current_dir,"images",f"{vehicle.id}_{vehicle.length}_{vehicle.orientation}.png")
         try:
             image = Image.open(path)
-            width = self.CELL_SIZE * vehicle.length if vehicle.orientation == 'H' else self.CELL_SIZE
-            height = self.CELL_SIZE * vehicle.length if vehicle.orientation == 'V' else self.CELL_SIZE
+            width = self.cell_size * vehicle.length if vehicle.orientation == 'H' else self.cell_size
+            height = self.cell_size * vehicle.length if vehicle.orientation == 'V' else self.cell_size
             image = image.resize((width, height))
-            return ImageTk.PhotoImage(image)
+            sprite = ImageTk.PhotoImage(image)
         except:
             print("Error loading image:", path)
-            return None
+            sprite = None
+        self.sprites[key] = sprite
+        return sprite
     
     def log_result(self, message):
         """Add a message to the results text area"""
@@ -316,6 +443,7 @@ class MultiAlgorithmTestGUI:
         self.current_state = self.original_state
         self.current_step = 0
         self.solution_path = []
+        self.timeline = None
         
         # Update GUI
         self.map_var.set("")
@@ -323,6 +451,16 @@ class MultiAlgorithmTestGUI:
         self.update_board_display(None)
         self._update_playback_controls()
         
+    def start_warm_up(self):
+        """Pre-solve every bundled map with every algorithm in the background"""
+        states = []
+        for map_id in range(1, self.NUM_OF_MAPS + 1):
+            vehicles = import_map(map_id)
+            if vehicles:
+                states.append(State(vehicles))
+        solvers = {name: info['func'] for name, info in self.algorithms.items()}
+        return self.solution_cache.warm_up(solvers, states, cancel_flag=self.warm_up_cancel)
+    
     def cancel_solving(self):
         self.cancel_flag.set()
         self.clear_button.config(text="Cancelling...")
@@ -374,6 +512,10 @@ class MultiAlgorithmTestGUI:
             initial_state = State(vehicles)
             self.current_state = initial_state
             self.original_state = initial_state
+            # Drop the previous solution; an anytime solver fills these in while it runs
+            self.solution_path = []
+            self.timeline = None
+            self.current_step = 0
             
             # Update GUI
             self.root.after(0, lambda: self.update_board_display(initial_state))
@@ -388,18 +530,38 @@ class MultiAlgorithmTestGUI:
             # Run solver
             self.log_result(f" Running {algorithm_info['name']} solver...")
             
-            tracemalloc.start()
-            start_time = time.time()
-            
-            result = algorithm_info['func'](initial_state, cancel_flag=self.cancel_flag)
-            end_time = time.time()
+            # Counters are always on; tracemalloc only when "Deep memory" is checked
+            stats = SearchStats(timed=self.phase_timing_var.get())
+            start_time = time.perf_counter()
             
-            _, peak = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
+            slide_moves = self.move_mode_var.get() == "Slide"
+            racing = self.run_mode_var.get() == "Race"
+            self.root.after(0, lambda: self.progress_label.config(text="running..."))
+            if racing:
+                race = self._race(initial_state, slide_moves)
+                result, cached = race.result, False
+                algorithm_name = race.winner or "Race"
+            else:
+                solver = algorithm_info['func']
+                if self.run_mode_var.get() == "Process":
+                    solver = self.solver_worker.bind(solver)
+                on_solution = None
+                if algorithm_info.get('anytime'):
+                    on_solution = lambda cost, path, bound: self._on_solution(initial_state, cost, path, bound)
+                result, cached = self.solution_cache.solve(solver, initial_state, algorithm_name,
+                                                           cancel_flag=self.cancel_flag, slide_moves=slide_moves,
+                                                           stats=stats, deep_memory=self.deep_memory_var.get(),
+                                                           progress=self._on_progress, on_solution=on_solution)
+            self.root.after(0, lambda: self.progress_label.config(
+                text="done (cached)" if cached else
+                f"done: {result[1] if result else stats.nodes_expanded} nodes expanded"))
+            end_time = time.perf_counter()
             solve_time = end_time - start_time
             
             if self.cancel_flag.is_set():
                 self.log_result(" SOLVING CANCELED!")
+                if self.timeline is not None:
+                    self.log_result(f"   Best path so far kept for playback ({len(self.solution_path)} steps)")
                 self.root.after(0, lambda: self.status_label.config(text=f"Map {map_id}: Solving canceled"))
                 return
             
@@ -408,21 +570,21 @@ class MultiAlgorithmTestGUI:
                 cost, nodes_expanded, path = result
                 steps = len(path)
                 
-                # Store solution for interactive playback
+                # Store solution for interactive playback; every step is precomputed once
+                self.timeline = PlaybackTimeline(initial_state, path)
                 self.solution_path = path
                 self.current_step = 0
                 
-                self.log_result(f" SOLUTION FOUND!")
+                self.log_result(f" SOLUTION FOUND!" + (" (cached)" if cached else ""))
                 self.log_result(f"   Cost: {cost}")
                 self.log_result(f"   Steps: {steps}")
                 self.log_result(f"   Time: {solve_time:.3f} seconds")
-                self.log_result(f"   Memory (peak): {peak / 1024:.2f} KB")
                 
                 if nodes_expanded is not None:
                     self.log_result(f"   Nodes expanded: {nodes_expanded}")
-                
-                # Create final state by applying all moves
-                final_state = self._apply_solution_to_state(initial_state, path)
+                if not cached and not racing:
+                    for line in stats.summary_lines():
+                        self.log_result(f"   {line}")
                 
                 self.root.after(0, lambda: self.status_label.config(text=f"Map {map_id}: SOLVED with {algorithm_name} (Cost: {cost})"))
                 
@@ -437,15 +599,29 @@ class MultiAlgorithmTestGUI:
                         if isinstance(move, tuple) and len(move) == 2:
                             vehicle_id, direction = move
                             self.log_result(f"   {i:2d}. Move '{vehicle_id}' {direction}")
+                        elif isinstance(move, tuple) and len(move) == 3:
+                            vehicle_id, direction, distance = move
+                            self.log_result(f"   {i:2d}. Move '{vehicle_id}' {direction} x{distance}")
                         else:
                             self.log_result(f"   {i:2d}. {move}")
                 else:
                     self.log_result(f"\n Solution path has {steps} steps (too long to display)")
                 
+            elif is_incomplete(result):
+                # The search gave up; that does not prove the puzzle unsolvable
+                self.log_result(f" NO PATH FOUND (search gave up, the puzzle may still be solvable)")
+                self.log_result(f"   Time: {solve_time:.3f} seconds")
+                if not racing:
+                    for line in stats.summary_lines():
+                        self.log_result(f"   {line}")
+                self.root.after(0, lambda: self.status_label.config(text=f"Map {map_id}: {algorithm_name} gave up"))
+                
             else:
-                self.log_result(f" NO SOLUTION FOUND")
+                self.log_result(f" NO SOLUTION FOUND" + (" (cached)" if cached else ""))
                 self.log_result(f"   Time: {solve_time:.3f} seconds")
-                self.log_result(f"   Memory (peak): {peak / 1024:.2f} KB")
+                if not cached and not racing:
+                    for line in stats.summary_lines():
+                        self.log_result(f"   {line}")
                 self.root.after(0, lambda: self.status_label.config(text=f"Map {map_id}: No solution with {algorithm_name}"))
             
         except Exception as e:
@@ -456,6 +632,53 @@ class MultiAlgorithmTestGUI:
             self.log_result(f"{'='*60}")
             self.root.after(0, self._test_complete)
     
+    def _race(self, initial_state, slide_moves):
+        """Race every algorithm in its own process and log how each one did"""
+        if self.portfolio is None:
+            self.portfolio = Portfolio({name: info['func'] for name, info in self.algorithms.items()})
+        guarantee = self.guarantee_var.get()
+        entrants = self.portfolio.entrants(parse_guarantee(guarantee), slide_moves)
+        self.log_result(f" Racing {', '.join(entrants)} (guarantee: {guarantee})")
+        race = self.portfolio.race(initial_state, guarantee, slide_moves, self.cancel_flag, self._on_progress)
+        for name, (status, seconds) in race.outcomes.items():
+            self.log_result(f"   {name}: {status} after {seconds:.3f}s")
+        if race.winner is not None:
+            self.log_result(f" Winner: {race.winner}")
+        return race
+    
+    def _on_solution(self, initial_state, cost, path, bound):
+        """Improved path from an anytime solver, called from the solver thread"""
+        bound_text = "bound not proven yet" if bound == float('inf') else f"within {bound:.3f}x of optimal"
+        self.log_result(f"   Improved path: cost {cost}, {len(path)} steps ({bound_text})")
+        self.root.after(0, self._show_solution, initial_state, cost, path, bound_text)
+    
+    def _show_solution(self, initial_state, cost, path, bound_text):
+        """Make the current best path of a running search the one played back"""
+        if not self.is_running_test or self.original_state is not initial_state:
+            return
+        self.timeline = PlaybackTimeline(initial_state, path)
+        self.solution_path = path
+        self.current_step = 0
+        self._apply_solution_up_to_step()
+        self._update_step_display()
+        self.status_label.config(text=f"Best so far: cost {cost} ({bound_text}), refining...")
+    
+    def _on_progress(self, event):
+        """Progress callback, called from the solver thread"""
+        self.root.after(0, self._show_progress, event)
+    
+    def _show_progress(self, event):
+        parts = [f"{event.elapsed:.1f}s", f"expanded {event.nodes_expanded}"]
+        if event.frontier is not None:
+            parts.append(f"frontier {event.frontier}")
+        if event.depth is not None:
+            parts.append(f"depth {event.depth}")
+        if event.bound is not None:
+            parts.append(f"f {event.bound}")
+        if event.best_g is not None:
+            parts.append(f"best g {event.best_g}")
+        self.progress_label.config(text="  |  ".join(parts))
+    
     def _test_complete(self):
         """Called when testing is complete"""
         self.is_running_test = False
@@ -479,6 +702,7 @@ class MultiAlgorithmTestGUI:
             self.current_state = initial_state
             self.original_state = initial_state
             self.solution_path = []
+            self.timeline = None
             self.current_step = 0
             
             # Update display
@@ -501,36 +725,37 @@ class MultiAlgorithmTestGUI:
     def reset_to_start(self):
         """Reset to the original state"""
         if self.original_state:
-            self.current_state = self.original_state
-            self.current_step = 0
-            self.update_board_display(self.current_state)
-            self._update_step_display()
-            self._update_playback_controls()
+            self._seek(0)
             self.status_label.config(text="Reset to start")
     
     def previous_step(self):
         """Go to the previous step in the solution"""
         if self.solution_path and self.current_step > 0:
-            self.current_step -= 1
-            self._apply_solution_up_to_step()
-            self._update_step_display()
-            self._update_playback_controls()
+            self._seek(self.current_step - 1)
     
     def next_step(self):
         """Go to the next step in the solution"""
         if self.solution_path and self.current_step < len(self.solution_path):
-            self.current_step += 1
-            self._apply_solution_up_to_step()
-            self._update_step_display()
-            self._update_playback_controls()
+            self._seek(self.current_step + 1)
     
     def go_to_end(self):
         """Jump to the final state"""
         if self.solution_path:
-            self.current_step = len(self.solution_path)
-            self._apply_solution_up_to_step()
-            self._update_step_display()
-            self._update_playback_controls()
+            self._seek(len(self.solution_path))
+    
+    def _seek(self, step):
+        """Show the board after ``step`` moves"""
+        self.current_step = step
+        self._apply_solution_up_to_step()
+        self._update_step_display()
+        self._update_playback_controls()
+    
+    def _on_scrub(self, value):
+        """Scrub bar moved"""
+        step = int(round(float(value)))
+        if self.timeline is None or self.is_auto_playing or step == self.current_step:
+            return
+        self._seek(step)
     
     def auto_play(self):
         """Auto-play through the solution"""
@@ -549,67 +774,71 @@ class MultiAlgorithmTestGUI:
     def pause_auto_play(self):
         """Pause auto-play"""
         self.is_auto_playing = False
+        if self._play_job is not None:
+            self.root.after_cancel(self._play_job)
+            self._play_job = None
+        # Drop a half-finished animation
+        self._apply_solution_up_to_step()
         self._update_playback_controls()
         
         self.play_button.config(text="▶ Play", command=self.auto_play)
     
     def _auto_play_step(self):
-        """Execute one step of auto-play"""
+        """Animate the next move of auto-play"""
+        self._play_job = None
         if not self.is_auto_playing or self.current_step >= len(self.solution_path):
             self.pause_auto_play()
             return
         
-        self.next_step()
-        self.root.after(1000, self._auto_play_step)  # 1 second delay
+        step_time = 1.0 / float(self.speed_var.get())
+        # The car slides for most of the step and rests for the remainder
+        move_time = min(0.8 * step_time, 0.5)
+        index, _ = self.timeline.moves[self.current_step]
+        layout = self.timeline.layout
+        start = self.vehicle_origins[index]
+        end = self._vehicle_origin(layout, index, self.timeline.position(self.current_step + 1, index))
+        self._animate_move(index, start, end, time.perf_counter(), move_time, step_time)
     
-    def _apply_solution_up_to_step(self):
-        """Apply solution moves up to the current step"""
-        if not self.solution_path or not self.original_state:
+    def _animate_move(self, index, start, end, start_time, move_time, step_time):
+        """Draw one frame of the moving car; positions follow the clock, not the frame count"""
+        self._play_job = None
+        if not self.is_auto_playing:
             return
         
-        current_state = self.original_state
-        
-        for i in range(self.current_step):
-            if i < len(self.solution_path):
-                vehicle_id, direction = self.solution_path[i]
-                current_state = self._apply_move(current_state, vehicle_id, direction)
+        elapsed = time.perf_counter() - start_time
+        t = min(1.0, elapsed / move_time) if move_time > 0 else 1.0
+        x = round(start[0] + (end[0] - start[0]) * t)
+        y = round(start[1] + (end[1] - start[1]) * t)
+        old_x, old_y = self.vehicle_origins[index]
+        if x != old_x or y != old_y:
+            self.canvas.move(self.vehicle_tags[index], x - old_x, y - old_y)
+            self.vehicle_origins[index] = (x, y)
+        
+        if t < 1.0:
+            self._play_job = self.root.after(self.FRAME_MS, self._animate_move, index, start, end,
+                                             start_time, move_time, step_time)
+            return
         
-        self.current_state = current_state
-        self.update_board_display(current_state)
+        self.current_step += 1
+        self._apply_solution_up_to_step()
+        self._update_step_display()
+        rest = max(0.0, step_time - (time.perf_counter() - start_time))
+        self._play_job = self.root.after(int(rest * 1000), self._auto_play_step)
     
-    def _apply_move(self, state, vehicle_id, direction):
-        """Apply a single move to a state and return the new state"""
-        new_vehicles = []
-        for vehicle in state.vehicles:
-            if vehicle.id == vehicle_id:
-                new_vehicle = vehicle.copy()
-                if direction in ['up', 'UP']:
-                    new_vehicle.row -= 1
-                elif direction in ['down', 'DOWN']:
-                    new_vehicle.row += 1
-                elif direction in ['left', 'LEFT']:
-                    new_vehicle.col -= 1
-                elif direction in ['right', 'RIGHT']:
-                    new_vehicle.col += 1
-                new_vehicles.append(new_vehicle)
-            else:
-                new_vehicles.append(vehicle)
+    def _apply_solution_up_to_step(self):
+        """Show the precomputed state of the current step"""
+        if self.timeline is None or not self.original_state:
+            return
         
-        return State(new_vehicles)
-    
-    def _apply_solution_to_state(self, initial_state, path):
-        """Apply a solution path to get the final state"""
-        current_state = initial_state
-        for move in path:
-            if isinstance(move, tuple) and len(move) == 2:
-                vehicle_id, direction = move
-                current_state = self._apply_move(current_state, vehicle_id, direction)
-        return current_state
+        self.current_state = self.timeline.state_at(self.current_step)
+        self.update_board_display(self.current_state)
     
     def _update_step_display(self):
         """Update the step display label"""
         total_steps = len(self.solution_path)
         self.step_label.config(text=f"Step: {self.current_step}/{total_steps}")
+        self.scrub_scale.config(to=max(total_steps, 1))
+        self.scrub_var.set(self.current_step)
     
     def _update_playback_controls(self):
         """Update the state of playback controls"""
@@ -621,6 +850,11 @@ class MultiAlgorithmTestGUI:
         # Enable/disable buttons based on state
         if self.is_running_test or self.is_auto_playing:
             self.algorithm_combo.config(state='disabled')
+            self.move_mode_combo.config(state='disabled')
+            self.run_mode_combo.config(state='disabled')
+            self.guarantee_combo.config(state='disabled')
+            self.phase_timing_check.config(state=tk.DISABLED)
+            self.deep_memory_check.config(state=tk.DISABLED)
             self.increase_map_button.config(state=tk.DISABLED)
             self.map_combo.config(state='disabled')
             self.decrease_map_button.config(state=tk.DISABLED)
@@ -631,9 +865,15 @@ class MultiAlgorithmTestGUI:
             self.play_button.config(state=tk.DISABLED if self.is_running_test else tk.NORMAL)
             self.next_button.config(state=tk.DISABLED)
             self.end_button.config(state=tk.DISABLED)
+            self.scrub_scale.state(['disabled'])
             
         else:
             self.algorithm_combo.config(state='readonly')
+            self.move_mode_combo.config(state='readonly')
+            self.run_mode_combo.config(state='readonly')
+            self.guarantee_combo.config(state='readonly')
+            self.phase_timing_check.config(state=tk.NORMAL)
+            self.deep_memory_check.config(state=tk.NORMAL)
             self.increase_map_button.config(state=tk.NORMAL if current_map < self.NUM_OF_MAPS else tk.DISABLED)
             self.map_combo.config(state='readonly')
             self.decrease_map_button.config(state=tk.NORMAL if current_map > 1 else tk.DISABLED)
@@ -644,3 +884,4 @@ class MultiAlgorithmTestGUI:
             self.play_button.config(state=tk.NORMAL if has_solution and not at_end else tk.DISABLED)
             self.next_button.config(state=tk.NORMAL if has_solution and not at_end else tk.DISABLED)
             self.end_button.config(state=tk.NORMAL if has_solution and not at_end else tk.DISABLED)
+            self.scrub_scale.state(['!disabled' if has_solution else 'disabled'])
@@ -1,9 +1,11 @@
 from gui.interface import MultiAlgorithmTestGUI
 import tkinter as tk
+import sys
 
 def main():
     root = tk.Tk() # môt TK object đại diện cho cửa sổ chính của ứng dụng
-    MultiAlgorithmTestGUI(root)
+    # --warm-up: giải trước tất cả map trong nền để lần bấm "Solve" đầu tiên lấy từ cache
+    MultiAlgorithmTestGUI(root, warm_up='--warm-up' in sys.argv[1:])
     root.mainloop()
   
 if __name__ == "__main__":
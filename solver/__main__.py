@@ -0,0 +1,46 @@
+"""
+Command line entry point: ``python -m solver <command> ...``
+
+Commands:
+    batch     solve map files with a process pool, one JSON line per result
+    bench     benchmark solvers (``run``) and compare baselines (``compare``)
+    race      solve one map with several solvers at once, keep the first answer
+    generate  search random layouts for hard puzzles and write them as map files
+    pack      compile maps or puzzle databases into one binary pack
+"""
+
+import argparse
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solver import batch, bench, generator, portfolio
+from utils import puzzle_pack
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m solver', description="Rush Hour solver tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    batch.add_arguments(commands.add_parser('batch', help="solve many maps in parallel (JSONL output)"))
+    bench.add_arguments(commands.add_parser('bench', help="benchmark solvers against a JSON baseline"))
+    portfolio.add_arguments(commands.add_parser('race', help="race solvers on one map (JSON output)"))
+    generator.add_arguments(commands.add_parser('generate', help="generate hard puzzles by retrograde search"))
+    puzzle_pack.add_arguments(commands.add_parser('pack', help="compile puzzles into a binary pack"))
+
+    args = parser.parse_args(argv)
+    if args.command == 'batch':
+        return batch.main(args)
+    if args.command == 'bench':
+        return bench.main(args)
+    if args.command == 'race':
+        return portfolio.main(args)
+    if args.command == 'generate':
+        return generator.main(args)
+    if args.command == 'pack':
+        return puzzle_pack.main(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,3 @@
-import heapq
 import sys
 import os
 
@@ -6,6 +5,13 @@ import os
 project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_dir)
 
+from utils.moves import move_cost
+from utils.node_store import NodeStore
+from utils.open_list import make_open_list
+from utils.search_stats import clock
+from utils.progress import make_reporter
+from solver.heuristics import HEURISTICS, get_heuristic, update_heuristic
+
 # from utils.state import State
 # from utils.vehicle import Vehicle
 # from utils.utils import import_map
@@ -92,98 +98,109 @@ sys.path.append(project_dir)
 #         print(" ".join(row))
 #     print()
 
-# Lớp PriorityQueue đã sửa
-class PriorityQueue:
-    def __init__(self):
-        self._queue = []
-        self._index = 0
-
-    def put(self, item, priority):
-        heapq.heappush(self._queue, (priority, self._index, item))  # Sử dụng priority trực tiếp
-        self._index += 1
-
-    def get(self):
-        if self.is_empty():
-            raise IndexError("Cannot get from an empty priority queue.")
-        return heapq.heappop(self._queue)[2]
-
-    def is_empty(self):
-        return len(self._queue) == 0
-
-    def size(self):
-        return len(self._queue)
-
-def heuristic(state):
-    heu = 0
-    # tính tổng số ô mà xe mục tiêu chưa đi
-    target_vehicle = state.vehicles[0]
-    if target_vehicle:
-        target_row, target_col = target_vehicle.row, target_vehicle.col
-        target_length = target_vehicle.length
-        
-        # Tính số ô mà xe mục tiêu chưa đi
-        if target_vehicle.orientation == "H":
-            for i in range(target_col + target_length, 6):
-                if state.board[target_row][i] != "X":
-                    heu += target_vehicle.length  # Chiều dài của xe mục tiêu
-      # Chiều dài của xe mục tiêu
-    
-    # Tính chiều dài của những chiếc xe nằm chắn đường xe mục tiêu
-    nameOfVehicleList = []
-    for i in range(min(5, target_col + 2),5,1):
-        if state.board[target_row][i] != "X" and state.board[target_row][i]!= ".":
-            nameOfVehicleList.append(state.board[target_row][i])
-
-    for vehicle in state.vehicles:
-        if vehicle.id in nameOfVehicleList:
-            heu += vehicle.length
-            
-    return heu
-    
+def heuristic(state, cost_model='length', name='blockers'):
+    # Heuristic của một State, dùng các hàm trong solver/heuristics.py
+    h_func = get_heuristic(name)
+    return h_func(state.layout, state.positions, state.occupancy, cost_model)
+
 
 # Thuật toán A*
-def aStar_solver(initial_state, cancel_flag=None):
-    queue = PriorityQueue()
+def aStar_solver(initial_state, cancel_flag=None, slide_moves=False, cost_model='length',
+                 heuristic='blockers', stats=None, progress=None):
+    # heuristic: tên trong HEURISTICS ('zero', 'blocking', 'blockers') hoặc một hàm
+    h_func = get_heuristic(heuristic)
+    # Heuristic có sẵn trả về số nguyên nên f = g + h dùng được hàng đợi bucket;
+    # hàm tự viết có thể trả về số thực nên dùng heap.
+    open_list = make_open_list(h_func in HEURISTICS.values())
     
-    # B: Cache initial state string
-    queue.put((initial_state, []), heuristic(initial_state))
-    visited = set()
+    layout = initial_state.layout
+    nodes = NodeStore(layout, slide_moves)  # path lưu bằng con trỏ cha
+    h_start = h_func(layout, initial_state.positions, initial_state.occupancy, cost_model)
+    # open_list.best_g: g tốt nhất đã biết của mỗi state. Heuristic chỉ chấp nhận
+    # được (chưa chắc nhất quán) nên một state có thể được mở lại khi tìm thấy
+    # đường rẻ hơn; push với g không tốt hơn bị từ chối ngay.
+    best_g = open_list.best_g
     nodes_expanded = 0
+    if h_start != float('inf'):  # inf: ngay state đầu đã là ngõ cụt
+        open_list.push(initial_state.key, h_start, 0, (initial_state, NodeStore.ROOT, h_start))
+    
+    # Bộ đếm thống kê (stats), chỉ đo thời gian từng pha khi stats.timed
+    generated = duplicates = peak_frontier = 0
+    timed = stats is not None and stats.timed
+    reporter = make_reporter(progress, 'A*')
+    best_settled = 0  # g lớn nhất đã mở rộng
+    
+    def report():
+        if stats is not None:
+            stats.update(generated, nodes_expanded, duplicates, peak_frontier, len(best_g))
+            stats.estimate_state_bytes(best_g, initial_state.key, nodes.bytes_per_node,
+                                       [initial_state.key, 0, (initial_state, NodeStore.ROOT, 0)])
     
-    while not queue.is_empty():
+    while open_list:
         if cancel_flag and cancel_flag.is_set():
+            report()
             return None
         
-        state, path = queue.get()
-        
-        # B: Cache state string - tính 1 lần duy nhất
-        state_key = state.to_string()
-        if state_key in visited:
-            continue
+        if len(open_list) > peak_frontier:
+            peak_frontier = len(open_list)
+        if timed:
+            t = clock()
+        entry = open_list.pop()
+        if timed:
+            stats.add_time('queue', clock() - t)
+        if entry is None:
+            break  # chỉ còn mục cũ trong heap
+        f_cost, _, g_cost, (state, node, h_cost) = entry
 
-        visited.add(state_key)  # Sử dụng cached string
         nodes_expanded += 1
+        if g_cost > best_settled:
+            best_settled = g_cost
+        if reporter is not None and reporter.due(nodes_expanded):
+            reporter.report(nodes_expanded, len(open_list), nodes.depth(node), f_cost, best_settled)
         
         if state.is_solved():
-            cost = 0
-            for vehicle_id, _ in path:
-                cost += state.get_vehicle_by_id(vehicle_id).length
-
-            return cost, nodes_expanded, path
+            report()
+            return g_cost, nodes_expanded, nodes.path(node)
         
-        possible_moves = state.get_all_possible_moves()
-        for vehicle_id, direction in possible_moves:
-            new_state = state.move_vehicle(vehicle_id, direction)
+        if timed:
+            t = clock()
+        possible_moves = state.get_moves(slide_moves)
+        if timed:
+            stats.add_time('movegen', clock() - t)
+        for index, delta in possible_moves:
+            new_g_cost = g_cost + move_cost(layout, index, delta, cost_model)  # Chi phí g theo cost model
+            new_state = state.apply_move(index, delta)
+            generated += 1
             
-            # B: Cache new state string - tính 1 lần duy nhất
-            new_state_key = new_state.to_string()
-            if new_state_key not in visited:
-                new_path = path + [(vehicle_id, direction)]
-                g_cost = len(new_path)* 2  # Chi phí g là số bước đã đi nhân với 2
-                h_cost = heuristic(new_state)
-                f_cost = g_cost + h_cost
-                queue.put((new_state, new_path), f_cost)
+            if timed:
+                t = clock()
+            new_state_key = new_state.key
+            old_g = best_g.get(new_state_key)
+            if timed:
+                stats.add_time('hashing', clock() - t)
+            if old_g is not None and old_g <= new_g_cost:
+                duplicates += 1
+                continue
+
+            # Chỉ tính lại h khi xe vừa đi có thể ảnh hưởng tới nó
+            if timed:
+                t = clock()
+            new_h_cost = update_heuristic(h_func, layout, new_state.positions, new_state.occupancy,
+                                          cost_model, h_cost, index)
+            if timed:
+                stats.add_time('heuristic', clock() - t)
+            if new_h_cost == float('inf'):
+                continue  # ngõ cụt: có xe chắn không bao giờ rời được hàng đích
+            if timed:
+                t = clock()
+            # Đã kiểm tra best_g ở trên nên push luôn được nhận; nếu state đang
+            # trong hàng đợi thì mục cũ được thay (decrease-key)
+            open_list.push(new_state_key, new_g_cost + new_h_cost, new_g_cost,
+                           (new_state, nodes.add(node, index, delta), new_h_cost))
+            if timed:
+                stats.add_time('queue', clock() - t)
                 
+    report()
     return None, nodes_expanded, []
 
 
@@ -0,0 +1,181 @@
+"""
+Anytime weighted A* (ARA*): a solution fast, then better ones.
+
+The search runs A* with f = g + w * h for a decreasing series of weights
+``w``. A large weight follows the heuristic greedily and finds a first path
+within a few hundred expansions; each later pass reuses the g values and
+open list of the previous one, so lowering the weight only costs the work
+needed to improve the path. The last weight is 1, after which the path is
+optimal for the cost model.
+
+After every pass the incumbent path is at most ``bound`` times the optimal
+cost, with ``bound = min(w, cost / min(g + h over the open states))``; a
+bound of 1.0 proves the path optimal and ends the search.
+``on_solution(cost, path, bound)`` is called as soon as a cheaper path is
+found (with ``bound`` inf: the pass has not proven anything yet) and again
+whenever a pass tightens the bound, so a caller can use the current best
+path while the search goes on. ``time_limit`` stops the search after that many seconds and returns the
+best path found so far.
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.moves import move_cost
+from utils.node_store import NodeStore
+from utils.open_list import HeapOpenList
+from utils.search_stats import clock
+from utils.progress import make_reporter, CHECK_EVERY
+from solver.heuristics import get_heuristic, update_heuristic
+
+# Heuristic weights of the successive passes; the last one must be 1
+DEFAULT_WEIGHTS = (10, 5, 3, 2, 1.5, 1.25, 1)
+
+INF = float('inf')
+
+
+def anytime_astar(initial_state, cancel_flag=None, slide_moves=False, cost_model='length',
+                  heuristic='blockers', weights=DEFAULT_WEIGHTS, time_limit=None,
+                  on_solution=None, stats=None, progress=None):
+    """ARA* search; returns ``(cost, nodes_expanded, path)`` of the best path found.
+
+    Returns None when cancelled, or when ``time_limit`` passed before any
+    path was found. ``(None, nodes_expanded, [])`` means no solution exists.
+    """
+    h_func = get_heuristic(heuristic)
+    layout = initial_state.layout
+    nodes = NodeStore(layout, slide_moves)
+    deadline = None if time_limit is None else clock() + time_limit
+    reporter = make_reporter(progress, 'ARA*')
+    generated = duplicates = peak_frontier = nodes_expanded = 0
+
+    g_values = {initial_state.key: 0}  # g tốt nhất đã biết của mọi state đã gặp
+    best_cost, best_node = INF, None
+    bound = INF
+    published = (INF, INF)              # (cost, bound) gửi cho on_solution lần cuối
+
+    def publish(cost, bound):
+        nonlocal published
+        if (cost, bound) < published:
+            published = (cost, bound)
+            if on_solution is not None:
+                on_solution(cost, nodes.path(best_node), bound)
+
+    def report():
+        if stats is not None:
+            stats.update(generated, nodes_expanded, duplicates, peak_frontier, len(g_values))
+            stats.estimate_state_bytes(g_values, initial_state.key, nodes.bytes_per_node,
+                                       (0, 0, initial_state.key, 0, (initial_state, NodeStore.ROOT, 0)))
+
+    def result():
+        report()
+        if best_node is None:
+            return None
+        return best_cost, nodes_expanded, nodes.path(best_node)
+
+    if initial_state.is_solved():
+        return 0, 0, []
+    h_start = h_func(layout, initial_state.positions, initial_state.occupancy, cost_model)
+    if h_start == INF:
+        report()
+        return None, 0, []
+
+    # Các state chờ đưa vào hàng đợi của lượt kế tiếp: key -> (g, (state, node, h))
+    pending = {initial_state.key: (0, (initial_state, NodeStore.ROOT, h_start))}
+    weights = list(weights)
+    if not weights or weights[-1] != 1:
+        weights.append(1)
+
+    for weight in weights:
+        if weight >= bound:
+            continue  # đường hiện tại đã tốt hơn mức w này đảm bảo
+        # Lượt mới: xếp lại mọi state còn mở (và state "không nhất quán") theo w mới
+        open_list = HeapOpenList()
+        for key, (g, item) in pending.items():
+            open_list.push(key, g + weight * item[2], g, item)
+        pending = {}   # giờ chỉ chứa state đã đóng trong lượt này mà g giảm (INCONS)
+        closed = set()
+
+        while open_list:
+            if cancel_flag and cancel_flag.is_set():
+                report()
+                return None
+            if not nodes_expanded & (CHECK_EVERY - 1) and deadline is not None and clock() > deadline:
+                return result()
+            if len(open_list) > peak_frontier:
+                peak_frontier = len(open_list)
+
+            entry = open_list.pop()
+            if entry is None:
+                break
+            f_cost, key, g_cost, item = entry
+            if f_cost >= best_cost:
+                # Không state nào còn lại có thể cải thiện đường đi ở trọng số này
+                pending[key] = (g_cost, item)
+                break
+            state, node, h_cost = item
+            closed.add(key)
+            nodes_expanded += 1
+            if reporter is not None and reporter.due(nodes_expanded):
+                reporter.report(nodes_expanded, len(open_list), nodes.depth(node), f_cost,
+                                None if best_cost == INF else best_cost)
+
+            for index, delta in state.get_moves(slide_moves):
+                new_g = g_cost + move_cost(layout, index, delta, cost_model)
+                new_state = state.apply_move(index, delta)
+                generated += 1
+                new_key = new_state.key
+                if g_values.get(new_key, INF) <= new_g:
+                    duplicates += 1
+                    continue
+                new_h = update_heuristic(h_func, layout, new_state.positions, new_state.occupancy,
+                                         cost_model, h_cost, index)
+                if new_h == INF:
+                    continue  # ngõ cụt
+                g_values[new_key] = new_g
+                new_node = nodes.add(node, index, delta)
+                if new_state.is_solved():
+                    if new_g < best_cost:
+                        # Gửi ngay; cận chỉ được chứng minh khi hết lượt
+                        best_cost, best_node = new_g, new_node
+                        publish(best_cost, INF)
+                    continue
+                if new_key in closed:
+                    pending[new_key] = (new_g, (new_state, new_node, new_h))
+                else:
+                    open_list.push(new_key, new_g + weight * new_h, new_g, (new_state, new_node, new_h))
+
+        for key, g, item in open_list.entries():
+            pending[key] = (g, item)
+
+        if best_node is None:
+            if weight == 1:
+                report()
+                return None, nodes_expanded, []  # lượt w = 1 đã duyệt hết: vô nghiệm
+            continue
+
+        # Cận dưới của chi phí tối ưu: min(g + h) trên các state còn mở
+        lower = min((g + item[2] for g, item in pending.values()), default=INF)
+        bound = max(1.0, min(weight, best_cost / lower if lower > 0 else INF))
+        publish(best_cost, bound)
+        if bound == 1.0:
+            break
+
+    return result()
+
+
+if __name__ == "__main__":
+    # python solver/anytime_astar.py [map id] : print every improved solution
+    from utils.state import State
+    from utils.utils import import_map
+
+    map_id = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    start = clock()
+
+    def show(cost, path, bound):
+        print(f"{clock() - start:7.3f}s  cost={cost:<4} steps={len(path):<4} bound={bound:.3f}")
+
+    cost, nodes_expanded, path = anytime_astar(State(import_map(map_id)), on_solution=show)
+    print(f"final cost={cost} nodes={nodes_expanded}")
@@ -0,0 +1,308 @@
+"""
+Headless batch solving: ``python -m solver batch``.
+
+Every (map file, algorithm) pair is one job. Jobs run in a process pool sized
+to the CPU count and one JSON line is written per job as soon as it finishes:
+
+    {"map": ..., "algorithm": ..., "slide_moves": ..., "cost_model": ...,
+     "status": "solved" | "unsolvable" | "incomplete" | "timeout" | "aborted" | "error",
+     "cost": ..., "steps": ..., "path": [...], "nodes_expanded": ...,
+     "wall_time": ..., "peak_rss_kb": ..., "stats": {...}, "error": ...}
+
+"incomplete" means the solver gave up without a path and without proving
+that there is none (a beam search whose beams all failed, or a DFS whose
+transposition table was too small for the proof).
+
+``stats`` holds the solver's ``SearchStats`` counters (nodes generated,
+duplicates, peak frontier and visited sizes, bytes per state).
+
+The timeout is enforced inside the worker by setting the solver's
+``cancel_flag``, which every solver polls, so the worker stays usable for
+the next job. ``--max-nodes`` / ``--max-frontier`` abort a run early through
+the solvers' progress events, once it has clearly outgrown the budget.
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solver.registry import SOLVERS, accepts_cost_model, get_solver
+from utils.results import is_incomplete
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KB, or None if unknown."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # bytes on macOS
+
+
+def find_maps(patterns):
+    """Expand directories (every .txt inside) and glob patterns into sorted map files.
+
+    A puzzle pack (``.rhpk``) expands into one ``PACK#i`` entry per puzzle.
+    """
+    from utils.puzzle_pack import PACK_SUFFIX, PuzzlePack
+
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, '*.txt'))
+        else:
+            matches = glob.glob(pattern) or ([pattern] if '#' in pattern else [])
+        for match in sorted(matches):
+            if match.endswith(PACK_SUFFIX):
+                with PuzzlePack(match) as pack:
+                    files.extend(f"{match}#{index}" for index in range(len(pack)))
+            else:
+                files.append(match)
+    # Keep the first occurrence of each file
+    return list(dict.fromkeys(files))
+
+
+# Packs opened by this process, kept open for the next jobs
+_packs = {}
+
+
+def load_state(map_file):
+    """Initial State of a map file or ``PACK#i`` entry, or None if it cannot be loaded."""
+    from utils.puzzle_pack import PACK_SUFFIX, PuzzlePack
+    from utils.state import State
+    from utils.utils import load_map_file
+
+    pack_file, _, index = map_file.rpartition('#')
+    if pack_file.endswith(PACK_SUFFIX) and index.isdigit():
+        pack = _packs.get(pack_file)
+        if pack is None:
+            pack = _packs[pack_file] = PuzzlePack(pack_file)
+        return pack[int(index)].state()
+
+    vehicles = load_map_file(map_file)
+    if not vehicles:
+        return None
+    return State(vehicles)
+
+
+def _result_record(job, result, wall_time):
+    map_file, algorithm, slide_moves, cost_model = job[:4]
+    record = {'map': map_file, 'algorithm': algorithm, 'slide_moves': slide_moves,
+              'cost_model': cost_model, 'status': None, 'cost': None, 'steps': None,
+              'path': None, 'nodes_expanded': None, 'wall_time': round(wall_time, 6),
+              'peak_rss_kb': None, 'error': None}
+    if result is None:
+        record['status'] = 'timeout'
+    else:
+        cost, nodes_expanded, path = result
+        if is_incomplete(result):
+            record['status'] = 'incomplete'
+        else:
+            record['status'] = 'unsolvable' if cost is None else 'solved'
+        record['cost'] = cost
+        record['steps'] = len(path)
+        record['path'] = [list(move) for move in path]
+        record['nodes_expanded'] = nodes_expanded
+    return record
+
+
+def run_job(job):
+    """Solve one (map, algorithm) job in a worker process and return its record."""
+    from utils.search_stats import SearchStats
+
+    map_file, algorithm, slide_moves, cost_model, timeout, max_nodes, max_frontier = job
+    stats = SearchStats()
+    # Map parsing warnings must not end up in the JSONL stream
+    with contextlib.redirect_stdout(sys.stderr):
+        start = time.perf_counter()
+        try:
+            state = load_state(map_file)
+            if state is None:
+                raise ValueError("could not load any vehicle from the map file")
+            solver = get_solver(algorithm)
+            kwargs = {'slide_moves': slide_moves}
+            if cost_model is not None and accepts_cost_model(algorithm):
+                kwargs['cost_model'] = cost_model
+
+            cancel_flag = threading.Event()
+            aborted = []
+            if max_nodes or max_frontier:
+                def progress(event):
+                    if max_nodes and event.nodes_expanded > max_nodes:
+                        aborted.append(f"expanded more than {max_nodes} nodes")
+                    elif max_frontier and event.frontier and event.frontier > max_frontier:
+                        aborted.append(f"frontier grew past {max_frontier}")
+                    else:
+                        return
+                    cancel_flag.set()
+                kwargs['progress'] = progress
+            timer = None
+            if timeout:
+                timer = threading.Timer(timeout, cancel_flag.set)
+                timer.daemon = True
+                timer.start()
+            try:
+                result = solver(state, cancel_flag=cancel_flag, stats=stats, **kwargs)
+            finally:
+                if timer:
+                    timer.cancel()
+            if cancel_flag.is_set():
+                result = None
+            record = _result_record(job, result, time.perf_counter() - start)
+            record['stats'] = stats.as_dict()
+            if aborted:
+                record['status'] = 'aborted'
+                record['error'] = aborted[0]
+        except Exception as e:
+            record = _result_record(job, (None, None, []), time.perf_counter() - start)
+            record['status'] = 'error'
+            record['steps'] = record['path'] = None
+            record['error'] = f"{type(e).__name__}: {e}"
+    record['peak_rss_kb'] = peak_rss_kb()
+    return record
+
+
+def run_batch(map_files, algorithms, slide_moves=False, cost_model=None, timeout=None,
+              workers=None, fresh_workers=False, out=sys.stdout, cache=None,
+              max_nodes=None, max_frontier=None):
+    """Run every (map, algorithm) job and write one JSON line per finished job.
+
+    With ``cache`` (a ``SolutionCache``), cached results are written straight
+    away and only misses are sent to the pool. Returns the number of jobs.
+    """
+    jobs = [(map_file, algorithm, slide_moves, cost_model, timeout, max_nodes, max_frontier)
+            for map_file in map_files for algorithm in algorithms]
+
+    def emit(record):
+        out.write(json.dumps(record) + '\n')
+        out.flush()
+
+    pending = []
+    for job in jobs:
+        if cache is not None:
+            cached = _cached_record(cache, job)
+            if cached is not None:
+                emit(cached)
+                continue
+        pending.append(job)
+
+    if pending:
+        max_workers = workers or os.cpu_count() or 1
+        if not fresh_workers:
+            pool, submit = ProcessPoolExecutor(max_workers), lambda job: pool.submit(run_job, job)
+        else:
+            # One job per worker process, so peak_rss_kb is the peak of that job alone
+            import multiprocessing
+            context = multiprocessing.get_context('forkserver' if sys.platform != 'win32' else 'spawn')
+            if sys.version_info >= (3, 11):
+                pool = ProcessPoolExecutor(max_workers, mp_context=context, max_tasks_per_child=1)
+                submit = lambda job: pool.submit(run_job, job)
+            else:
+                # No max_tasks_per_child before 3.11: threads each start a one-job pool
+                pool = ThreadPoolExecutor(max_workers)
+                submit = lambda job: pool.submit(_run_in_new_process, job, context)
+        with pool:
+            futures = {submit(job): job for job in pending}
+            for future in as_completed(futures):
+                record = future.result()
+                if cache is not None and record['status'] in ('solved', 'unsolvable'):
+                    _store_record(cache, futures[future], record)
+                emit(record)
+    return len(jobs)
+
+
+def _run_in_new_process(job, context):
+    with ProcessPoolExecutor(1, mp_context=context) as pool:
+        return pool.submit(run_job, job).result()
+
+
+def _cached_record(cache, job):
+    map_file, algorithm, slide_moves, cost_model = job[:4]
+    with contextlib.redirect_stdout(sys.stderr):
+        state = load_state(map_file)
+    if state is None:
+        return None
+    model = cost_model if accepts_cost_model(algorithm) else None
+    result = cache.get(state, algorithm, model, slide_moves)
+    if result is None:
+        return None
+    record = _result_record(job, result, 0.0)
+    record['cached'] = True
+    return record
+
+
+def _store_record(cache, job, record):
+    map_file, algorithm, slide_moves, cost_model = job[:4]
+    with contextlib.redirect_stdout(sys.stderr):
+        state = load_state(map_file)
+    model = cost_model if accepts_cost_model(algorithm) else None
+    path = [tuple(move) for move in record['path']]
+    cache.put(state, algorithm, (record['cost'], record['nodes_expanded'], path), model, slide_moves)
+
+
+def add_arguments(parser):
+    parser.add_argument('maps', nargs='+', help="map files, directories or glob patterns")
+    parser.add_argument('-a', '--algorithms', default='bfs',
+                        help=f"comma-separated algorithms ({', '.join(SOLVERS)}) or 'all'")
+    parser.add_argument('--slide', action='store_true', help="use slide moves instead of single steps")
+    parser.add_argument('--cost-model', choices=('steps', 'slides', 'length'),
+                        help="cost model for ucs/astar/ida (default: each solver's own)")
+    parser.add_argument('--timeout', type=float, default=None, help="per-job timeout in seconds")
+    parser.add_argument('--max-nodes', type=int, default=None,
+                        help="abort a job once it has expanded more nodes than this")
+    parser.add_argument('--max-frontier', type=int, default=None,
+                        help="abort a job once its frontier grows past this size")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument('--fresh-workers', action='store_true',
+                        help="run every job in a new process so peak RSS is per job")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output file (default: stdout)")
+    parser.add_argument('--cache', action='store_true',
+                        help="reuse and fill the on-disk solution cache")
+
+
+def main(args):
+    algorithms = list(SOLVERS) if args.algorithms == 'all' else \
+        [name.strip() for name in args.algorithms.split(',') if name.strip()]
+    for name in algorithms:
+        if name not in SOLVERS:
+            print(f"Unknown algorithm '{name}' (choose from {', '.join(SOLVERS)})", file=sys.stderr)
+            return 2
+
+    map_files = find_maps(args.maps)
+    if not map_files:
+        print("No map files found", file=sys.stderr)
+        return 2
+
+    cache = None
+    if args.cache:
+        from utils.solution_cache import SolutionCache
+        cache = SolutionCache()
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        count = run_batch(map_files, algorithms, args.slide, args.cost_model, args.timeout,
+                          args.workers, args.fresh_workers, out, cache,
+                          args.max_nodes, args.max_frontier)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if cache is not None:
+            cache.close()
+    print(f"{count} jobs done", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve many maps with many algorithms")
+    add_arguments(parser)
+    sys.exit(main(parser.parse_args()))
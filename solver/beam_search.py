@@ -0,0 +1,182 @@
+"""
+Beam search: a valid path in bounded memory and time, for boards too big for
+the exhaustive solvers.
+
+The search goes layer by layer from the start. Every state of the beam is
+expanded and only the ``beam_width`` best successors are kept for the next
+layer; the others are dropped for good. Successors are ranked by a scoring
+function, the A* heuristic by default (a name of ``HEURISTICS`` or any
+function with the same arguments), with the cost so far breaking ties. A
+state kept once is never kept again, so the beam cannot go round in circles.
+
+At most ``max_depth`` layers of ``beam_width`` states are kept, each about
+``BEAM_ENTRY_BYTES``. By default the beam width is the widest whose layers
+fit in ``memory_mb``; an explicit ``beam_width`` overrides it but is
+narrowed to fit the budget too. When the beam dies out or reaches
+``max_depth`` without a solution, the search starts over with a beam
+``widen`` times wider, up to ``restarts`` times and never beyond the memory
+budget (so only a beam narrower than the budget can be widened).
+
+The path found is not optimal. A beam that never had to drop a state has
+searched every reachable state, so its failure proves there is no solution;
+any other failure returns an ``IncompleteResult`` (see ``utils.results``).
+"""
+
+import heapq
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.moves import move_cost
+from utils.node_store import NodeStore
+from utils.search_stats import clock
+from utils.progress import make_reporter
+from utils.results import IncompleteResult, is_incomplete
+from solver.heuristics import get_heuristic, update_heuristic
+
+# Rough memory of one kept state: packed key and its slot in the seen set,
+# NodeStore entry, and its share of the beam and candidate lists.
+BEAM_ENTRY_BYTES = 160
+
+INF = float('inf')
+
+
+def beam_width_for(memory_mb, max_depth):
+    """Widest beam whose ``max_depth`` layers fit in ``memory_mb``."""
+    return max(1, int(memory_mb * 1024 * 1024) // (BEAM_ENTRY_BYTES * max_depth))
+
+
+def _score(item):
+    # item: (key, (h, g, state, parent node, index, delta))
+    return item[1][0], item[1][1]
+
+
+def beam_search(initial_state, cancel_flag=None, slide_moves=False, cost_model='length',
+                heuristic='blockers', beam_width=None, memory_mb=256,
+                max_depth=500, restarts=3, widen=4, stats=None, progress=None):
+    """Beam search; returns ``(cost, nodes_expanded, path)`` of the first path found.
+
+    ``beam_width`` None uses the widest beam ``memory_mb`` allows
+    (``beam_width_for``).
+    Returns None when cancelled, and ``IncompleteResult`` when every beam
+    failed without proving that there is no solution.
+    """
+    h_func = get_heuristic(heuristic)
+    layout = initial_state.layout
+    timed = stats is not None and stats.timed
+    reporter = make_reporter(progress, 'Beam')
+    generated = duplicates = peak_frontier = peak_visited = nodes_expanded = 0
+    seen = set()
+
+    def report():
+        if stats is not None:
+            # frontier = beam + ứng viên của lớp kế, visited = số state đã giữ
+            stats.update(generated, nodes_expanded, duplicates, peak_frontier, peak_visited)
+            stats.bytes_per_state = BEAM_ENTRY_BYTES
+
+    if initial_state.is_solved():
+        return 0, 0, []
+    h_start = h_func(layout, initial_state.positions, initial_state.occupancy, cost_model)
+    if h_start == INF:
+        return None, 0, []
+
+    widest = beam_width_for(memory_mb, max_depth)
+    width = widest if beam_width is None else max(1, min(beam_width, widest))
+
+    for attempt in range(restarts + 1):
+        nodes = NodeStore(layout, slide_moves)
+        seen = {initial_state.key}
+        beam = [(initial_state, NodeStore.ROOT, 0, h_start)]
+        dropped = False  # some successor was left out of a beam
+
+        for depth in range(1, max_depth + 1):
+            # Ứng viên của lớp kế: key -> (h, g, state, node cha, index, delta)
+            candidates = {}
+            for state, node, g, h in beam:
+                if cancel_flag and cancel_flag.is_set():
+                    report()
+                    return None
+                nodes_expanded += 1
+                if reporter is not None and reporter.due(nodes_expanded):
+                    reporter.report(nodes_expanded, len(beam) + len(candidates), depth, None, g)
+
+                if timed:
+                    t = clock()
+                moves = state.get_moves(slide_moves)
+                if timed:
+                    stats.add_time('movegen', clock() - t)
+                for index, delta in moves:
+                    new_state = state.apply_move(index, delta)
+                    generated += 1
+                    new_g = g + move_cost(layout, index, delta, cost_model)
+                    new_key = new_state.key
+                    old = candidates.get(new_key)
+                    if new_key in seen or (old is not None and old[1] <= new_g):
+                        duplicates += 1
+                        continue
+                    if new_state.is_solved():
+                        report()
+                        return new_g, nodes_expanded, nodes.path(nodes.add(node, index, delta))
+
+                    if timed:
+                        t = clock()
+                    new_h = update_heuristic(h_func, layout, new_state.positions, new_state.occupancy,
+                                             cost_model, h, index)
+                    if timed:
+                        stats.add_time('heuristic', clock() - t)
+                    if new_h == INF:
+                        continue  # ngõ cụt
+                    candidates[new_key] = (new_h, new_g, new_state, node, index, delta)
+                    if len(candidates) >= 2 * width:
+                        # Giữ bộ nhớ tạm trong giới hạn: chỉ còn width ứng viên tốt nhất
+                        candidates = dict(heapq.nsmallest(width, candidates.items(), key=_score))
+                        dropped = True
+
+            if len(beam) + len(candidates) > peak_frontier:
+                peak_frontier = len(beam) + len(candidates)
+            if len(candidates) > width:
+                kept = heapq.nsmallest(width, candidates.items(), key=_score)
+                dropped = True
+            else:
+                kept = candidates.items()
+            beam = []
+            for key, (h, g, state, parent, index, delta) in kept:
+                seen.add(key)
+                beam.append((state, nodes.add(parent, index, delta), g, h))
+            if len(seen) > peak_visited:
+                peak_visited = len(seen)
+            if not beam:
+                break
+
+        if beam and not dropped:
+            dropped = True  # stopped by max_depth: nothing is proven
+        if not dropped:
+            # Không bỏ state nào mà beam vẫn cạn: đã duyệt hết, vô nghiệm
+            report()
+            return None, nodes_expanded, []
+        if attempt == restarts or width >= widest:
+            break
+        width = min(width * widen, widest)
+
+    report()
+    return IncompleteResult(nodes_expanded)
+
+
+if __name__ == "__main__":
+    # python solver/beam_search.py [map id] [beam width] : default width from the memory budget
+    from utils.state import State
+    from utils.utils import import_map
+
+    map_id = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    start = clock()
+    result = beam_search(State(import_map(map_id)), beam_width=width, restarts=0)
+    cost, nodes_expanded, path = result
+    if is_incomplete(result):
+        print(f"map {map_id}: no path with " + (f"beam width {width}" if width else "the default memory budget"))
+    elif cost is None:
+        print(f"map {map_id}: no solution")
+    else:
+        print(f"map {map_id}: cost={cost} steps={len(path)} nodes={nodes_expanded} "
+              f"time={clock() - start:.3f}s")
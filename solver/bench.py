@@ -0,0 +1,291 @@
+"""
+Reproducible solver benchmarks: ``python -m solver bench``.
+
+``run`` times every solver on every bundled map plus generated harder
+instances. Each (instance, algorithm) pair gets warm-up runs and then
+``repeats`` timed runs, reported as median and p95 wall time, nodes expanded
+and nodes per second. Peak memory comes from one extra run under
+``tracemalloc``, so its overhead never shows up in the timings. Results are
+written as a JSON baseline.
+
+The table solver saves its distance table on the first run and only looks
+it up afterwards, so each of its runs gets a fresh, empty table directory:
+its timings and memory include building the table, like every other
+solver's include its search.
+
+``compare`` reads two baselines and flags every pair whose median time grew
+by more than the threshold, or whose node count changed (a search behaviour
+change rather than a speed change). It exits with status 1 on regressions.
+
+Generated instances are the hardest states of each bundled map's reachable
+component (largest exact distance to a goal, from ``utils.distance_table``),
+so they are deterministic and always solvable.
+"""
+
+import gc
+import glob
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solver.registry import SOLVERS, get_solver, solver_name
+
+MAP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'map')
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * fraction // 1))  # ceil without math
+    return ordered[int(rank) - 1]
+
+
+def bundled_instances(map_dir=MAP_DIR):
+    """(name, State) of every loadable map/mapN.txt, in map number order."""
+    from utils.state import State
+    from utils.utils import load_map_file
+
+    files = glob.glob(os.path.join(map_dir, 'map*.txt'))
+    files.sort(key=lambda f: int(''.join(c for c in os.path.basename(f) if c.isdigit()) or 0))
+    instances = []
+    for file_name in files:
+        vehicles = load_map_file(file_name)
+        if vehicles:
+            instances.append((os.path.splitext(os.path.basename(file_name))[0], State(vehicles)))
+    return instances
+
+
+def hardest_instance(state, slide_moves=False):
+    """The state of ``state``'s component farthest from any goal, with its distance."""
+    from utils.distance_table import UNSOLVABLE, compute_distances
+    from utils.state import State
+
+    distances = compute_distances(state, slide_moves)
+    best_key, best_distance = None, -1
+    for key, distance in distances.items():
+        if distance != UNSOLVABLE and (distance > best_distance
+                                       or (distance == best_distance and key < best_key)):
+            best_key, best_distance = key, distance
+    if best_key is None:
+        return None, None
+    return State.from_key(state.layout, best_key), best_distance
+
+
+def generated_instances(instances, slide_moves=False):
+    """Harder variants of ``instances`` (skipping unsolvable or already hardest ones)."""
+    generated = []
+    for name, state in instances:
+        hard, distance = hardest_instance(state, slide_moves)
+        if hard is not None and hard.key != state.key:
+            generated.append((f"{name}-hardest", hard))
+    return generated
+
+
+def _timed_run(solver, state, slide_moves, timeout):
+    if solver_name(solver) == 'table':
+        # Fresh directory, so the table is built again instead of loaded
+        with tempfile.TemporaryDirectory(prefix='bench-table-') as table_dir:
+            return _timed_call(solver, state, slide_moves, timeout, table_dir=table_dir)
+    return _timed_call(solver, state, slide_moves, timeout)
+
+
+def _timed_call(solver, state, slide_moves, timeout, **options):
+    cancel_flag = threading.Event()
+    timer = threading.Timer(timeout, cancel_flag.set) if timeout else None
+    if timer:
+        timer.daemon = True
+        timer.start()
+    gc.collect()
+    start = time.perf_counter()
+    try:
+        result = solver(state, cancel_flag=cancel_flag, slide_moves=slide_moves, **options)
+    finally:
+        elapsed = time.perf_counter() - start
+        if timer:
+            timer.cancel()
+    if cancel_flag.is_set():
+        result = None
+    return result, elapsed
+
+
+def bench_one(solver, state, slide_moves=False, repeats=5, warmup=1, timeout=30.0):
+    """Benchmark one solver on one state and return its record."""
+    record = {'status': None, 'cost': None, 'steps': None, 'nodes_expanded': None,
+              'median_s': None, 'p95_s': None, 'nodes_per_sec': None, 'peak_kb': None,
+              'runs': 0}
+    try:
+        for _ in range(warmup):
+            result, _ = _timed_run(solver, state, slide_moves, timeout)
+            if result is None:
+                record['status'] = 'timeout'
+                return record
+
+        times = []
+        for _ in range(repeats):
+            result, elapsed = _timed_run(solver, state, slide_moves, timeout)
+            if result is None:
+                record['status'] = 'timeout'
+                return record
+            times.append(elapsed)
+
+        # Separate run for memory, so tracemalloc overhead stays out of the timings
+        tracemalloc.start()
+        try:
+            _timed_run(solver, state, slide_moves, timeout)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+        return record
+
+    cost, nodes_expanded, path = result
+    median = percentile(times, 0.5)
+    record.update({
+        'status': 'solved' if cost is not None else 'unsolvable',
+        'cost': cost,
+        'steps': len(path),
+        'nodes_expanded': nodes_expanded,
+        'median_s': round(median, 6),
+        'p95_s': round(percentile(times, 0.95), 6),
+        'nodes_per_sec': round(nodes_expanded / median) if nodes_expanded and median > 0 else None,
+        'peak_kb': round(peak / 1024, 1),
+        'runs': len(times),
+    })
+    return record
+
+
+def run_suite(algorithms, slide_moves=False, repeats=5, warmup=1, timeout=30.0,
+              generated=True, progress=None):
+    """Benchmark every algorithm on every instance; return the baseline dict."""
+    instances = bundled_instances()
+    if generated:
+        instances += generated_instances(instances, slide_moves)
+
+    results = {}
+    for name, state in instances:
+        for algorithm in algorithms:
+            record = bench_one(get_solver(algorithm), state, slide_moves, repeats, warmup, timeout)
+            results[f"{name}|{algorithm}"] = record
+            if progress:
+                progress(name, algorithm, record)
+
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'slide_moves': slide_moves,
+            'repeats': repeats,
+            'warmup': warmup,
+            'timeout': timeout,
+        },
+        'results': results,
+    }
+
+
+def compare(base, new, threshold=0.10, min_delta=0.001):
+    """Return (regressions, lines) comparing two baselines.
+
+    A slowdown only counts when it exceeds both ``threshold`` (relative) and
+    ``min_delta`` seconds, so sub-millisecond noise is not reported.
+    """
+    lines = []
+    regressions = 0
+    base_results = base['results']
+    new_results = new['results']
+    keys = list(base_results) + [key for key in new_results if key not in base_results]
+    for key in keys:
+        old = base_results.get(key)
+        cur = new_results.get(key)
+        if old is None or cur is None:
+            lines.append(f"  {key:<32} {'only in new' if old is None else 'only in base'}")
+            continue
+        if old['status'] != cur['status']:
+            # A pair that used to finish and no longer does is a regression
+            if cur['status'] not in ('solved', 'unsolvable'):
+                regressions += 1
+            lines.append(f"  {key:<32} status {old['status']} -> {cur['status']}")
+            continue
+        if old['median_s'] is None or cur['median_s'] is None:
+            continue
+
+        ratio = cur['median_s'] / old['median_s'] if old['median_s'] > 0 else 1.0
+        flag = ''
+        delta = cur['median_s'] - old['median_s']
+        if ratio > 1 + threshold and delta > min_delta:
+            flag = 'REGRESSION'
+            regressions += 1
+        elif ratio < 1 - threshold and -delta > min_delta:
+            flag = 'faster'
+        if old['nodes_expanded'] != cur['nodes_expanded'] or old['cost'] != cur['cost']:
+            flag = (flag + ' ' if flag else '') + (f"nodes {old['nodes_expanded']} -> {cur['nodes_expanded']}, "
+                                                   f"cost {old['cost']} -> {cur['cost']}")
+        lines.append(f"  {key:<32} {old['median_s']:>10.4f}s -> {cur['median_s']:>10.4f}s "
+                     f"({(ratio - 1) * 100:+6.1f}%) {flag}")
+    return regressions, lines
+
+
+def add_arguments(parser):
+    commands = parser.add_subparsers(dest='bench_command', required=True)
+
+    run = commands.add_parser('run', help="benchmark solvers and write a JSON baseline")
+    run.add_argument('-a', '--algorithms', default='all',
+                     help=f"comma-separated algorithms ({', '.join(SOLVERS)}) or 'all'")
+    run.add_argument('--slide', action='store_true', help="use slide moves instead of single steps")
+    run.add_argument('--repeats', type=int, default=5, help="timed runs per pair (default: 5)")
+    run.add_argument('--warmup', type=int, default=1, help="untimed runs per pair (default: 1)")
+    run.add_argument('--timeout', type=float, default=30.0, help="per-run timeout in seconds")
+    run.add_argument('--no-generated', action='store_true', help="only the bundled maps")
+    run.add_argument('-o', '--output', default='bench_baseline.json', help="baseline file to write")
+
+    cmp = commands.add_parser('compare', help="compare two baselines")
+    cmp.add_argument('base')
+    cmp.add_argument('new')
+    cmp.add_argument('--threshold', type=float, default=0.10,
+                     help="relative slowdown of the median that counts as a regression (default: 0.10)")
+    cmp.add_argument('--min-delta', type=float, default=0.001,
+                     help="ignore slowdowns smaller than this many seconds (default: 0.001)")
+
+
+def main(args):
+    if args.bench_command == 'compare':
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        regressions, lines = compare(base, new, args.threshold, args.min_delta)
+        print(f"Comparing {args.new} against {args.base} (threshold {args.threshold:.0%})")
+        for line in lines:
+            print(line)
+        print(f"{regressions} regression(s)")
+        return 1 if regressions else 0
+
+    algorithms = list(SOLVERS) if args.algorithms == 'all' else \
+        [name.strip() for name in args.algorithms.split(',') if name.strip()]
+    for name in algorithms:
+        if name not in SOLVERS:
+            print(f"Unknown algorithm '{name}' (choose from {', '.join(SOLVERS)})", file=sys.stderr)
+            return 2
+
+    def progress(name, algorithm, record):
+        if record['median_s'] is None:
+            print(f"{name:<16} {algorithm:<6} {record['status']}", file=sys.stderr)
+        else:
+            print(f"{name:<16} {algorithm:<6} median {record['median_s']:.4f}s  p95 {record['p95_s']:.4f}s  "
+                  f"nodes {record['nodes_expanded']}  peak {record['peak_kb']} KB", file=sys.stderr)
+
+    baseline = run_suite(algorithms, args.slide, args.repeats, args.warmup, args.timeout,
+                         not args.no_generated, progress)
+    with open(args.output, 'w') as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+    print(f"Baseline written to {args.output}", file=sys.stderr)
+    return 0
@@ -1,36 +1,79 @@
-import queue
+import sys
+import os
+from collections import deque
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.node_store import NodeStore
+from utils.search_stats import clock
+from utils.progress import make_reporter
+
+def bfs_solver(initial_state, cancel_flag=None, slide_moves=False, stats=None, progress=None):
+    # Trong slide mode, BFS tối ưu theo số lần trượt thay vì số ô
 
-def bfs_solver(initial_state, cancel_flag=None):
-    
     if initial_state.is_solved():
-        return [], 0, 0
-    
-    q = queue.Queue()
-    q.put((initial_state, []))  # (state, path)
+        return 0, 0, []
+
+    # Mỗi node chỉ lưu con trỏ cha + nước đi, path được dựng lại khi tìm thấy đích
+    nodes = NodeStore(initial_state.layout, slide_moves)
+    q = deque()
+    q.append((initial_state, NodeStore.ROOT))  # (state, node)
     visited = set()
     nodes_expanded = 0
-    visited.add(initial_state.to_string())
-    while not q.empty():
+    visited.add(initial_state.key)
+
+    # Bộ đếm thống kê (stats), chỉ đo thời gian từng pha khi stats.timed
+    generated = duplicates = peak_frontier = 0
+    timed = stats is not None and stats.timed
+    reporter = make_reporter(progress, 'BFS')
+
+    def report():
+        if stats is not None:
+            stats.update(generated, nodes_expanded, duplicates, peak_frontier, len(visited))
+            stats.estimate_state_bytes(visited, initial_state.key, nodes.bytes_per_node, (initial_state, 0))
+
+    while q:
         if cancel_flag and cancel_flag.is_set():
+            report()
             return None
-        
-        current_state, path = q.get()
+
+        if len(q) > peak_frontier:
+            peak_frontier = len(q)
+        current_state, node = q.popleft()
         nodes_expanded += 1
-        possible_moves = current_state.get_all_possible_moves()
-        
-        for vehicle_id, direction in possible_moves:
-            new_state = current_state.move_vehicle(vehicle_id, direction)
-            
-            if new_state is None: 
+        if reporter is not None and reporter.due(nodes_expanded):
+            depth = nodes.depth(node)
+            reporter.report(nodes_expanded, len(q), depth, None, depth)
+        if timed:
+            t = clock()
+        possible_moves = current_state.get_moves(slide_moves)
+        if timed:
+            stats.add_time('movegen', clock() - t)
+
+        for index, delta in possible_moves:
+            new_state = current_state.apply_move(index, delta)
+
+            if new_state is None:
                 continue
-                
-            state_string = new_state.to_string()
-            
-            if state_string not in visited:
-                visited.add(state_string)
-                new_path = path + [(vehicle_id, direction)]
-                
-                q.put((new_state, new_path))
+            generated += 1
+
+            if timed:
+                t = clock()
+            state_key = new_state.key
+            seen = state_key in visited
+            if timed:
+                stats.add_time('hashing', clock() - t)
+
+            if not seen:
+                visited.add(state_key)
+                new_node = nodes.add(node, index, delta)
+
                 if new_state.is_solved():
-                    return len(new_path), nodes_expanded, new_path
-    return None, 0, nodes_expanded
\ No newline at end of file
+                    path = nodes.path(new_node)
+                    report()
+                    return len(path), nodes_expanded, path
+                q.append((new_state, new_node))
+            else:
+                duplicates += 1
+    report()
+    return None, nodes_expanded, []
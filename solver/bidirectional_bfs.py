@@ -0,0 +1,160 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.goals import enumerate_goals
+from utils.node_store import NodeStore
+from utils.progress import make_reporter
+
+# Above this many goal configurations the backward side is never started and
+# the search stays a plain forward BFS.
+MAX_GOALS = 200000
+
+def _expand_layer(layer, layout, generate, seen, nodes, other_seen, cancel_flag, counts,
+                  is_goal=None):
+    """Expand one full BFS layer; return (next layer, keys that meet the other side).
+
+    A new key meets the other side when it is in ``other_seen`` or, with
+    ``is_goal``, when it is a goal. A goal is the shortest meet of the layer
+    (nothing is left to add behind it), so the expansion stops there.
+    ``counts`` is a [generated, duplicates, expanded] list updated in place.
+    """
+    engine = layout.engine
+    masks = engine.masks
+    bits = layout.bits
+    unpack = layout.unpack
+    next_layer = []
+    meets = []
+    generated = duplicates = 0
+
+    for key, occupancy, node in layer:
+        if cancel_flag and cancel_flag.is_set():
+            return None, None
+        counts[2] += 1
+
+        positions = unpack(key)
+        for index, delta in generate(positions, occupancy):
+            generated += 1
+            new_key = key + (delta << (index * bits))
+            if new_key in seen:
+                duplicates += 1
+                continue
+
+            pos = positions[index]
+            vehicle_masks = masks[index]
+            new_occupancy = (occupancy & ~vehicle_masks[pos]) | vehicle_masks[pos + delta]
+            new_node = nodes.add(node, index, delta)
+            seen[new_key] = new_node
+            if is_goal is not None and is_goal(new_key):
+                counts[0] += generated
+                counts[1] += duplicates
+                return next_layer, [new_key]
+            if new_key in other_seen:
+                meets.append(new_key)
+            next_layer.append((new_key, new_occupancy, new_node))
+
+    counts[0] += generated
+    counts[1] += duplicates
+    return next_layer, meets
+
+def bidirectional_bfs(initial_state, cancel_flag=None, slide_moves=False, max_goals=MAX_GOALS,
+                      stats=None, progress=None):
+    # Tìm kiếm hai chiều: từ trạng thái đầu và ngược từ các trạng thái đích.
+    # Mỗi lượt mở rộng phía có lớp kế tiếp rẻ hơn (ước lượng số state mới
+    # = kích thước lớp * hệ số tăng đo được ở lần mở rộng trước của phía đó).
+    # Phía ngược chỉ bắt đầu khi lớp đầu của nó (toàn bộ tập đích) rẻ hơn
+    # lớp kế của phía xuôi; trước đó phía xuôi tự kiểm tra đích như BFS.
+
+    if initial_state.is_solved():
+        return 0, 0, []
+
+    layout = initial_state.layout
+    # Only goals with the line orders of the start can be reached from it
+    goals = enumerate_goals(layout, max_goals, initial_state.positions)
+    if goals is not None and not goals:
+        return None, 0, []
+    goal_count = len(goals) if goals is not None else float('inf')
+    goals = None  # enumerated again if the backward side starts
+
+    engine = layout.engine
+    generate = engine.generate_slides if slide_moves else engine.generate_moves
+
+    forward_nodes = NodeStore(layout, slide_moves)
+    forward_seen = {initial_state.key: NodeStore.ROOT}
+    forward_layer = [(initial_state.key, initial_state.occupancy, NodeStore.ROOT)]
+
+    # Moves are reversible, so the predecessors of a state are its successors
+    # and the backward side can reuse the same move generator.
+    backward_nodes = NodeStore(layout, slide_moves)
+    backward_seen = {}
+    backward_layer = None  # not started yet
+    forward_growth = backward_growth = 1.0  # new states per expanded state, last layer
+
+    counts = [0, 0, 0]  # generated, duplicates, expanded
+    reporter = make_reporter(progress, 'Bi-BFS')
+    depth = 0  # forward + backward layers expanded so far
+    peak_frontier = 1
+
+    def report():
+        if stats is not None:
+            stats.update(counts[0], counts[2], counts[1], peak_frontier,
+                         len(forward_seen) + len(backward_seen))
+            stats.estimate_state_bytes(forward_seen, initial_state.key, forward_nodes.bytes_per_node,
+                                       (initial_state.key, initial_state.occupancy, 0))
+
+    while forward_layer and backward_layer != []:
+        forward_cost = len(forward_layer) * forward_growth
+        if backward_layer is None:
+            # Starting costs the goal set itself plus its first expansion
+            backward_cost = goal_count * (1 + forward_growth)
+        else:
+            backward_cost = len(backward_layer) * backward_growth
+
+        if forward_cost <= backward_cost:
+            expanded = len(forward_layer)
+            forward_layer, meets = _expand_layer(forward_layer, layout, generate, forward_seen,
+                                                 forward_nodes, backward_seen, cancel_flag, counts,
+                                                 layout.is_goal)
+            if meets is not None:
+                forward_growth = len(forward_layer) / expanded
+        else:
+            if backward_layer is None:
+                backward_layer = []
+                for key, occupancy in enumerate_goals(layout, None, initial_state.positions):
+                    node = NodeStore.ROOT if not backward_seen else backward_nodes.add_root()
+                    backward_seen[key] = node
+                    backward_layer.append((key, occupancy, node))
+                backward_growth = forward_growth
+            expanded = len(backward_layer)
+            backward_layer, meets = _expand_layer(backward_layer, layout, generate, backward_seen,
+                                                  backward_nodes, forward_seen, cancel_flag, counts)
+            if meets is not None:
+                backward_growth = len(backward_layer) / expanded
+
+        if meets is None:
+            report()
+            return None
+        peak_frontier = max(peak_frontier, len(forward_layer) + len(backward_layer or ()))
+        depth += 1
+        if reporter is not None:
+            # Once per layer: layers are few, so no rate check on the node count
+            reporter.report(counts[2], len(forward_layer) + len(backward_layer or ()), depth, None, depth)
+
+        if meets:
+            # Every meet of this layer is a real solution; the shortest one is optimal
+            # (a goal met before the backward side started has backward depth 0)
+            def backward_moves(key):
+                return backward_nodes.moves(backward_seen[key]) if key in backward_seen else []
+
+            best_key = min(meets, key=lambda k: forward_nodes.depth(forward_seen[k])
+                                                + len(backward_moves(k)))
+            moves = forward_nodes.moves(forward_seen[best_key])
+            for index, delta in reversed(backward_moves(best_key)):
+                moves.append((index, -delta))
+            path = [layout.encode_move(index, delta, slide_moves) for index, delta in moves]
+            report()
+            return len(path), counts[2], path
+
+    report()
+    return None, counts[2], []
@@ -1,38 +1,185 @@
+"""
+Iterative-deepening depth-first search.
+
+Each iteration is a depth-limited DFS on an explicit stack (one frame of
+moves per depth) over a ``SearchCursor``, with limits 1, 2, 3, ...; the first
+solution found is therefore optimal in the number of moves of the chosen
+move mode. Memory is the current path plus a fixed-size transposition table
+(the IDA* one, storing depths): a state is searched again only when it is
+reached at a shallower depth than before in the same iteration.
+
+Moves of the target towards the exit are tried first, then moves of the
+vehicles standing in its way, then the rest.
+
+Proving that there is no solution needs a table big enough for the whole
+reachable component: once the states of one iteration no longer fit, the
+search stops with an ``IncompleteResult`` (see ``utils.results``) instead
+of deepening forever.
+"""
+
 import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cursor import SearchCursor
+from utils.search_stats import clock
+from utils.progress import make_reporter
+from utils.results import IncompleteResult, is_incomplete
+from solver.heuristics import exit_lane
+from solver.ida_star_solver import TranspositionTable, TT_ENTRY_BYTES
+
+
+def order_moves(lane, layout, positions, occupancy, moves):
+    """Sort moves so that target-clearing ones come first."""
+    if lane is None:
+        return moves
+    target = lane.target_index
+    pos = positions[target]
+    toward_exit = layout.goal_position - pos
+    cells = lane.lanes[pos]
+    masks = layout.engine.masks
+    blockers = ()
+    if occupancy & cells:
+        blockers = [i for i in lane.crossers if masks[i][positions[i]] & cells]
+
+    first, second, rest = [], [], []
+    for move in moves:
+        index, delta = move
+        if index == target:
+            (first if delta * toward_exit > 0 else rest).append(move)
+        elif index in blockers:
+            second.append(move)
+        else:
+            rest.append(move)
+    return first + second + rest
+
+
+def dfs_solver(start_state, cancel_flag=None, slide_moves=False, table_mb=64, stats=None, progress=None):
+    # Trả về (số nước, số node đã mở rộng, đường đi); None nếu bị hủy,
+    # IncompleteResult nếu bảng quá nhỏ để chứng minh vô nghiệm
+
+    layout = start_state.layout
+    cursor = SearchCursor(start_state, slide_moves)
+    if cursor.is_solved():
+        return 0, 0, []
+
+    lane = exit_lane(layout)
+    table = TranspositionTable(table_mb)
+    timed = stats is not None and stats.timed
+    reporter = make_reporter(progress, 'DFS')
+    nodes_expanded = generated = duplicates = peak_depth = stored = 0
+
+    def report():
+        if stats is not None:
+            # frontier = độ sâu lớn nhất, visited = số state lưu trong bảng
+            stats.update(generated, nodes_expanded, duplicates, peak_depth,
+                         min(stored, len(table.keys)))
+            stats.bytes_per_state = TT_ENTRY_BYTES
+
+    def expand():
+        if timed:
+            t = clock()
+        moves = order_moves(lane, layout, cursor.positions, cursor.occupancy, cursor.moves())
+        if timed:
+            stats.add_time('movegen', clock() - t)
+        return moves
+
+    limit = 0
+    while True:
+        limit += 1
+        table.new_iteration()
+        table.store(cursor.key, 0)
+        stored = 1
+        # Keys stopped at the limit; if all of them turn out to be reachable
+        # at a shallower depth, no state lies beyond the limit: no solution.
+        cut_keys = []
+
+        move_lists = [expand()]
+        next_moves = [0]
+        nodes_expanded += 1
+
+        while move_lists:
+            if cancel_flag and cancel_flag.is_set():
+                report()
+                return None
+
+            moves = move_lists[-1]
+            i = next_moves[-1]
+            if i == len(moves):
+                move_lists.pop()
+                next_moves.pop()
+                if cursor.stack:
+                    cursor.undo()
+                continue
+            next_moves[-1] = i + 1
+
+            index, delta = moves[i]
+            if cursor.stack:
+                last_index, last_delta = cursor.stack[-1]
+                # Undoing the previous move never helps; in slide mode neither
+                # does moving the same vehicle twice in a row.
+                if last_index == index and (slide_moves or last_delta == -delta):
+                    continue
+
+            depth = len(move_lists)
+            cursor.apply((index, delta))
+            generated += 1
+
+            key = cursor.key
+            if timed:
+                t = clock()
+            seen = table.seen_cheaper(key, depth)
+            if timed:
+                stats.add_time('hashing', clock() - t)
+            if seen:
+                duplicates += 1
+                cursor.undo()
+                continue
+
+            if cursor.is_solved():
+                report()
+                return depth, nodes_expanded, cursor.path()
+
+            table.store(key, depth)
+            stored += 1
+            if depth == limit:
+                if cut_keys is not None:
+                    cut_keys.append(key)
+                    if len(cut_keys) > table.buckets:
+                        cut_keys = None
+                cursor.undo()
+                continue
+
+            nodes_expanded += 1
+            if depth > peak_depth:
+                peak_depth = depth
+            if reporter is not None and reporter.due(nodes_expanded):
+                reporter.report(nodes_expanded, depth, depth, limit, depth)
+            move_lists.append(expand())
+            next_moves.append(0)
+
+        # Table entries only record depths a state was really reached at, so
+        # a proof still holds after evictions (a lost entry just fails it).
+        # With as few stores as the limit, no state can lie at the limit at all.
+        if stored <= limit or (cut_keys is not None
+                               and all(table.seen_cheaper(k, limit - 1) for k in cut_keys)):
+            report()
+            return None, nodes_expanded, []
+        if cut_keys is None or stored > 2 * table.buckets:
+            # The iteration did not fit in the table: no proof can follow
+            report()
+            return IncompleteResult(nodes_expanded)
+
+
+if __name__ == "__main__":
+    # python solver/dfs_solver.py [map id] [--slide]
+    from utils.state import State
+    from utils.utils import import_map
 
-sys.setrecursionlimit(5000)
-
-def dfs_handler(current_state, path, visited, node_expanded, cancel_flag):
-    
-    if cancel_flag and cancel_flag.is_set():
-        return None
-    
-    node_expanded[0] += 1
-    state_key = current_state.to_string()
-
-    if state_key in visited:
-        return None
-    visited.add(state_key)
-
-    if current_state.is_solved():
-        return path
-
-    for move in current_state.get_all_possible_moves():
-        vehicle_id, direction = move
-        new_state = current_state.move_vehicle(vehicle_id, direction)
-        if new_state:
-            result = dfs_handler(new_state, path + [move], visited, node_expanded, cancel_flag)
-            if result is not None:
-                return result
-
-    return None
-
-def dfs_solver(start_state, cancel_flag=None):
-    visited = set()
-    node_expanded = [0]
-    path = dfs_handler(start_state, [], visited, node_expanded, cancel_flag)
-
-    if path is not None:
-        return len(path), node_expanded[0], path
-    else:
-        return None, 0, []
+    map_id = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 1
+    start = clock()
+    result = dfs_solver(State(import_map(map_id)), slide_moves='--slide' in sys.argv)
+    cost, nodes_expanded, path = result
+    status = "incomplete (table too small)" if is_incomplete(result) else f"moves={cost}"
+    print(f"map {map_id}: {status} nodes={nodes_expanded} time={clock() - start:.3f}s")
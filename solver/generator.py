@@ -0,0 +1,249 @@
+"""
+Hard puzzle generator: ``python -m solver generate``.
+
+A layout fixes the board and every vehicle's length, orientation and line,
+but not where along its line each vehicle sits. For each layout the
+generator runs one backward BFS from all goal configurations of the layout
+(``utils.goals``), which reaches every solvable arrangement and gives its
+exact distance to the goal. The arrangement farthest from any goal is the
+hardest puzzle of that layout.
+
+Layouts are drawn at random from a seed; layout ``i`` only depends on
+``(seed, i)``, so the output does not depend on how layouts are spread over
+the worker processes. Puzzles are deduplicated by a canonical encoding that
+ignores vehicle names and order, so a layout drawn twice gives one file,
+also across runs writing to the same directory.
+
+Every kept puzzle is written as ``mapN.txt`` in the format ``import_map`` /
+``load_map_file`` read, with vehicles renamed canonically (target ``X``).
+``index.csv`` lists each file with its optimal number of moves, the number
+of solvable states of its layout, its vehicle count and the layout number
+it came from (rerun with the same seed to reproduce it).
+"""
+
+import csv
+import os
+import random
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.board import Board, STANDARD_BOARD
+from utils.goals import enumerate_goals
+from utils.layout import layout_from_signature
+from utils.loader import iter_puzzles
+
+# Names of the non-target vehicles in written maps
+VEHICLE_NAMES = 'ABCDEFGHIJKLMNOPQRSTUVWYZ'
+
+
+def vehicle_name(n):
+    """Name of non-target vehicle ``n``: A..Z without X, then A1, B1, ... on large boards."""
+    letter = VEHICLE_NAMES[n % len(VEHICLE_NAMES)]
+    return letter if n < len(VEHICLE_NAMES) else f"{letter}{n // len(VEHICLE_NAMES)}"
+
+
+def random_layout(board, rng, min_vehicles=8, max_vehicles=13, long_share=0.3):
+    """A random layout signature with a length-2 target on the exit line.
+
+    Returns None when the drawn vehicles cannot all fit on their lines.
+    """
+    target = ('X', 2, board.exit_orientation, board.exit_line, True)
+    vehicles = [target]
+    used = {(target[2], target[3]): 2}
+    count = rng.randint(min_vehicles, max_vehicles)
+    for n in range(count - 1):
+        orientation = rng.choice('HV')
+        length = 3 if rng.random() < long_share else 2
+        line = rng.randrange(board.rows if orientation == 'H' else board.cols)
+        used[orientation, line] = used.get((orientation, line), 0) + length
+        if used[orientation, line] > board.span(orientation):
+            return None
+        vehicles.append((vehicle_name(n), length, orientation, line, False))
+    return canonical_signature(board, vehicles)
+
+
+def canonical_signature(board, vehicles):
+    """Layout signature with vehicles sorted and renamed, so equal layouts compare equal."""
+    target = [v for v in vehicles if v[4]]
+    others = sorted((v[1], v[2], v[3]) for v in vehicles if not v[4])
+    renamed = [('X',) + tuple(target[0][1:])] if target else []
+    renamed += [(vehicle_name(n), length, orientation, line, False)
+                for n, (length, orientation, line) in enumerate(others)]
+    return (board, tuple(renamed))
+
+
+def canonical_puzzle(layout, key):
+    """Canonical encoding of a puzzle: the board plus its sorted vehicle placements."""
+    positions = layout.unpack(key)
+    vehicles = sorted((layout.targets[i], layout.orientations[i], layout.lengths[i],
+                       layout.lines[i], positions[i]) for i in range(len(layout)))
+    return (layout.board, tuple(vehicles))
+
+
+def goal_distances(layout, slide_moves=False, max_states=None):
+    """Backward BFS from every goal configuration of ``layout``.
+
+    Returns ``(farthest key, its distance, number of solvable states)``, or
+    None when the layout has no goal or more than ``max_states`` states.
+    """
+    engine = layout.engine
+    masks = engine.masks
+    bits = layout.bits
+    unpack = layout.unpack
+    generate = engine.generate_slides if slide_moves else engine.generate_moves
+
+    goals = enumerate_goals(layout, max_states)
+    if not goals:
+        return None
+
+    # Moves are reversible, so a BFS from the goals over the same move
+    # generator gives every solvable state with its distance to the goal.
+    distances = {key: 0 for key, _ in goals}
+    frontier = deque(goals)
+    farthest_key, farthest = min(distances), 0
+    while frontier:
+        key, occupancy = frontier.popleft()
+        distance = distances[key] + 1
+        positions = unpack(key)
+        for index, delta in generate(positions, occupancy):
+            new_key = key + (delta << (index * bits))
+            if new_key in distances:
+                continue
+            distances[new_key] = distance
+            pos = positions[index]
+            frontier.append((new_key, (occupancy & ~masks[index][pos]) | masks[index][pos + delta]))
+            # Ties go to the smallest key, so the choice is deterministic
+            if distance > farthest or (distance == farthest and new_key < farthest_key):
+                farthest_key, farthest = new_key, distance
+        if max_states is not None and len(distances) > max_states:
+            return None
+    return farthest_key, farthest, len(distances)
+
+
+def generate_one(job):
+    """Build layout ``index`` of ``seed`` and return its hardest puzzle, or None."""
+    board, seed, index, slide_moves, min_vehicles, max_vehicles, max_states = job
+    rng = random.Random(seed * 1000003 + index)
+    signature = random_layout(board, rng, min_vehicles, max_vehicles)
+    if signature is None:
+        return None
+    layout = layout_from_signature(signature)
+    found = goal_distances(layout, slide_moves, max_states)
+    if found is None:
+        return None
+    key, distance, states = found
+    return index, signature, key, distance, states
+
+
+def existing_puzzles(output_dir, names):
+    """Canonical encodings of the puzzles in the map files ``names`` of ``output_dir``.
+
+    Unreadable files are skipped; they cannot be compared anyway.
+    """
+    encodings = set()
+    for name in names:
+        try:
+            for record in iter_puzzles(os.path.join(output_dir, name)):
+                layout = record.layout
+                encodings.add(canonical_puzzle(layout, layout.pack(record.positions)))
+        except (OSError, ValueError):
+            continue
+    return encodings
+
+
+def puzzle_lines(layout, key):
+    """Lines of a map file for the puzzle ``key`` of ``layout``."""
+    lines = []
+    board = layout.board
+    if board != STANDARD_BOARD:
+        lines.append(f"size {board.rows} {board.cols}")
+        lines.append(f"exit {board.exit_side} {board.exit_line}")
+    for vehicle in (layout.make_vehicle(i, pos) for i, pos in enumerate(layout.unpack(key))):
+        lines.append(f'("{vehicle.id}", {vehicle.row}, {vehicle.col}, {vehicle.length}, '
+                     f'"{vehicle.orientation}", {int(vehicle.is_target)})')
+    return lines
+
+
+def generate(output_dir, layouts=1000, seed=0, board=STANDARD_BOARD, slide_moves=False,
+             min_moves=1, min_vehicles=8, max_vehicles=13, max_states=500000, workers=None,
+             log=sys.stderr):
+    """Try ``layouts`` random layouts and write every new puzzle of at least ``min_moves``.
+
+    Files are numbered after the ``mapN.txt`` files already in
+    ``output_dir``, whose puzzles are not written again, and ``index.csv``
+    is extended. Returns the number of puzzles written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    index_path = os.path.join(output_dir, 'index.csv')
+    existing = [name for name in os.listdir(output_dir)
+                if name.startswith('map') and name.endswith('.txt') and name[3:-4].isdigit()]
+    number = max([int(name[3:-4]) for name in existing] + [0])
+
+    seen = existing_puzzles(output_dir, existing)
+    written = 0
+    jobs = [(board, seed, i, slide_moves, min_vehicles, max_vehicles, max_states)
+            for i in range(layouts)]
+    new_index = not os.path.exists(index_path)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool, \
+            open(index_path, 'a', newline='') as index_file:
+        index = csv.writer(index_file)
+        if new_index:
+            index.writerow(['map', 'moves', 'states', 'vehicles', 'layout'])
+        # map() keeps layout order, so numbering is reproducible
+        for found in pool.map(generate_one, jobs, chunksize=8):
+            if found is None:
+                continue
+            layout_number, signature, key, distance, states = found
+            layout = layout_from_signature(signature)
+            encoding = canonical_puzzle(layout, key)
+            if distance < min_moves or encoding in seen:
+                continue
+            seen.add(encoding)
+
+            number += 1
+            written += 1
+            name = f"map{number}.txt"
+            with open(os.path.join(output_dir, name), 'w') as f:
+                f.write('\n'.join(puzzle_lines(layout, key)) + '\n')
+            index.writerow([name, distance, states, len(layout), layout_number])
+            print(f"{name}: {distance} moves, {states} states (layout {layout_number})", file=log)
+    return written
+
+
+def add_arguments(parser):
+    parser.add_argument('-o', '--output', default='generated', help="output directory (default: generated)")
+    parser.add_argument('-n', '--layouts', type=int, default=1000, help="random layouts to try")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    parser.add_argument('--min-moves', type=int, default=1, help="keep puzzles needing at least this many moves")
+    parser.add_argument('--vehicles', default='8-13', help="vehicle count range, e.g. 8-13")
+    parser.add_argument('--size', type=int, nargs=2, metavar=('ROWS', 'COLS'), default=(6, 6),
+                        help="board size (default: 6 6)")
+    parser.add_argument('--exit', nargs='+', metavar='SIDE [LINE]', default=None,
+                        help="exit edge and row/column (default: right, middle row)")
+    parser.add_argument('--slide', action='store_true', help="count slides instead of single steps")
+    parser.add_argument('--max-states', type=int, default=500000,
+                        help="skip layouts with more solvable states than this")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+
+
+def main(args):
+    try:
+        low, _, high = args.vehicles.partition('-')
+        min_vehicles, max_vehicles = int(low), int(high or low)
+        if not 1 <= min_vehicles <= max_vehicles:
+            raise ValueError(f"vehicle count range must be 1 <= min <= max, got {args.vehicles}")
+        exit_side = args.exit[0] if args.exit else 'right'
+        exit_line = int(args.exit[1]) if args.exit and len(args.exit) > 1 else None
+        board = Board(args.size[0], args.size[1], exit_side, exit_line)
+    except ValueError as e:
+        print(f"Invalid arguments: {e}", file=sys.stderr)
+        return 2
+
+    count = generate(args.output, args.layouts, args.seed, board, args.slide, args.min_moves,
+                     min_vehicles, max_vehicles, args.max_states, args.workers)
+    print(f"{count} puzzles written to {args.output}", file=sys.stderr)
+    return 0
@@ -0,0 +1,379 @@
+"""
+Admissible heuristics working directly on the bitboard representation.
+
+A heuristic takes ``(layout, positions, occupancy, cost_model)`` so it can be
+evaluated on a ``State`` as well as on an in-place ``SearchCursor`` without
+building a board or a vehicle list. Every heuristic weights its terms by the
+cost model, so under ``'length'`` (the UCS cost) it is the length-weighted
+variant.
+
+Heuristics are registered by name in ``HEURISTICS``. ``update_heuristic``
+gives the value of a successor from the value of its parent: when the moved
+vehicle can never change the heuristic, the parent value is reused as is.
+
+``tests/test_heuristics.py`` checks admissibility, consistency and the
+incremental updates against exact costs (``heuristic_errors``). Running
+this file runs those tests, then compares nodes expanded by A* per
+heuristic on every map.
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _swept_cells(masks, pos, new_pos):
+    """Cells a vehicle newly covers while sliding from ``pos`` to ``new_pos``."""
+    swept = 0
+    for p in range(min(pos, new_pos), max(pos, new_pos) + 1):
+        swept |= masks[p]
+    return swept & ~masks[pos]
+
+
+class ExitLane:
+    """Precomputed exit-lane data of one layout (exit on any edge)."""
+
+    __slots__ = ('target_index', 'lanes', 'crossers', 'escapes', 'escape_cells')
+
+    def __init__(self, layout):
+        self.target_index = layout.target_index
+        engine = layout.engine
+        target = self.target_index
+        goal = layout.goal_position
+
+        # lanes[pos]: cells between the target at pos and the exit
+        target_masks = engine.masks[target]
+        self.lanes = [_swept_cells(target_masks, pos, goal)
+                      for pos in range(engine.max_positions[target] + 1)]
+
+        # Only vehicles whose line crosses the lane can ever block it
+        full_lane = 0
+        for lane in self.lanes:
+            full_lane |= lane
+        self.crossers = tuple(i for i in range(len(layout)) if i != target
+                              and any(mask & full_lane for mask in engine.masks[i]))
+
+        # escapes[i][pos]: (cells travelled, cells swept) for each way crosser i
+        # at pos can leave the target's line; empty if it does not cover the
+        # line or can never leave it (a car on the target's line itself).
+        line = layout.lines[target]
+        self.escapes = {}
+        self.escape_cells = 0
+        for i in self.crossers:
+            per_position = []
+            for pos in range(engine.max_positions[i] + 1):
+                options = []
+                if layout.orientations[i] != layout.orientations[target] \
+                        and pos <= line < pos + layout.lengths[i]:
+                    options = self._crossing_escapes(layout, i, pos, line)
+                for _, swept in options:
+                    self.escape_cells |= swept
+                per_position.append(tuple(options))
+            self.escapes[i] = per_position
+
+    @staticmethod
+    def _crossing_escapes(layout, index, pos, line):
+        masks = layout.engine.masks[index]
+        options = []
+        before = line - layout.lengths[index]  # last position entirely before the line
+        if before >= 0:
+            options.append((pos - before, _swept_cells(masks, pos, before)))
+        after = line + 1  # first position entirely past the line
+        if after <= layout.engine.max_positions[index]:
+            options.append((after - pos, _swept_cells(masks, pos, after)))
+        return options
+
+
+_lane_cache = {}
+
+
+def exit_lane(layout):
+    """Return the cached ``ExitLane`` of a layout, or None if it has no reachable exit."""
+    if layout.goal_position is None:
+        return None
+    lane = _lane_cache.get(layout)
+    if lane is None:
+        lane = ExitLane(layout)
+        _lane_cache[layout] = lane
+    return lane
+
+
+def _lane_blockers(lane_info, layout, positions, occupancy):
+    lane = lane_info.lanes[positions[lane_info.target_index]]
+    if not occupancy & lane:
+        return []
+    masks = layout.engine.masks
+    return [i for i in lane_info.crossers if masks[i][positions[i]] & lane]
+
+
+def _target_cost(layout, target, distance, cost_model):
+    if cost_model == 'slides':
+        return 1 if distance else 0
+    if cost_model == 'length':
+        return layout.lengths[target] * distance
+    return distance
+
+
+def zero_heuristic(layout, positions, occupancy, cost_model='steps'):
+    """Always 0: turns A* into UCS, the baseline for comparisons."""
+    return 0
+
+
+def blocking_cars(layout, positions, occupancy, cost_model='steps'):
+    """Distance of the target to the exit plus one move per car blocking its lane.
+
+    Every blocking car has to move at least one cell, and the target itself has
+    to cover the remaining distance, so this never overestimates under any of
+    the cost models in ``utils.moves``.
+    """
+    lane_info = exit_lane(layout)
+    if lane_info is None:
+        return 0
+
+    target = lane_info.target_index
+    blockers = _lane_blockers(lane_info, layout, positions, occupancy)
+    h = _target_cost(layout, target, abs(layout.goal_position - positions[target]), cost_model)
+    if cost_model == 'length':
+        lengths = layout.lengths
+        return h + sum(lengths[i] for i in blockers)
+    return h + len(blockers)
+
+
+def blockers_of_blockers(layout, positions, occupancy, cost_model='steps'):
+    """Blocking cars, plus how far they must travel and what blocks them in turn.
+
+    Each blocking car must leave the target row, either above or below it. It
+    has to travel at least the shorter of the two distances, and every other
+    car sitting in the cells it sweeps on the way out must move as well. Only
+    the largest of those second-level costs is added, because two blocking
+    cars may share the cars that obstruct them. A blocking car that can never
+    leave the row (one on the target row itself) makes the state a dead end.
+    """
+    lane_info = exit_lane(layout)
+    if lane_info is None:
+        return 0
+
+    target = lane_info.target_index
+    h = _target_cost(layout, target, abs(layout.goal_position - positions[target]), cost_model)
+    blockers = _lane_blockers(lane_info, layout, positions, occupancy)
+    if not blockers:
+        return h
+
+    masks = layout.engine.masks
+    lengths = layout.lengths
+    others = [i for i in range(len(layout)) if i != target and i not in blockers]
+    second_level = 0
+    for b in blockers:
+        options = lane_info.escapes[b][positions[b]]
+        if not options:
+            return float('inf')
+
+        least_travel = least_obstruction = None
+        for travel, swept in options:
+            obstruction = 0
+            if occupancy & swept:
+                for i in others:
+                    if masks[i][positions[i]] & swept:
+                        obstruction += lengths[i] if cost_model == 'length' else 1
+            if least_travel is None or travel < least_travel:
+                least_travel = travel
+            if least_obstruction is None or obstruction < least_obstruction:
+                least_obstruction = obstruction
+
+        if cost_model == 'slides':
+            h += 1
+        elif cost_model == 'length':
+            h += lengths[b] * least_travel
+        else:
+            h += least_travel
+        second_level = max(second_level, least_obstruction)
+
+    return h + second_level
+
+
+HEURISTICS = {
+    'zero': zero_heuristic,
+    'blocking': blocking_cars,
+    'blockers': blockers_of_blockers,
+}
+
+
+def get_heuristic(heuristic):
+    """Accept a heuristic function or its name in ``HEURISTICS``."""
+    if callable(heuristic):
+        return heuristic
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"Unknown heuristic: {heuristic}")
+    return HEURISTICS[heuristic]
+
+
+_relevant_cache = {}
+
+
+def _relevant_vehicles(heuristic, layout):
+    """Vehicles whose move can change ``heuristic``, or None if unknown (any can)."""
+    cache_key = (heuristic, layout)
+    if cache_key in _relevant_cache:
+        return _relevant_cache[cache_key]
+
+    lane_info = exit_lane(layout)
+    if heuristic is zero_heuristic or lane_info is None:
+        relevant = frozenset()
+    elif heuristic is blocking_cars:
+        relevant = frozenset(lane_info.crossers + (lane_info.target_index,))
+    elif heuristic is blockers_of_blockers:
+        masks = layout.engine.masks
+        cells = lane_info.escape_cells
+        relevant = frozenset(lane_info.crossers + (lane_info.target_index,)).union(
+            i for i in range(len(layout)) if any(mask & cells for mask in masks[i]))
+    else:
+        relevant = None
+    _relevant_cache[cache_key] = relevant
+    return relevant
+
+
+def update_heuristic(heuristic, layout, positions, occupancy, cost_model, parent_h, index):
+    """Heuristic of a successor reached by moving vehicle ``index``.
+
+    Reuses ``parent_h`` when that vehicle can never touch the cells the
+    heuristic looks at, otherwise evaluates it again.
+    """
+    relevant = _relevant_vehicles(heuristic, layout)
+    if relevant is not None and index not in relevant:
+        return parent_h
+    return heuristic(layout, positions, occupancy, cost_model)
+
+
+def _exact_costs(state, slide_moves, cost_model):
+    """Exact cost-to-go of every state reachable from ``state`` (Dijkstra from all goals)."""
+    import heapq
+    from utils.moves import move_cost
+
+    layout = state.layout
+    engine = layout.engine
+    masks = engine.masks
+    bits = layout.bits
+    generate = engine.generate_slides if slide_moves else engine.generate_moves
+
+    # Forward pass: the whole reachable component with its occupancies
+    occupancies = {state.key: state.occupancy}
+    queue = [state.key]
+    for key in queue:
+        positions = layout.unpack(key)
+        occupancy = occupancies[key]
+        for index, delta in generate(positions, occupancy):
+            new_key = key + (delta << (index * bits))
+            if new_key not in occupancies:
+                pos = positions[index]
+                occupancies[new_key] = (occupancy & ~masks[index][pos]) | masks[index][pos + delta]
+                queue.append(new_key)
+
+    # Backward pass: moves are reversible with the same cost, so successors are predecessors
+    costs = {}
+    heap = [(0, key) for key in occupancies if layout.is_goal(key)]
+    heapq.heapify(heap)
+    while heap:
+        cost, key = heapq.heappop(heap)
+        if key in costs:
+            continue
+        costs[key] = cost
+        positions = layout.unpack(key)
+        for index, delta in generate(positions, occupancies[key]):
+            new_key = key + (delta << (index * bits))
+            if new_key not in costs:
+                heapq.heappush(heap, (cost + move_cost(layout, index, delta, cost_model), new_key))
+    return occupancies, costs
+
+
+def heuristic_errors(state, h_func, slide_moves, cost_model, exact=None, max_states=None):
+    """Check ``h_func`` on every state reachable from ``state``.
+
+    Returns three lists: states where h exceeds the exact cost-to-go (not
+    admissible), edges ``(key, move, new key)`` where h drops by more than
+    the move cost (not consistent) and edges where ``update_heuristic``
+    disagrees with a full evaluation. ``exact`` is the result of
+    ``_exact_costs`` for the same arguments, if already computed. With
+    ``max_states``, only that many states spread evenly over the component
+    (and the edges leaving them) are checked.
+    """
+    from utils.moves import move_cost
+
+    layout = state.layout
+    bits = layout.bits
+    generate = layout.engine.generate_slides if slide_moves else layout.engine.generate_moves
+    occupancies, costs = exact or _exact_costs(state, slide_moves, cost_model)
+    keys = list(occupancies)
+    if max_states is not None and len(keys) > max_states:
+        step = len(keys) / max_states
+        keys = [keys[int(n * step)] for n in range(max_states)]
+
+    evaluated = {}  # key -> (positions, h)
+
+    def evaluate(key):
+        entry = evaluated.get(key)
+        if entry is None:
+            positions = layout.unpack(key)
+            entry = evaluated[key] = (positions, h_func(layout, positions, occupancies[key], cost_model))
+        return entry
+
+    inadmissible, inconsistent, wrong_updates = [], [], []
+    for key in keys:
+        positions, h = evaluate(key)
+        if key in costs and h > costs[key]:
+            inadmissible.append(key)
+        for index, delta in generate(positions, occupancies[key]):
+            new_key = key + (delta << (index * bits))
+            new_positions, new_h = evaluate(new_key)
+            if h > move_cost(layout, index, delta, cost_model) + new_h:
+                inconsistent.append((key, (index, delta), new_key))
+            updated = update_heuristic(h_func, layout, new_positions,
+                                       occupancies[new_key], cost_model, h, index)
+            if updated != new_h:
+                wrong_updates.append((key, (index, delta), new_key))
+    return inadmissible, inconsistent, wrong_updates
+
+
+def compare_heuristics(map_ids=range(1, 16), slide_moves=False, cost_model='length'):
+    """Nodes expanded by A* with each heuristic on every map."""
+    import time
+    from utils.state import State
+    from utils.utils import import_map
+    from solver.aStar_solver import aStar_solver
+
+    names = list(HEURISTICS)
+    print(f"A* nodes expanded per heuristic (cost model: {cost_model}, "
+          f"{'slide' if slide_moves else 'step'} moves)")
+    print(f"{'map':<6}{'cost':>6}" + "".join(f"{name:>12}" for name in names)
+          + "".join(f"{name + ' (s)':>14}" for name in names))
+    for map_id in map_ids:
+        vehicles = import_map(map_id)
+        if not vehicles:
+            continue
+        state = State(vehicles)
+        costs = set()
+        expanded = []
+        times = []
+        for name in names:
+            start = time.perf_counter()
+            cost, nodes_expanded, _ = aStar_solver(state, slide_moves=slide_moves,
+                                                   cost_model=cost_model, heuristic=name)
+            times.append(time.perf_counter() - start)
+            costs.add(cost)
+            expanded.append(nodes_expanded)
+        # Every heuristic is admissible, so all of them must agree on the optimal cost
+        cost = costs.pop() if len(costs) == 1 else f"{sorted(costs, key=str)}!"
+        print(f"map{map_id:<3}{str(cost):>6}" + "".join(f"{n:>12}" for n in expanded)
+              + "".join(f"{t:>14.2f}" for t in times))
+
+
+if __name__ == "__main__":
+    # Admissibility/consistency checks live in tests/test_heuristics.py
+    import pytest
+
+    tests = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'tests', 'test_heuristics.py')
+    exit_code = pytest.main(['-q', tests])
+    print()
+    compare_heuristics()
+    sys.exit(exit_code)
@@ -0,0 +1,215 @@
+import sys
+import os
+from array import array
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cursor import SearchCursor
+from utils.moves import move_cost
+from utils.search_stats import clock
+from utils.progress import make_reporter
+from solver.heuristics import blockers_of_blockers, get_heuristic, update_heuristic
+
+# Rough size of one transposition table slot: list pointer, packed key int,
+# g value and iteration stamp.
+TT_ENTRY_BYTES = 64
+
+class TranspositionTable:
+    """Fixed-size table of (key, g) for the current IDA* iteration.
+
+    Memory is capped by the number of slots. Each bucket has two slots: a
+    depth-preferred one that keeps the entry closest to the root (it prunes
+    the largest subtree) and an always-replace one for recent entries, so two
+    colliding neighbours cannot keep evicting each other. Entries left over
+    from an earlier iteration count as empty.
+    """
+
+    def __init__(self, max_mb):
+        self.buckets = max(1, int(max_mb * 1024 * 1024) // (2 * TT_ENTRY_BYTES))
+        size = 2 * self.buckets
+        self.keys = [None] * size
+        self.g_values = array('i', [0]) * size
+        self.stamps = array('i', [0]) * size
+        self.iteration = 0
+        self.evicted = False  # an entry of the current iteration was overwritten
+
+    def new_iteration(self):
+        self.iteration += 1
+        self.evicted = False
+
+    def _bucket(self, key):
+        # Packed keys differ only in a few bits, so mix them before taking the modulo
+        return 2 * (((key * 0x9E3779B97F4A7C15) >> 32) % self.buckets)
+
+    def seen_cheaper(self, key, g):
+        """True if ``key`` was already reached with cost <= g in this iteration."""
+        slot = self._bucket(key)
+        for s in (slot, slot + 1):
+            if self.stamps[s] == self.iteration and self.keys[s] == key:
+                return self.g_values[s] <= g
+        return False
+
+    def contains(self, key):
+        slot = self._bucket(key)
+        return ((self.stamps[slot] == self.iteration and self.keys[slot] == key)
+                or (self.stamps[slot + 1] == self.iteration and self.keys[slot + 1] == key))
+
+    def store(self, key, g):
+        slot = self._bucket(key)
+        iteration = self.iteration
+        if self.stamps[slot] == iteration and self.keys[slot] == key:
+            self._write(slot, key, g)
+        elif self.stamps[slot + 1] == iteration and self.keys[slot + 1] == key:
+            self._write(slot + 1, key, g)
+        elif self.stamps[slot] != iteration or g <= self.g_values[slot]:
+            # The new entry takes the depth-preferred slot, the old one moves down
+            if self.stamps[slot] == iteration:
+                self._write(slot + 1, self.keys[slot], self.g_values[slot])
+            self._write(slot, key, g)
+        else:
+            self._write(slot + 1, key, g)
+
+    def _write(self, slot, key, g):
+        if self.stamps[slot] == self.iteration and self.keys[slot] != key:
+            self.evicted = True
+        self.keys[slot] = key
+        self.g_values[slot] = g
+        self.stamps[slot] = self.iteration
+
+def ida_star_solver(initial_state, cancel_flag=None, slide_moves=False, cost_model='length',
+                    heuristic=blockers_of_blockers, table_mb=64, stats=None, progress=None):
+    # IDA*: DFS theo ngưỡng f tăng dần, bộ nhớ cố định nhờ bảng chuyển vị giới hạn table_mb
+
+    layout = initial_state.layout
+    cursor = SearchCursor(initial_state, slide_moves)
+    if cursor.is_solved():
+        return 0, 0, []
+
+    heuristic = get_heuristic(heuristic)
+    table = TranspositionTable(table_mb)
+    nodes_expanded = 0
+
+    # Bộ đếm thống kê: frontier = độ sâu lớn nhất, visited = số state lưu trong bảng
+    generated = duplicates = peak_depth = stored = 0
+    timed = stats is not None and stats.timed
+    reporter = make_reporter(progress, 'IDA*')
+
+    def report():
+        if stats is not None:
+            stats.update(generated, nodes_expanded, duplicates, peak_depth,
+                         min(stored, len(table.keys)))
+            stats.bytes_per_state = TT_ENTRY_BYTES
+
+    h_start = heuristic(layout, cursor.positions, cursor.occupancy, cost_model)
+    if h_start == float('inf'):
+        report()
+        return None, nodes_expanded, []
+    bound = h_start
+
+    while True:
+        table.new_iteration()
+        table.store(cursor.key, 0)
+        stored = 1
+        next_bound = None
+        # Keys cut off by the bound; if all of them were expanded anyway, the
+        # whole reachable component has been searched and there is no solution.
+        cut_keys = []
+
+        # Explicit stack: one frame per depth holding its move list, next move, g and h
+        move_lists = [cursor.moves()]
+        next_moves = [0]
+        g_stack = [0]
+        h_stack = [h_start]
+        nodes_expanded += 1
+
+        while move_lists:
+            if cancel_flag and cancel_flag.is_set():
+                report()
+                return None
+
+            moves = move_lists[-1]
+            i = next_moves[-1]
+            if i == len(moves):
+                move_lists.pop()
+                next_moves.pop()
+                g_stack.pop()
+                h_stack.pop()
+                if cursor.stack:
+                    cursor.undo()
+                continue
+            next_moves[-1] = i + 1
+
+            index, delta = moves[i]
+            if cursor.stack:
+                last_index, last_delta = cursor.stack[-1]
+                # Undoing the previous move never helps; in slide mode neither
+                # does moving the same vehicle twice in a row.
+                if last_index == index and (slide_moves or last_delta == -delta):
+                    continue
+
+            g = g_stack[-1] + move_cost(layout, index, delta, cost_model)
+            cursor.apply((index, delta))
+            generated += 1
+
+            # A state already reached more cheaply this iteration adds nothing,
+            # not even a candidate for the next bound.
+            key = cursor.key
+            if timed:
+                t = clock()
+            seen = table.seen_cheaper(key, g)
+            if timed:
+                stats.add_time('hashing', clock() - t)
+            if seen:
+                duplicates += 1
+                cursor.undo()
+                continue
+
+            if timed:
+                t = clock()
+            h = update_heuristic(heuristic, layout, cursor.positions, cursor.occupancy,
+                                 cost_model, h_stack[-1], index)
+            if timed:
+                stats.add_time('heuristic', clock() - t)
+            if h == float('inf'):
+                # Dead end: no bound will ever let it through
+                cursor.undo()
+                continue
+            f = g + h
+            if f > bound:
+                if next_bound is None or f < next_bound:
+                    next_bound = f
+                if cut_keys is not None:
+                    cut_keys.append(key)
+                    if len(cut_keys) > table.buckets:
+                        cut_keys = None
+                cursor.undo()
+                continue
+
+            if cursor.is_solved():
+                report()
+                return g, nodes_expanded, cursor.path()
+
+            table.store(key, g)
+            stored += 1
+
+            nodes_expanded += 1
+            if len(g_stack) > peak_depth:
+                peak_depth = len(g_stack)
+            if reporter is not None and reporter.due(nodes_expanded):
+                reporter.report(nodes_expanded, len(g_stack), len(g_stack), bound, g)
+            if timed:
+                t = clock()
+            move_lists.append(cursor.moves())
+            if timed:
+                stats.add_time('movegen', clock() - t)
+            next_moves.append(0)
+            g_stack.append(g)
+            h_stack.append(h)
+
+        if next_bound is None:
+            report()
+            return None, nodes_expanded, []
+        if cut_keys is not None and not table.evicted and all(table.contains(k) for k in cut_keys):
+            report()
+            return None, nodes_expanded, []
+        bound = next_bound
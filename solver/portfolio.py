@@ -0,0 +1,189 @@
+"""
+Portfolio ("race") solving: run several solvers at once, keep the first answer.
+
+Which solver finishes first depends a lot on the puzzle: DFS sometimes
+returns a long path instantly, elsewhere A* or the distance table wins. A
+``Portfolio`` keeps one ``SolverWorker`` process per solver, starts them all
+on the same puzzle and returns as soon as one result meets the requested
+guarantee; the other workers are then terminated.
+
+Guarantees:
+
+- ``'any'``: the first solution (or proof that there is none) wins,
+- ``'optimal:<cost model>'``: only solvers that are optimal for that cost
+  model take part (see ``registry.OPTIMAL_FOR``); the cost model is passed to
+  the solvers that take one.
+
+Command line: ``python -m solver race MAP [--guarantee optimal:length]``.
+"""
+
+import contextlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import namedtuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solver.registry import SOLVERS, accepts_cost_model, get_solver, is_optimal, solver_name
+from solver.worker import SolverWorker, POLL_INTERVAL
+from utils.moves import COST_MODELS
+from utils.results import is_incomplete
+
+RaceResult = namedtuple('RaceResult', [
+    'winner',    # name of the solver whose result was returned, or None
+    'result',    # its (cost, nodes_expanded, path), or None
+    'elapsed',   # seconds until the winner answered
+    'outcomes',  # {name: (status, seconds)} of every solver that took part
+])
+
+
+def parse_guarantee(guarantee):
+    """Cost model required by a guarantee string, or None for 'any'."""
+    if guarantee == 'any':
+        return None
+    kind, _, cost_model = guarantee.partition(':')
+    if kind != 'optimal' or cost_model not in COST_MODELS:
+        raise ValueError(f"Unknown guarantee '{guarantee}' "
+                         f"(use 'any' or 'optimal:' + one of {', '.join(COST_MODELS)})")
+    return cost_model
+
+
+class Portfolio:
+    """A set of solvers, each with its own reusable worker process."""
+
+    def __init__(self, solvers, context='spawn'):
+        # solvers: {display name: solver function}
+        self.solvers = dict(solvers)
+        self.workers = {name: SolverWorker(context) for name in self.solvers}
+
+    def close(self):
+        for worker in self.workers.values():
+            worker.close()
+
+    def entrants(self, cost_model=None, slide_moves=False):
+        """Solvers that can meet the guarantee of ``cost_model`` (all when None)."""
+        if cost_model is None:
+            return list(self.solvers)
+        return [name for name, solver in self.solvers.items()
+                if is_optimal(solver_name(solver), cost_model, slide_moves)]
+
+    def race(self, state, guarantee='any', slide_moves=False, cancel_flag=None, progress=None):
+        """Solve ``state`` with every entrant at once and return a ``RaceResult``.
+
+        ``winner`` is None when the race was cancelled or every entrant
+        failed; ``outcomes`` then tells why.
+        """
+        cost_model = parse_guarantee(guarantee)
+        names = self.entrants(cost_model, slide_moves)
+        if not names:
+            raise ValueError(f"No solver in the portfolio guarantees '{guarantee}'")
+
+        stop = threading.Event()
+        answers = queue.Queue()
+        start = time.perf_counter()
+
+        def run(name):
+            solver = self.solvers[name]
+            options = {}
+            if cost_model is not None and accepts_cost_model(solver_name(solver)):
+                options['cost_model'] = cost_model
+            try:
+                result = self.workers[name].solve(solver, state, stop, slide_moves,
+                                                  progress=progress, **options)
+                answers.put((name, result, None, time.perf_counter() - start))
+            except Exception as e:
+                answers.put((name, None, str(e), time.perf_counter() - start))
+
+        threads = [threading.Thread(target=run, args=(name,), daemon=True) for name in names]
+        for thread in threads:
+            thread.start()
+
+        outcomes = {}
+        winner = None
+        try:
+            while len(outcomes) < len(names):
+                if cancel_flag is not None and cancel_flag.is_set():
+                    break
+                try:
+                    name, result, error, elapsed = answers.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if error is not None:
+                    outcomes[name] = (f"error: {error}", elapsed)
+                elif result is None:
+                    outcomes[name] = ('cancelled', elapsed)
+                elif is_incomplete(result):
+                    # Gave up without a path: the other entrants keep going
+                    outcomes[name] = ('incomplete', elapsed)
+                else:
+                    # Every entrant meets the guarantee, solved or proven unsolvable
+                    outcomes[name] = ('won', elapsed)
+                    winner = (name, result, elapsed)
+                    break
+        finally:
+            # Losers are terminated; their workers restart on the next race
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        for name in names:
+            outcomes.setdefault(name, ('cancelled', time.perf_counter() - start))
+        if winner is None:
+            return RaceResult(None, None, time.perf_counter() - start, outcomes)
+        return RaceResult(winner[0], winner[1], winner[2], outcomes)
+
+
+def add_arguments(parser):
+    parser.add_argument('map', help="map file")
+    parser.add_argument('-a', '--algorithms', default='all',
+                        help=f"comma-separated algorithms ({', '.join(SOLVERS)}) or 'all'")
+    parser.add_argument('-g', '--guarantee', default='any',
+                        help="'any' or 'optimal:<cost model>' (" + ', '.join(COST_MODELS) + ")")
+    parser.add_argument('--slide', action='store_true', help="use slide moves instead of single steps")
+    parser.add_argument('--timeout', type=float, default=None, help="give up after this many seconds")
+
+
+def main(args):
+    from solver.batch import load_state
+
+    algorithms = list(SOLVERS) if args.algorithms == 'all' else \
+        [name.strip() for name in args.algorithms.split(',') if name.strip()]
+    for name in algorithms:
+        if name not in SOLVERS:
+            print(f"Unknown algorithm '{name}' (choose from {', '.join(SOLVERS)})", file=sys.stderr)
+            return 2
+    with contextlib.redirect_stdout(sys.stderr):
+        state = load_state(args.map)
+    if state is None:
+        print(f"Cannot load {args.map}", file=sys.stderr)
+        return 2
+
+    cancel_flag = threading.Event()
+    if args.timeout is not None:
+        timer = threading.Timer(args.timeout, cancel_flag.set)
+        timer.daemon = True
+        timer.start()
+
+    portfolio = Portfolio({name: get_solver(name) for name in algorithms})
+    try:
+        race = portfolio.race(state, args.guarantee, args.slide, cancel_flag)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        portfolio.close()
+
+    record = {'map': args.map, 'guarantee': args.guarantee, 'slide_moves': args.slide,
+              'winner': race.winner, 'cost': None, 'steps': None, 'path': None,
+              'elapsed': round(race.elapsed, 6),
+              'outcomes': {name: {'status': status, 'seconds': round(seconds, 6)}
+                           for name, (status, seconds) in race.outcomes.items()}}
+    if race.result is not None:
+        cost, _, path = race.result
+        record.update(cost=cost, steps=len(path), path=[list(move) for move in path])
+    print(json.dumps(record))
+    return 0 if race.winner is not None else 1
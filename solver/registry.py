@@ -0,0 +1,75 @@
+"""
+Name -> solver function lookup for the command line tools.
+
+Solvers are imported lazily, so a worker process only loads the modules of
+the algorithms it actually runs.
+"""
+
+import importlib
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# name: (module, function, accepts cost_model)
+SOLVERS = {
+    'dfs': ('solver.dfs_solver', 'dfs_solver', False),
+    'bfs': ('solver.bfs_solver', 'bfs_solver', False),
+    'ucs': ('solver.ucs_solver', 'ucs', True),
+    'astar': ('solver.aStar_solver', 'aStar_solver', True),
+    'ara': ('solver.anytime_astar', 'anytime_astar', True),
+    'bibfs': ('solver.bidirectional_bfs', 'bidirectional_bfs', False),
+    'ida': ('solver.ida_star_solver', 'ida_star_solver', True),
+    'table': ('solver.retrograde_solver', 'retrograde_solver', False),
+    'beam': ('solver.beam_search', 'beam_search', True),
+}
+
+# What a solver's result is guaranteed optimal for:
+#   'cost_model': the cost model it is given
+#   'moves':      the number of moves of the chosen move mode
+#   None:         nothing (any solution)
+OPTIMAL_FOR = {
+    'dfs': 'moves',
+    'bfs': 'moves',
+    'ucs': 'cost_model',
+    'astar': 'cost_model',
+    'ara': 'cost_model',  # without time_limit it only returns once the path is proven optimal
+    'bibfs': 'moves',
+    'ida': 'cost_model',
+    'table': 'moves',
+    'beam': None,
+}
+
+
+def get_solver(name):
+    """Return the solver function registered as ``name``."""
+    if name not in SOLVERS:
+        raise ValueError(f"Unknown algorithm '{name}' (choose from {', '.join(SOLVERS)})")
+    module_name, function_name, _ = SOLVERS[name]
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def accepts_cost_model(name):
+    return SOLVERS[name][2]
+
+
+def solver_name(solver):
+    """Registry name of a solver function, or None if it is not registered."""
+    for name, (module_name, function_name, _) in SOLVERS.items():
+        if solver.__module__ == module_name and solver.__name__ == function_name:
+            return name
+    return None
+
+
+def is_optimal(name, cost_model, slide_moves=False):
+    """True if solver ``name`` always returns an optimal path under ``cost_model``.
+
+    A move count is the 'slides' cost in either mode, and also the 'steps'
+    cost in step mode where every move is one cell.
+    """
+    kind = OPTIMAL_FOR.get(name)
+    if kind == 'cost_model':
+        return True
+    if kind == 'moves':
+        return cost_model == 'slides' or (cost_model == 'steps' and not slide_moves)
+    return False
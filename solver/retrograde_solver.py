@@ -0,0 +1,83 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.distance_table import TABLE_DIR, UNSOLVABLE, get_distance_table
+from utils.progress import make_reporter
+
+def retrograde_solver(initial_state, cancel_flag=None, slide_moves=False, stats=None, progress=None,
+                      table_dir=TABLE_DIR):
+    # Đi tham lam theo bảng khoảng cách: mỗi bước chọn trạng thái con gần đích hơn 1 bước.
+    # Lần đầu gặp một puzzle thì bảng được dựng (BFS ngược) và lưu lại trên đĩa (table_dir).
+
+    if initial_state.is_solved():
+        return 0, 0, []
+
+    reporter = make_reporter(progress, 'Table')
+    table = get_distance_table(initial_state, slide_moves, cancel_flag, table_dir)
+    if reporter is not None:
+        # Building the table is the only slow part; the walk itself is instant
+        reporter.report(0, None, 0, None, None, force=True)
+    if table is None:
+        return None
+
+    try:
+        layout = initial_state.layout
+        state = initial_state
+        distance = table.distance(state.key)
+        if distance == UNSOLVABLE:
+            return None, 0, []
+
+        nodes_expanded = 0
+        lookups = 0
+        path = []
+        while distance > 0:
+            if cancel_flag and cancel_flag.is_set():
+                return None
+            nodes_expanded += 1
+            for index, delta in state.get_moves(slide_moves):
+                next_key = state.key + (delta << layout.shift(index))
+                lookups += 1
+                if table.distance(next_key) == distance - 1:
+                    state = state.apply_move(index, delta)
+                    path.append(layout.encode_move(index, delta, slide_moves))
+                    distance -= 1
+                    break
+            else:
+                raise RuntimeError(f"Distance table {table.path} is inconsistent")
+
+        if stats is not None:
+            # Lookups play the role of generated nodes; the table itself is the visited set
+            stats.update(lookups, nodes_expanded, 0, 1, len(table))
+            stats.bytes_per_state = table.width + table.distance_width
+        return len(path), nodes_expanded, path
+    finally:
+        table.close()
+
+def precompute(map_ids, slide_moves=False):
+    """Build and save the distance table of every given map."""
+    import time
+    from utils.utils import import_map
+    from utils.state import State
+
+    for map_id in map_ids:
+        vehicles = import_map(map_id)
+        if not vehicles:
+            continue
+        state = State(vehicles)
+        start = time.perf_counter()
+        table = get_distance_table(state, slide_moves)
+        elapsed = time.perf_counter() - start
+        distance = table.distance(state.key)
+        print(f"map{map_id:<4} states={len(table):<8} "
+              f"distance={'unsolvable' if distance == UNSOLVABLE else distance:<10} "
+              f"{elapsed:.2f}s  {table.path}")
+        table.close()
+
+if __name__ == "__main__":
+    # python solver/retrograde_solver.py [--slide] [map ids...]
+    args = sys.argv[1:]
+    slide = '--slide' in args
+    ids = [int(a) for a in args if a != '--slide'] or range(1, 16)
+    precompute(ids, slide)
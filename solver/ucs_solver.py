@@ -1,4 +1,3 @@
-import heapq #priority queue usage
 import sys
 import os
 
@@ -7,49 +6,82 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.state import State
 from utils.vehicle import Vehicle
-GRID_COL = 6
-GRID_ROW = 6
+from utils.moves import move_cost as get_move_cost
+from utils.node_store import NodeStore
+from utils.open_list import make_open_list
+from utils.search_stats import clock
+from utils.progress import make_reporter
 
-def ucs(initial_state, cancel_flag=None):
-    pq = []
-    counter = 0
+def ucs(initial_state, cancel_flag=None, slide_moves=False, cost_model='length', stats=None,
+        progress=None):
+    # cost_model: 'steps', 'slides' hoặc 'length' (mặc định, chi phí theo chiều dài xe)
+    # Chi phí là số nguyên nhỏ nên dùng hàng đợi bucket (utils/open_list.py);
+    # open_list.best_g vừa là g tốt nhất vừa là tập state đã gặp.
+    open_list = make_open_list()
     expanded_nodes = 0
-    heapq.heappush(pq, (0, counter, initial_state, [])) # (cost, counter, state, path)
-    frontier = set()
+    nodes = NodeStore(initial_state.layout, slide_moves)  # path lưu bằng con trỏ cha
+    open_list.push(initial_state.key, 0, 0, (initial_state, NodeStore.ROOT))
     
-    while pq:
+    # Bộ đếm thống kê (stats), chỉ đo thời gian từng pha khi stats.timed
+    generated = duplicates = peak_frontier = 0
+    timed = stats is not None and stats.timed
+    reporter = make_reporter(progress, 'UCS')
+    
+    def report():
+        if stats is not None:
+            stats.update(generated, expanded_nodes, duplicates, peak_frontier, len(open_list.best_g))
+            stats.estimate_state_bytes(open_list.best_g, initial_state.key, nodes.bytes_per_node,
+                                       [initial_state.key, 0, (initial_state, NodeStore.ROOT)])
+    
+    while open_list:
         if cancel_flag and cancel_flag.is_set():
+            report()
             return None
         
-        cost, _, curr_state, path = heapq.heappop(pq)
-        
-        if (curr_state in frontier):
-            continue
+        if len(open_list) > peak_frontier:
+            peak_frontier = len(open_list)
+        if timed:
+            t = clock()
+        cost, _, _, (curr_state, node) = open_list.pop()
+        if timed:
+            stats.add_time('queue', clock() - t)
         
         if (curr_state.is_solved()):
-            return cost, expanded_nodes, path
+            report()
+            return cost, expanded_nodes, nodes.path(node)
         
-        # Add to frontier and increment expanded nodes
-        frontier.add(curr_state)
         expanded_nodes += 1
+        if reporter is not None and reporter.due(expanded_nodes):
+            reporter.report(expanded_nodes, len(open_list), nodes.depth(node), None, cost)
         
-        next_moves = curr_state.get_all_possible_moves()
+        layout = curr_state.layout
+        if timed:
+            t = clock()
+        next_moves = curr_state.get_moves(slide_moves)
+        if timed:
+            stats.add_time('movegen', clock() - t)
         
-        for v_id, move in next_moves:
-           new_state = curr_state.move_vehicle(v_id, move)
+        for index, delta in next_moves:
+           new_state = curr_state.apply_move(index, delta)
            if new_state is None:
                continue
+           generated += 1
            
-           # Check if new state has already been explored
-           if new_state in frontier:
+           new_cost = cost + get_move_cost(layout, index, delta, cost_model)
+           if timed:
+               t = clock()
+           # Bị từ chối nếu state đã có trong hàng đợi hoặc đã mở rộng với chi phí <= new_cost.
+           # len(nodes) là id mà nodes.add bên dưới sẽ trả về.
+           queued = open_list.push(new_state.key, new_cost, new_cost, (new_state, len(nodes)))
+           if timed:
+               stats.add_time('queue', clock() - t)
+           if not queued:
+               duplicates += 1
                continue
-           
-           move_cost = 1 * curr_state.get_vehicle_by_id(v_id).length
-           new_path = path + [(v_id, move)]
-           counter += 1
-           heapq.heappush(pq, (cost + move_cost, counter, new_state, new_path))
+           nodes.add(node, index, delta)
            
            
+    report()
     return None, expanded_nodes, []
 
 def test_ucs_solver():
@@ -121,10 +153,10 @@ def test_ucs_solver():
                 # Verify solution by applying path
                 print("🔍 Verifying solution...")
                 current_state = initial_state
-                for i, (vehicle_id, direction) in enumerate(path):
-                    current_state = current_state.move_vehicle(vehicle_id, direction)
+                for i, move in enumerate(path):
+                    current_state = current_state.move_vehicle(*move)
                     if current_state is None:
-                        print(f"❌ Invalid move at step {i+1}: {vehicle_id} {direction}")
+                        print(f"❌ Invalid move at step {i+1}: {move}")
                         break
                 
                 if current_state and current_state.is_solved():
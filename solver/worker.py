@@ -0,0 +1,215 @@
+"""
+Run solvers in a separate worker process.
+
+The search loops are pure Python, so a solver running on a thread of the GUI
+process holds the GIL and makes the Tk main loop stutter. A ``SolverWorker``
+owns one child process that solves requests sent over a ``Pipe``:
+
+- a request is the solver's module and function name, the layout signature
+  and packed key of the initial state, and the solver options, so no State
+  or Vehicle objects are pickled,
+- the worker answers with ``('progress', fields)`` messages while it
+  searches (only when a progress callback was given), ``('solution', cost,
+  path, bound)`` for every improved path of an anytime solver (only when an
+  ``on_solution`` callback was given) and one final ``('done', result,
+  stats)`` or ``('error', message)``,
+- the process stays alive between solves, so only the first solve pays for
+  starting it and later ones reuse its warm layout/move tables,
+- cancelling terminates the process, which works even for code that never
+  polls ``cancel_flag``; the next solve starts a fresh one.
+
+``worker.bind(solver)`` returns a callable with the usual solver signature,
+so it can be passed anywhere a solver function is expected (e.g.
+``SolutionCache.solve``).
+"""
+
+import importlib
+import multiprocessing
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.progress import ProgressEvent
+
+# How often the parent checks cancel_flag while waiting for a message
+POLL_INTERVAL = 0.05
+
+
+def _serve(conn):
+    """Main loop of the worker process."""
+    from utils.layout import layout_from_signature
+    from utils.results import is_incomplete
+    from utils.search_stats import SearchStats, run_solver
+    from utils.state import State
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if request is None:
+            return
+
+        module_name, function_name, signature, key, slide_moves, options, \
+            want_progress, want_solutions, timed, deep_memory = request
+        try:
+            solver = getattr(importlib.import_module(module_name), function_name)
+            state = State.from_key(layout_from_signature(signature), key)
+            if want_progress:
+                options['progress'] = lambda event: conn.send(('progress', tuple(event)))
+            if want_solutions:
+                options['on_solution'] = lambda cost, path, bound: conn.send(
+                    ('solution', cost, [tuple(move) for move in path], bound))
+            stats = SearchStats(timed)
+            result = run_solver(solver, state, stats, deep_memory,
+                                slide_moves=slide_moves, **options)
+            if result is not None and not is_incomplete(result):
+                cost, nodes_expanded, path = result
+                result = (cost, nodes_expanded, [tuple(move) for move in path])
+            conn.send(('done', result, stats.as_dict()))
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}"))
+
+
+class SolverWorker:
+    """A reusable solver process; one solve at a time."""
+
+    def __init__(self, context='spawn'):
+        # 'spawn' by default: forking a process that runs Tk and threads is not safe
+        self.context = multiprocessing.get_context(context)
+        self.process = None
+        self.conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        """Start the worker process if it is not running."""
+        if self.alive:
+            return
+        self._discard()
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(target=_serve, args=(child_conn,),
+                                            name='rush-hour-solver', daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def terminate(self):
+        """Kill the worker (hard cancel); the next solve starts a new one."""
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+        self._discard()
+
+    def close(self):
+        """Stop the worker, politely if it is idle."""
+        if self.alive and not self._lock.locked():
+            try:
+                self.conn.send(None)
+                self.process.join(1)
+            except (OSError, BrokenPipeError):
+                pass
+        self.terminate()
+
+    def _discard(self):
+        if self.process is not None:
+            self.process.join(1)
+            self.process = None
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def bind(self, solver):
+        """A solver-like callable that runs ``solver`` in this worker."""
+        return RemoteSolver(self, solver)
+
+    def solve(self, solver, state, cancel_flag=None, slide_moves=False, stats=None,
+              progress=None, deep_memory=False, **options):
+        """Run ``solver`` on ``state`` in the worker and wait for its result.
+
+        Returns what the solver returns, or None if ``cancel_flag`` was set
+        (the worker is then terminated). Solver exceptions are re-raised as
+        RuntimeError with the original message.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("Solver worker is busy")
+        # Callbacks cannot be pickled; the worker sends their calls back as messages
+        on_solution = options.pop('on_solution', None)
+        try:
+            self.start()
+            self.conn.send((solver.__module__, solver.__name__, state.layout.signature,
+                            state.key, slide_moves, options, progress is not None,
+                            on_solution is not None, stats is not None and stats.timed,
+                            deep_memory))
+            while True:
+                if cancel_flag is not None and cancel_flag.is_set():
+                    self.terminate()
+                    return None
+                if not self.conn.poll(POLL_INTERVAL):
+                    if not self.process.is_alive():
+                        exit_code = self.process.exitcode
+                        self._discard()
+                        raise RuntimeError(f"Solver worker died (exit code {exit_code})")
+                    continue
+
+                message = self.conn.recv()
+                if message[0] == 'progress':
+                    progress(ProgressEvent(*message[1]))
+                elif message[0] == 'solution':
+                    on_solution(*message[1:])
+                elif message[0] == 'done':
+                    _, result, stats_data = message
+                    if stats is not None:
+                        stats.update_from_dict(stats_data)
+                    return result
+                else:
+                    raise RuntimeError(message[1])
+        except (EOFError, OSError):
+            self._discard()
+            raise RuntimeError("Lost connection to the solver worker")
+        finally:
+            self._lock.release()
+
+
+class RemoteSolver:
+    """Callable with the solver signature that forwards to a ``SolverWorker``."""
+
+    # Tells run_solver to leave timing and tracing to the worker
+    runs_remotely = True
+
+    def __init__(self, worker, solver):
+        self.worker = worker
+        self.solver = solver
+        self.__module__ = solver.__module__
+        self.__name__ = solver.__name__
+
+    def __call__(self, state, cancel_flag=None, slide_moves=False, **options):
+        return self.worker.solve(self.solver, state, cancel_flag, slide_moves, **options)
+
+
+if __name__ == "__main__":
+    # python solver/worker.py [map id] : solve one map with every solver in a worker
+    import time
+    from solver.registry import SOLVERS, get_solver
+    from utils.search_stats import SearchStats
+    from utils.state import State
+    from utils.utils import import_map
+
+    map_id = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    state = State(import_map(map_id))
+    worker = SolverWorker()
+    for name in SOLVERS:
+        stats = SearchStats()
+        start = time.perf_counter()
+        try:
+            cost, nodes, path = worker.solve(get_solver(name), state, stats=stats)
+        except RuntimeError as e:
+            print(f"{name:<6} failed: {e}")
+            continue
+        print(f"{name:<6} cost={cost} nodes={nodes} solver={stats.wall_time:.3f}s "
+              f"round trip={time.perf_counter() - start:.3f}s")
+    worker.close()
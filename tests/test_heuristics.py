@@ -0,0 +1,65 @@
+"""
+Admissibility and consistency of every heuristic, and incremental updates
+equal to a full evaluation, on the reachable states of the bundled maps for
+every cost model in step and slide mode.
+
+Run with ``python -m pytest tests``.
+"""
+
+import functools
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.moves import COST_MODELS
+from utils.state import State
+from utils.utils import import_map
+from solver.heuristics import HEURISTICS, _exact_costs, heuristic_errors
+
+MAP_IDS = range(1, 16)
+# Larger components (map 15) are checked on an even sample of their states
+MAX_STATES = 2000
+
+CASES = [pytest.param(map_id, slide_moves, cost_model, name,
+                      id=f"map{map_id}-{'slide' if slide_moves else 'step'}-{cost_model}-{name}")
+         for map_id in MAP_IDS
+         for slide_moves in (False, True)
+         for cost_model in COST_MODELS
+         for name in HEURISTICS]
+
+
+@functools.lru_cache(maxsize=None)
+def _state(map_id):
+    return State(import_map(map_id))
+
+
+@functools.lru_cache(maxsize=4)
+def _exact(map_id, slide_moves, cost_model):
+    return _exact_costs(_state(map_id), slide_moves, cost_model)
+
+
+@functools.lru_cache(maxsize=None)
+def _errors(map_id, slide_moves, cost_model, name):
+    return heuristic_errors(_state(map_id), HEURISTICS[name], slide_moves, cost_model,
+                            _exact(map_id, slide_moves, cost_model), MAX_STATES)
+
+
+@pytest.mark.parametrize('map_id, slide_moves, cost_model, name', CASES)
+def test_admissible(map_id, slide_moves, cost_model, name):
+    inadmissible, _, _ = _errors(map_id, slide_moves, cost_model, name)
+    assert not inadmissible, f"h exceeds the exact cost in {len(inadmissible)} states"
+
+
+@pytest.mark.parametrize('map_id, slide_moves, cost_model, name', CASES)
+def test_consistent(map_id, slide_moves, cost_model, name):
+    _, inconsistent, _ = _errors(map_id, slide_moves, cost_model, name)
+    assert not inconsistent, f"h drops by more than the move cost on {len(inconsistent)} edges"
+
+
+@pytest.mark.parametrize('map_id, slide_moves, cost_model, name', CASES)
+def test_incremental_update(map_id, slide_moves, cost_model, name):
+    _, _, wrong_updates = _errors(map_id, slide_moves, cost_model, name)
+    assert not wrong_updates, f"update_heuristic differs from a full evaluation on {len(wrong_updates)} edges"
@@ -5,8 +5,13 @@ This package contains the core classes and utilities for representing and
 manipulating the Rush Hour puzzle game state.
 """
 
+from .board import Board, STANDARD_BOARD
 from .vehicle import Vehicle
 from .state import State
+from .layout import Layout, get_layout
+from .cursor import SearchCursor
 from .utils import import_map
+from .loader import PuzzleRecord, iter_puzzles
 
-__all__ = ['Vehicle', 'State', 'import_map']
\ No newline at end of file
+__all__ = ['Board', 'STANDARD_BOARD', 'Vehicle', 'State', 'Layout', 'get_layout', 'SearchCursor', 'import_map',
+           'PuzzleRecord', 'iter_puzzles']
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Bitboard move generation for the Rush Hour board.
+
+The whole grid is packed into one integer: bit ``row * cols + col`` is set
+when that cell is occupied. Every vehicle gets a precomputed mask for each
+position it can take along its line, so checking a move is a single AND
+against the occupancy instead of comparing lists of cells.
+
+The grid size comes from the layout's ``Board``. Python integers have no
+fixed width, so the same code handles any size: up to 8x8 the occupancy
+fits in 64 bits, larger boards simply use wider integers.
+
+A vehicle's "position" is the column of its leftmost cell for horizontal
+vehicles and the row of its top cell for vertical ones. A move is a pair
+(vehicle index, delta) where delta is the signed number of cells travelled.
+"""
+
+
+def cell_bit(row, col, cols):
+    """Return the bit that represents cell (row, col) on a board ``cols`` wide."""
+    return 1 << (row * cols + col)
+
+
+class BitboardEngine:
+    """Precomputed masks for one puzzle layout.
+
+    The engine only depends on what never changes during a search (length,
+    orientation and the row/column a vehicle slides along), so one engine is
+    shared by every state of a puzzle.
+    """
+
+    __slots__ = ('max_positions', 'masks', 'back_cells', 'front_cells')
+
+    def __init__(self, layout):
+        board = layout.board
+        cols = board.cols
+        self.max_positions = []
+        self.masks = []        # masks[i][pos]: cells covered by vehicle i at pos
+        self.back_cells = []   # back_cells[i][pos]: cell entered when moving -1
+        self.front_cells = []  # front_cells[i][pos]: cell entered when moving +1
+
+        for length, orientation, line in zip(layout.lengths, layout.orientations, layout.lines):
+            horizontal = orientation == 'H'
+            max_position = board.span(orientation) - length
+
+            def bit(pos):
+                return cell_bit(line, pos, cols) if horizontal else cell_bit(pos, line, cols)
+
+            masks = []
+            back_cells = []
+            front_cells = []
+            for pos in range(max_position + 1):
+                mask = 0
+                for k in range(length):
+                    mask |= bit(pos + k)
+                masks.append(mask)
+                back_cells.append(bit(pos - 1) if pos > 0 else 0)
+                front_cells.append(bit(pos + length) if pos < max_position else 0)
+
+            self.max_positions.append(max_position)
+            self.masks.append(masks)
+            self.back_cells.append(back_cells)
+            self.front_cells.append(front_cells)
+
+    def occupancy(self, positions):
+        """Return the occupancy bitboard for the given positions."""
+        occupied = 0
+        for index, pos in enumerate(positions):
+            occupied |= self.masks[index][pos]
+        return occupied
+
+    def generate_moves(self, positions, occupancy):
+        """Return every legal single-cell move as (vehicle index, delta)."""
+        moves = []
+        back_cells = self.back_cells
+        front_cells = self.front_cells
+        max_positions = self.max_positions
+        for index, pos in enumerate(positions):
+            if pos > 0 and not occupancy & back_cells[index][pos]:
+                moves.append((index, -1))
+            if pos < max_positions[index] and not occupancy & front_cells[index][pos]:
+                moves.append((index, 1))
+        return moves
+
+    def generate_slides(self, positions, occupancy):
+        """Return every legal slide of one or more cells as (vehicle index, signed distance)."""
+        moves = []
+        back_cells = self.back_cells
+        front_cells = self.front_cells
+        max_positions = self.max_positions
+        for index, pos in enumerate(positions):
+            back = back_cells[index]
+            p = pos
+            while p > 0 and not occupancy & back[p]:
+                p -= 1
+                moves.append((index, p - pos))
+            front = front_cells[index]
+            max_position = max_positions[index]
+            p = pos
+            while p < max_position and not occupancy & front[p]:
+                p += 1
+                moves.append((index, p - pos))
+        return moves
@@ -0,0 +1,59 @@
+"""
+Board dimensions and exit of a puzzle.
+
+The classic puzzle is a 6x6 grid whose exit is on the right edge of row 2
+(``STANDARD_BOARD``). A ``Board`` describes any grid size and an exit on any
+edge:
+
+- ``exit_side`` is ``'right'``, ``'left'``, ``'top'`` or ``'bottom'``,
+- ``exit_line`` is the row of a left/right exit or the column of a top/bottom
+  exit.
+
+The target vehicle leaves through the exit, so it has to lie along the exit
+line: horizontal for a left/right exit, vertical for a top/bottom one.
+"""
+
+from collections import namedtuple
+
+EXIT_SIDES = ('right', 'left', 'top', 'bottom')
+
+
+class Board(namedtuple('Board', ['rows', 'cols', 'exit_side', 'exit_line'])):
+    """Immutable grid size and exit position; part of every layout signature."""
+
+    __slots__ = ()
+
+    def __new__(cls, rows=6, cols=6, exit_side='right', exit_line=None):
+        if rows < 2 or cols < 2:
+            raise ValueError(f"Board must be at least 2x2, got {rows}x{cols}")
+        if exit_side not in EXIT_SIDES:
+            raise ValueError(f"Exit side must be one of {', '.join(EXIT_SIDES)}, got '{exit_side}'")
+        span = rows if exit_side in ('right', 'left') else cols
+        if exit_line is None:
+            exit_line = (span - 1) // 2  # row 2 on the 6x6 board
+        if not 0 <= exit_line < span:
+            raise ValueError(f"Exit line {exit_line} is outside the {rows}x{cols} board")
+        return super().__new__(cls, rows, cols, exit_side, exit_line)
+
+    @property
+    def exit_orientation(self):
+        """Orientation the target needs to drive out: 'H' or 'V'."""
+        return 'H' if self.exit_side in ('right', 'left') else 'V'
+
+    def span(self, orientation):
+        """Number of cells along a line of the given orientation."""
+        return self.cols if orientation == 'H' else self.rows
+
+    def contains(self, row, col):
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def goal_position(self, orientation, line, length):
+        """Position a target on (orientation, line) must reach, or None if it can never exit."""
+        if orientation != self.exit_orientation or line != self.exit_line:
+            return None
+        if self.exit_side in ('left', 'top'):
+            return 0
+        return self.span(orientation) - length
+
+
+STANDARD_BOARD = Board(6, 6, 'right', 2)
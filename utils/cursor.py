@@ -0,0 +1,63 @@
+"""
+Mutable search cursor for depth-first style algorithms.
+
+Instead of building a new ``State`` and a new path list for every child, a
+depth-first search keeps one ``SearchCursor`` and walks the tree with
+``apply(move)`` / ``undo()``. Both update the position vector, the occupancy
+bitboard and the packed key in O(1), and the applied moves form the current
+path.
+"""
+
+from .moves import generate
+
+
+class SearchCursor:
+    """In-place view of one state of a puzzle, plus the moves that led to it."""
+
+    __slots__ = ('layout', 'positions', 'occupancy', 'key', 'stack', 'slide_moves')
+
+    def __init__(self, state, slide_moves=False):
+        self.layout = state.layout
+        self.slide_moves = slide_moves
+        self.positions = list(state.positions)
+        self.occupancy = state.occupancy
+        self.key = state.key
+        self.stack = []  # applied moves as (vehicle index, delta)
+
+    @property
+    def depth(self):
+        return len(self.stack)
+
+    def moves(self):
+        """Return every legal move from the current position as (vehicle index, delta)."""
+        return generate(self, self.slide_moves)
+
+    def apply(self, move):
+        """Apply a legal move in place and push it on the move stack."""
+        index, delta = move
+        masks = self.layout.engine.masks[index]
+        pos = self.positions[index]
+        self.positions[index] = pos + delta
+        self.occupancy = (self.occupancy & ~masks[pos]) | masks[pos + delta]
+        self.key += delta << self.layout.shift(index)
+        self.stack.append(move)
+
+    def undo(self):
+        """Revert the last applied move and return it."""
+        move = self.stack.pop()
+        index, delta = move
+        masks = self.layout.engine.masks[index]
+        pos = self.positions[index]
+        self.positions[index] = pos - delta
+        self.occupancy = (self.occupancy & ~masks[pos]) | masks[pos - delta]
+        self.key -= delta << self.layout.shift(index)
+        return move
+
+    def is_solved(self):
+        return self.layout.is_goal(self.key)
+
+    def path(self):
+        """Return the applied moves in the public path format."""
+        layout = self.layout
+        return [layout.encode_move(index, delta, self.slide_moves)
+                for index, delta in self.stack]
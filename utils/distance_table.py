@@ -0,0 +1,277 @@
+"""
+Retrograde distance-to-goal tables, persisted per puzzle.
+
+A table holds the exact number of moves from every state of a reachable
+component to the nearest goal. It is built once by a backward BFS from all
+goal states of the component and written to disk as:
+
+- a fixed-size header (magic, version, key width, move mode, distance width,
+  state count and a digest of the layout so a table is never used for the
+  wrong puzzle),
+- the packed keys of all states, sorted, each stored big-endian in ``width``
+  bytes so that byte order equals numeric order,
+- one little-endian distance per key, 1, 2 or 4 bytes wide: the narrowest
+  that holds the largest distance of the component. The largest value of
+  the field marks states that cannot reach a goal.
+
+A layout can have several disconnected components, so each has its own
+file, named after the layout digest and the smallest packed key of the
+component.
+
+Loading memory-maps the file, so lookups are a binary search over the mapped
+keys and nothing is read into Python objects up front.
+"""
+
+import glob
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from collections import deque
+
+MAGIC = b'RHDT'
+VERSION = 2
+HEADER = struct.Struct('<4sBBBBI32s4x')  # 48 bytes
+DISTANCE_WIDTHS = (1, 2, 4)
+UNSOLVABLE = -1  # distance of a state that cannot reach any goal
+
+TABLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'cache', 'distance_tables')
+
+
+def layout_digest(layout, slide_moves):
+    """sha256 of a layout signature and move mode, identifying one table."""
+    text = repr((layout.signature, bool(slide_moves)))
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+
+def key_width(layout):
+    """Bytes needed to store any packed key of ``layout``."""
+    return max(1, (len(layout) * layout.bits + 7) // 8)
+
+
+def distance_width(distances):
+    """Bytes per distance needed for ``distances`` ({key: distance})."""
+    largest = max(distances.values(), default=0)
+    for width in DISTANCE_WIDTHS:
+        if largest < (1 << (8 * width)) - 1:  # the largest value is the UNSOLVABLE mark
+            return width
+    raise ValueError(f"Distance {largest} does not fit in a distance table")
+
+
+def _table_prefix(layout, slide_moves):
+    return layout_digest(layout, slide_moves).hex()[:32]
+
+
+def table_path(layout, slide_moves, component_key, directory=TABLE_DIR):
+    """File name of the table of the component whose smallest packed key is ``component_key``."""
+    return os.path.join(directory, f"{_table_prefix(layout, slide_moves)}-{component_key:x}.rhdt")
+
+
+def compute_distances(state, slide_moves=False, cancel_flag=None):
+    """Exact distance-to-goal of every state reachable from ``state``.
+
+    Returns a dict {packed key: distance}, with ``UNSOLVABLE`` for states that
+    cannot reach any goal, or None if cancelled. Distances are counted in
+    moves of the chosen mode: cells in step mode, slides in slide mode.
+    """
+    layout = state.layout
+    engine = layout.engine
+    masks = engine.masks
+    bits = layout.bits
+    unpack = layout.unpack
+    generate = engine.generate_slides if slide_moves else engine.generate_moves
+
+    # Forward pass: enumerate the component with the occupancy of every state
+    occupancies = {state.key: state.occupancy}
+    queue = [state.key]
+    for key in queue:
+        if cancel_flag and cancel_flag.is_set():
+            return None
+        positions = unpack(key)
+        occupancy = occupancies[key]
+        for index, delta in generate(positions, occupancy):
+            new_key = key + (delta << (index * bits))
+            if new_key not in occupancies:
+                pos = positions[index]
+                occupancies[new_key] = (occupancy & ~masks[index][pos]) | masks[index][pos + delta]
+                queue.append(new_key)
+
+    # Backward pass: moves are reversible, so a BFS from every goal at once
+    # over the same move generator gives the distance to the nearest goal.
+    distances = {key: 0 for key in queue if layout.is_goal(key)}
+    frontier = deque(distances)
+    while frontier:
+        if cancel_flag and cancel_flag.is_set():
+            return None
+        key = frontier.popleft()
+        distance = distances[key] + 1
+        for index, delta in generate(unpack(key), occupancies[key]):
+            new_key = key + (delta << (index * bits))
+            if new_key not in distances:
+                distances[new_key] = distance
+                frontier.append(new_key)
+
+    for key in queue:
+        if key not in distances:
+            distances[key] = UNSOLVABLE
+    return distances
+
+
+def write_table(path, layout, slide_moves, distances):
+    """Write ``distances`` ({key: distance}) as a sorted on-disk table."""
+    width = key_width(layout)
+    d_width = distance_width(distances)
+    unsolvable = (1 << (8 * d_width)) - 1
+    keys = sorted(distances)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Write to a temporary file of our own first, so a reader never maps a
+    # half-written table and two processes building the same table do not
+    # write into the same file.
+    fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=directory or '.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, width, int(bool(slide_moves)), d_width, len(keys),
+                                layout_digest(layout, slide_moves)))
+            f.write(b''.join(key.to_bytes(width, 'big') for key in keys))
+            f.write(b''.join((unsolvable if distances[key] == UNSOLVABLE else distances[key])
+                             .to_bytes(d_width, 'little') for key in keys))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class DistanceTable:
+    """Read-only, memory-mapped distance table of one component."""
+
+    __slots__ = ('path', 'layout', 'slide_moves', 'width', 'distance_width', 'count',
+                 '_unsolvable', '_file', '_map', '_base')
+
+    def __init__(self, path, layout, slide_moves=False):
+        self.path = path
+        self.layout = layout
+        self.slide_moves = slide_moves
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty distance table: {path}")
+
+        magic, version, width, mode, d_width, count, digest = HEADER.unpack_from(self._map, 0)
+        if version == 1:
+            d_width = 1  # version 1 tables always stored one byte per distance
+        if magic != MAGIC or version not in (1, VERSION) or d_width not in DISTANCE_WIDTHS:
+            self.close()
+            raise ValueError(f"Not a distance table (or wrong version): {path}")
+        if mode != int(bool(slide_moves)) or digest != layout_digest(layout, slide_moves):
+            self.close()
+            raise ValueError(f"Distance table {path} belongs to another puzzle or move mode")
+        if len(self._map) != HEADER.size + count * (width + d_width):
+            self.close()
+            raise ValueError(f"Truncated distance table: {path}")
+
+        self.width = width
+        self.distance_width = d_width
+        self._unsolvable = (1 << (8 * d_width)) - 1
+        self.count = count
+        self._base = HEADER.size + count * width  # start of the distance array
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _find(self, key):
+        """Index of ``key`` in the sorted key array, or -1."""
+        width = self.width
+        target = key.to_bytes(width, 'big')
+        data = self._map
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = HEADER.size + mid * width
+            probe = data[offset:offset + width]
+            if probe < target:
+                lo = mid + 1
+            elif probe > target:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def __contains__(self, key):
+        return self._find(key) >= 0
+
+    def distance(self, key):
+        """Moves from ``key`` to the nearest goal, ``UNSOLVABLE``, or None if unknown."""
+        index = self._find(key)
+        if index < 0:
+            return None
+        d_width = self.distance_width
+        if d_width == 1:
+            distance = self._map[self._base + index]
+        else:
+            offset = self._base + index * d_width
+            distance = int.from_bytes(self._map[offset:offset + d_width], 'little')
+        return UNSOLVABLE if distance == self._unsolvable else distance
+
+    def heuristic(self, layout, positions, occupancy, cost_model='steps'):
+        """The exact distance, usable as an A*/IDA* heuristic.
+
+        A step-mode table counts cells, which is exact for ``'steps'`` and a
+        lower bound for ``'length'``. A slide-mode table counts moves, which
+        is a lower bound under every cost model.
+        """
+        if cost_model == 'slides' and not self.slide_moves:
+            raise ValueError("A step-mode table overestimates the 'slides' cost model")
+        distance = self.distance(layout.pack(positions))
+        if distance is None:
+            return 0
+        if distance == UNSOLVABLE:
+            return float('inf')
+        return distance
+
+
+def load_table(state, slide_moves=False, directory=TABLE_DIR):
+    """Load the table of the component containing ``state``, or None if there is none."""
+    pattern = os.path.join(glob.escape(directory), _table_prefix(state.layout, slide_moves) + '-*.rhdt')
+    for path in sorted(glob.glob(pattern)):
+        try:
+            table = DistanceTable(path, state.layout, slide_moves)
+        except ValueError:
+            continue  # damaged file; it is rebuilt if it is the one we need
+        if state.key in table:
+            return table
+        # Same puzzle layout, but a different (disconnected) component
+        table.close()
+    return None
+
+
+def get_distance_table(state, slide_moves=False, cancel_flag=None, directory=TABLE_DIR):
+    """Load the table of ``state``'s component, building and saving it if needed.
+
+    Returns None if cancelled while building.
+    """
+    table = load_table(state, slide_moves, directory)
+    if table is not None:
+        return table
+
+    distances = compute_distances(state, slide_moves, cancel_flag)
+    if distances is None:
+        return None
+    path = table_path(state.layout, slide_moves, min(distances), directory)
+    write_table(path, state.layout, slide_moves, distances)
+    return DistanceTable(path, state.layout, slide_moves)
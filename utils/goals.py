@@ -0,0 +1,71 @@
+"""
+Enumeration of goal configurations of a puzzle layout.
+
+A goal configuration has the target vehicle at the exit and every other
+vehicle anywhere along its line, as long as no two vehicles overlap. Backward
+searches (bidirectional BFS, retrograde distance tables) start from this set.
+
+Vehicles that share a line can never pass each other, so their order along
+the line is the same in every state reachable from a given one. Passing
+``positions`` keeps only the goals with the same orders, which leaves out
+goals of components the search can never reach.
+"""
+
+
+def _line_orders(layout, order, positions):
+    """For each vehicle of ``order``: (earlier vehicle, must be before it) pairs on its line."""
+    constraints = []
+    for n, index in enumerate(order):
+        line = (layout.orientations[index], layout.lines[index])
+        constraints.append(tuple((other, positions[other] < positions[index])
+                                 for other in order[:n]
+                                 if (layout.orientations[other], layout.lines[other]) == line))
+    return constraints
+
+
+def enumerate_goals(layout, limit=None, positions=None):
+    """Return every goal configuration as a list of (key, occupancy).
+
+    With ``positions``, only goals reachable as far as the line orders of
+    those positions go are returned (see above). Returns None when there are
+    more than ``limit`` goals, so callers can fall back to a forward-only
+    search instead of working on a partial goal set.
+    """
+    if layout.goal_position is None:
+        return []
+
+    engine = layout.engine
+    target_index = layout.target_index
+    others = [i for i in range(len(layout)) if i != target_index]
+    shifts = [layout.shift(i) for i in range(len(layout))]
+    pos_mask = (1 << layout.bits) - 1
+    constraints = None
+    if positions is not None:
+        # The target is placed first, so the others are checked against it too
+        constraints = _line_orders(layout, [target_index] + others, positions)[1:]
+
+    start_key = layout.goal_position << shifts[target_index]
+    start_occupancy = engine.masks[target_index][layout.goal_position]
+
+    goals = []
+    # Explicit stack of (depth in `others`, key so far, occupancy so far)
+    stack = [(0, start_key, start_occupancy)]
+    while stack:
+        depth, key, occupancy = stack.pop()
+        if depth == len(others):
+            goals.append((key, occupancy))
+            if limit is not None and len(goals) > limit:
+                return None
+            continue
+
+        index = others[depth]
+        shift = shifts[index]
+        for pos, mask in enumerate(engine.masks[index]):
+            if occupancy & mask:
+                continue
+            if constraints is not None and any(
+                    (((key >> shifts[other]) & pos_mask) < pos) != before
+                    for other, before in constraints[depth]):
+                continue
+            stack.append((depth + 1, key | (pos << shift), occupancy | mask))
+    return goals
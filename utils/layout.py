@@ -0,0 +1,142 @@
+"""
+Per-puzzle vehicle layout shared by every search state.
+
+A vehicle's id, length, orientation, line and target flag never change while
+solving, so they are stored once in a ``Layout``, together with the ``Board``
+(grid size and exit). A state then only needs the
+position of each vehicle along its line, packed into one integer key that is
+also used for hashing and equality.
+"""
+
+from .bitboard import BitboardEngine
+from .board import STANDARD_BOARD
+from .vehicle import Vehicle
+
+
+class Layout:
+    """Immutable description of the vehicles of one puzzle."""
+
+    __slots__ = ('board', 'ids', 'lengths', 'orientations', 'lines', 'targets',
+                 'target_index', 'index_by_id', 'directions', 'bits',
+                 'engine', 'signature', 'goal_position')
+
+    def __init__(self, signature):
+        # signature: (board, ((id, length, orientation, line, is_target), ...))
+        self.signature = signature
+        self.board, vehicles = signature
+        self.ids = tuple(item[0] for item in vehicles)
+        self.lengths = tuple(item[1] for item in vehicles)
+        self.orientations = tuple(item[2] for item in vehicles)
+        self.lines = tuple(item[3] for item in vehicles)  # fixed row for 'H', column for 'V'
+        self.targets = tuple(item[4] for item in vehicles)
+        self.target_index = self.targets.index(True) if True in self.targets else None
+        self.index_by_id = {vehicle_id: i for i, vehicle_id in enumerate(self.ids)}
+        self.directions = tuple(('LEFT', 'RIGHT') if o == 'H' else ('UP', 'DOWN')
+                                for o in self.orientations)
+
+        self.engine = BitboardEngine(self)
+        # Bits needed to store the largest position of any vehicle
+        self.bits = max([1] + [p.bit_length() for p in self.engine.max_positions])
+
+        # Position the target must reach; None when it can never leave (wrong line/orientation)
+        self.goal_position = None
+        target_index = self.target_index
+        if target_index is not None:
+            self.goal_position = self.board.goal_position(self.orientations[target_index],
+                                                          self.lines[target_index],
+                                                          self.lengths[target_index])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def positions_of(self, vehicles):
+        """Return the position tuple of a vehicle list matching this layout."""
+        return tuple(v.col if v.orientation == 'H' else v.row for v in vehicles)
+
+    def pack(self, positions):
+        """Pack a position vector into a single integer key."""
+        key = 0
+        bits = self.bits
+        for index, pos in enumerate(positions):
+            key |= pos << (index * bits)
+        return key
+
+    def unpack(self, key):
+        """Inverse of ``pack``."""
+        mask = (1 << self.bits) - 1
+        bits = self.bits
+        return tuple((key >> (index * bits)) & mask for index in range(len(self.ids)))
+
+    def shift(self, index):
+        """Bit offset of vehicle ``index`` inside a packed key."""
+        return index * self.bits
+
+    def is_goal(self, key):
+        """Check whether the target vehicle of a packed key has reached the exit."""
+        if self.goal_position is None:
+            return False
+
+        pos = (key >> (self.target_index * self.bits)) & ((1 << self.bits) - 1)
+        return pos == self.goal_position
+
+    def make_vehicle(self, index, pos):
+        """Build a full ``Vehicle`` for vehicle ``index`` at position ``pos``."""
+        if self.orientations[index] == 'H':
+            row, col = self.lines[index], pos
+        else:
+            row, col = pos, self.lines[index]
+        return Vehicle(self.ids[index], row, col, self.lengths[index],
+                       self.orientations[index], self.targets[index], self.board)
+
+    def encode_move(self, index, delta, slide_moves=False):
+        """Turn an internal move into the public path format.
+
+        Single-cell moves are (vehicle_id, direction); in slide mode every move
+        is (vehicle_id, direction, distance).
+        """
+        direction = self.directions[index][delta > 0]
+        if slide_moves:
+            return (self.ids[index], direction, abs(delta))
+        return (self.ids[index], direction)
+
+    def decode_move(self, move):
+        """Inverse of ``encode_move``; returns (index, delta) or None."""
+        index = self.index_by_id.get(move[0])
+        if index is None:
+            return None
+        delta = self.delta_of(index, move[1])
+        if delta is None:
+            return None
+        distance = move[2] if len(move) > 2 else 1
+        return index, delta * distance
+
+    def delta_of(self, index, direction):
+        """Translate a direction name into -1/+1, or None if it does not apply."""
+        names = self.directions[index]
+        if direction == names[0]:
+            return -1
+        if direction == names[1]:
+            return 1
+        return None
+
+
+_layout_cache = {}
+
+
+def get_layout(vehicles):
+    """Return the shared layout for this vehicle set, building it once."""
+    board = vehicles[0].board if vehicles else STANDARD_BOARD
+    signature = (board, tuple(
+        (v.id, v.length, v.orientation, v.row if v.orientation == 'H' else v.col, bool(v.is_target))
+        for v in vehicles
+    ))
+    return layout_from_signature(signature)
+
+
+def layout_from_signature(signature):
+    """Return the shared layout of a ``Layout.signature`` (e.g. one sent by another process)."""
+    layout = _layout_cache.get(signature)
+    if layout is None:
+        layout = Layout(signature)
+        _layout_cache[signature] = layout
+    return layout
@@ -0,0 +1,254 @@
+"""
+Streaming puzzle loader for every map format.
+
+Three text formats are detected automatically from the first line that is not
+blank, a ``#`` comment or a directive:
+
+- ``tuple``: one vehicle per line, ``("id", row, col, length, "H"/"V", is_target)``
+  (the ``mapN.txt`` format); one puzzle per file,
+- ``coords``: one vehicle per line, ``id: [(row, col), (row, col), ...]``
+  (``map/test_*.txt``); one puzzle per file,
+- ``board``: one puzzle per line as a rows*cols string read row by row,
+  ``.``/``o``/``_`` for empty cells and one letter per vehicle (e.g.
+  ``AA...B`` + ...). Other whitespace-separated fields on the line, such as
+  a move count, are ignored, so puzzle databases can be read as they are.
+
+``size`` and ``exit`` directives (see ``load_map_file``) set the board; in the
+``board`` format they apply to the lines after them. Without an explicit
+target flag (``coords`` and ``board``), the target is vehicle ``X``, or ``A``
+when there is no ``X``.
+
+``iter_puzzles`` reads the file through ``mmap`` and yields compact
+``PuzzleRecord`` tuples (name, layout signature, positions) without building
+any ``Vehicle``; ``record.state()`` turns one into a ``State`` when it is
+solved.
+"""
+
+import mmap
+import os
+import re
+from collections import namedtuple
+
+from .board import Board
+from .layout import layout_from_signature
+from .state import State
+
+FORMATS = ('tuple', 'coords', 'board')
+EMPTY_CELLS = '._o'
+WALL = 'x'
+
+_COORDS_LINE = re.compile(r'^\s*"?(\w+)"?\s*:\s*\[(.*)\]\s*$')
+_CELL = re.compile(r'\(\s*(\d+)\s*,\s*(\d+)\s*\)')
+
+
+class PuzzleRecord(namedtuple('PuzzleRecord', ['name', 'signature', 'positions'])):
+    """One puzzle: a layout signature plus the position of each vehicle along its line."""
+
+    __slots__ = ()
+
+    @property
+    def layout(self):
+        return layout_from_signature(self.signature)
+
+    def state(self):
+        layout = self.layout
+        return State.from_key(layout, layout.pack(self.positions))
+
+    def vehicles(self):
+        layout = self.layout
+        return [layout.make_vehicle(i, pos) for i, pos in enumerate(self.positions)]
+
+
+def detect_format(line, cells=36):
+    """Format of a vehicle/puzzle line ('tuple', 'coords' or 'board'), or None.
+
+    ``cells`` is the number of cells of the board, i.e. the length of a
+    board string.
+    """
+    line = line.strip()
+    if line.startswith('('):
+        return 'tuple'
+    if _COORDS_LINE.match(line):
+        return 'coords'
+    if any(len(token) == cells and not token.isdigit() for token in line.split()):
+        return 'board'
+    return None
+
+
+def make_record(name, board, vehicles):
+    """Build a ``PuzzleRecord`` from (id, length, orientation, row, col, is_target) tuples.
+
+    ``is_target`` None everywhere means "pick X, else A". Raises ValueError
+    when a vehicle does not fit on the board.
+    """
+    if all(vehicle[5] is None for vehicle in vehicles):
+        ids = {vehicle[0] for vehicle in vehicles}
+        target_id = 'X' if 'X' in ids else 'A'
+        vehicles = [vehicle[:5] + (vehicle[0] == target_id,) for vehicle in vehicles]
+
+    signature = []
+    positions = []
+    for vehicle_id, length, orientation, row, col, is_target in vehicles:
+        _check_fits(board, vehicle_id, length, orientation, row, col)
+        horizontal = orientation == 'H'
+        signature.append((vehicle_id, length, orientation, row if horizontal else col, bool(is_target)))
+        positions.append(col if horizontal else row)
+    return PuzzleRecord(name, (board, tuple(signature)), tuple(positions))
+
+
+def _check_fits(board, vehicle_id, length, orientation, row, col):
+    # Same rules as Vehicle.__init__, without building the Vehicle
+    if orientation not in ('H', 'V'):
+        raise ValueError(f"Vehicle {vehicle_id}: orientation must be 'H' or 'V', got '{orientation}'")
+    if length < 2:
+        raise ValueError(f"Vehicle {vehicle_id}: length must be at least 2, got {length}")
+    end_row, end_col = (row, col + length - 1) if orientation == 'H' else (row + length - 1, col)
+    if not (board.contains(row, col) and board.contains(end_row, end_col)):
+        raise ValueError(f"Vehicle {vehicle_id} at ({row}, {col}) does not fit "
+                         f"on the {board.rows}x{board.cols} board")
+
+
+def parse_tuple_line(line):
+    """``("A", 2, 0, 2, "H", 1)`` -> (id, length, orientation, row, col, is_target)."""
+    parts = [part.strip().strip('"\'') for part in line.strip().strip('()').split(',')]
+    if len(parts) != 6:
+        raise ValueError(f"Invalid line format: {line}")
+    vehicle_id, row, col, length, orientation, is_target = parts
+    return (vehicle_id, int(length), orientation, int(row), int(col), bool(int(is_target)))
+
+
+def parse_coords_line(line):
+    """``A: [(2, 1), (2, 2)]`` -> (id, length, orientation, row, col, None)."""
+    match = _COORDS_LINE.match(line)
+    if match is None:
+        raise ValueError(f"Invalid line format: {line}")
+    cells = sorted((int(row), int(col)) for row, col in _CELL.findall(match.group(2)))
+    return _straight_vehicle(match.group(1), cells)
+
+
+def _straight_vehicle(vehicle_id, cells):
+    # cells: sorted (row, col) pairs that must form one horizontal or vertical line
+    if len(cells) < 2:
+        raise ValueError(f"Vehicle {vehicle_id} must cover at least 2 cells")
+    (row, col), length = cells[0], len(cells)
+    if cells == [(row, col + k) for k in range(length)]:
+        return (vehicle_id, length, 'H', row, col, None)
+    if cells == [(row + k, col) for k in range(length)]:
+        return (vehicle_id, length, 'V', row, col, None)
+    raise ValueError(f"Cells of vehicle {vehicle_id} are not one straight line")
+
+
+def parse_board_string(text, board, name=None):
+    """Parse one rows*cols board string into a ``PuzzleRecord``."""
+    cols = board.cols
+    if len(text) != board.rows * cols:
+        raise ValueError(f"Board string has {len(text)} cells, expected {board.rows * cols}")
+    if WALL in text:
+        raise ValueError("Walls ('x') are not supported")
+
+    # Databases hold millions of boards, so this sticks to str methods instead
+    # of visiting cells one by one; vehicles keep their row-major order.
+    target_id = 'X' if 'X' in text else 'A'
+    signature = []
+    positions = []
+    for start, char in sorted((text.find(char), char) for char in set(text) if char not in EMPTY_CELLS):
+        length = text.count(char)
+        if length < 2:
+            raise ValueError(f"Vehicle {char} must cover at least 2 cells")
+        row, col = divmod(start, cols)
+        if col + length <= cols and text[start:start + length] == char * length:
+            signature.append((char, length, 'H', row, char == target_id))
+            positions.append(col)
+        elif text[start::cols][:length] == char * length:
+            signature.append((char, length, 'V', col, char == target_id))
+            positions.append(row)
+        else:
+            raise ValueError(f"Cells of vehicle {char} are not one straight line")
+    return PuzzleRecord(name, (board, tuple(signature)), tuple(positions))
+
+
+def _lines(file_name):
+    """Yield (line number, decoded stripped line) through mmap."""
+    with open(file_name, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for number, raw in enumerate(iter(data.readline, b''), 1):
+                yield number, raw.decode('utf-8', 'replace').strip()
+
+
+def iter_puzzles(file_name, fmt=None, on_error=None):
+    """Yield every puzzle of a map file or puzzle database as a ``PuzzleRecord``.
+
+    ``fmt`` forces one of ``FORMATS`` instead of detecting it. Bad lines
+    call ``on_error(line_number, message)`` and are skipped; without
+    ``on_error`` they raise ValueError.
+    """
+    def fail(number, message):
+        if on_error is None:
+            raise ValueError(f"{file_name}:{number}: {message}")
+        on_error(number, message)
+
+    if fmt is not None and fmt not in FORMATS:
+        raise ValueError(f"Unknown map format '{fmt}' (use one of {', '.join(FORMATS)})")
+    base_name = os.path.splitext(os.path.basename(file_name))[0]
+    board_args = [6, 6, 'right', None]
+    board = None
+    entries = []  # (line number, vehicle tuple) of a one-puzzle file
+
+    for number, line in _lines(file_name):
+        if not line or line.startswith('#'):
+            continue
+
+        words = line.split()
+        if words[0] in ('size', 'exit'):
+            try:
+                if words[0] == 'size':
+                    board_args[:2] = (int(part) for part in ' '.join(words[1:]).replace('x', ' ').split())
+                else:
+                    board_args[2:] = [words[1], int(words[2]) if len(words) > 2 else None]
+            except (ValueError, IndexError):
+                fail(number, f"Invalid directive '{line}'")
+            board = None
+            continue
+
+        if fmt is None:
+            fmt = detect_format(line, board_args[0] * board_args[1])
+            if fmt is None:
+                fail(number, f"Unknown line format: {line}")
+                continue
+
+        if fmt != 'board':
+            try:
+                parse = parse_tuple_line if fmt == 'tuple' else parse_coords_line
+                entries.append((number, parse(line)))
+            except (ValueError, IndexError) as e:
+                fail(number, str(e))
+            continue
+
+        try:
+            if board is None:
+                board = Board(*board_args)
+            text = next((token for token in words if len(token) == board.rows * board.cols), None)
+            if text is None:
+                raise ValueError(f"No {board.rows}x{board.cols} board string in line: {line}")
+            yield parse_board_string(text, board, f"{base_name}:{number}")
+        except ValueError as e:
+            fail(number, str(e))
+
+    if fmt in ('tuple', 'coords') and entries:
+        try:
+            board = Board(*board_args)
+        except ValueError as e:
+            fail(entries[0][0], f"Invalid board: {e}")
+            return
+        # Vehicles are checked against the board once all directives are known
+        vehicles = []
+        for number, vehicle in entries:
+            try:
+                make_record(None, board, [vehicle])
+                vehicles.append(vehicle)
+            except ValueError as e:
+                fail(number, str(e))
+        if vehicles:
+            yield make_record(base_name, board, vehicles)
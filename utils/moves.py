@@ -0,0 +1,43 @@
+"""
+Move modes and cost models shared by the solvers.
+
+In step mode every move shifts one vehicle by exactly one cell. In slide mode
+a move shifts one vehicle any number of free cells in one go, which is the
+usual Rush Hour move metric.
+
+Cost models decide what a solver minimises:
+
+- ``'steps'``: number of cells travelled
+- ``'slides'``: number of moves, whatever their distance
+- ``'length'``: cells travelled weighted by vehicle length (the UCS cost)
+"""
+
+COST_MODELS = ('steps', 'slides', 'length')
+
+
+def move_cost(layout, index, delta, cost_model):
+    """Cost of moving vehicle ``index`` by ``delta`` cells under ``cost_model``."""
+    if cost_model == 'slides':
+        return 1
+    distance = delta if delta > 0 else -delta
+    if cost_model == 'length':
+        return layout.lengths[index] * distance
+    return distance
+
+
+def path_cost(state, path, cost_model):
+    """Cost of a public path (see ``Layout.encode_move``) under ``cost_model``."""
+    layout = state.layout
+    cost = 0
+    for move in path:
+        index, delta = layout.decode_move(move)
+        cost += move_cost(layout, index, delta, cost_model)
+    return cost
+
+
+def generate(state_or_cursor, slide_moves=False):
+    """Legal moves of a ``State`` or ``SearchCursor`` in the requested mode."""
+    engine = state_or_cursor.layout.engine
+    if slide_moves:
+        return engine.generate_slides(state_or_cursor.positions, state_or_cursor.occupancy)
+    return engine.generate_moves(state_or_cursor.positions, state_or_cursor.occupancy)
@@ -0,0 +1,79 @@
+"""
+Compact search tree shared by the best-first and breadth-first solvers.
+
+Frontier entries used to carry their whole move history (``path + [move]``),
+which costs O(depth) memory and time per generated node. Here every node only
+keeps the index of its parent and the move that produced it, stored in typed
+arrays (a few bytes per node). The path is rebuilt once, when a goal is found.
+Vehicle indices and deltas take one byte each unless the layout has more
+vehicles or longer lines than a byte can hold.
+"""
+
+from array import array
+
+
+def _typecode(largest, signed):
+    """Smallest array typecode holding every value up to ``largest`` (and its negative)."""
+    for code in ('bhi' if signed else 'BHI'):
+        if largest < 1 << (8 * array(code).itemsize - signed):
+            return code
+    return 'q' if signed else 'Q'
+
+
+class NodeStore:
+    """Parent pointers plus (vehicle index, delta) move codes for every node."""
+
+    __slots__ = ('layout', 'slide_moves', 'parents', 'vehicles', 'deltas')
+
+    ROOT = 0
+
+    def __init__(self, layout, slide_moves=False):
+        self.layout = layout
+        self.slide_moves = slide_moves
+        self.parents = array('i', [-1])
+        # Largest slide is the largest position of any vehicle
+        self.vehicles = array(_typecode(len(layout), False), [0])
+        self.deltas = array(_typecode(max(layout.engine.max_positions, default=0), True), [0])
+
+    def __len__(self):
+        return len(self.parents)
+
+    @property
+    def bytes_per_node(self):
+        """Bytes of parent pointer and move code stored per node."""
+        return self.parents.itemsize + self.vehicles.itemsize + self.deltas.itemsize
+
+    def add(self, parent, index, delta):
+        """Record a child of ``parent`` reached by moving vehicle ``index`` by ``delta``."""
+        self.parents.append(parent)
+        self.vehicles.append(index)
+        self.deltas.append(delta)
+        return len(self.parents) - 1
+
+    def add_root(self):
+        """Add another root (e.g. one more goal of a backward search)."""
+        return self.add(-1, 0, 0)
+
+    def moves(self, node):
+        """Internal (vehicle index, delta) moves from the node's root to ``node``."""
+        moves = []
+        parents = self.parents
+        while parents[node] >= 0:
+            moves.append((self.vehicles[node], self.deltas[node]))
+            node = parents[node]
+        moves.reverse()
+        return moves
+
+    def path(self, node):
+        """Moves from the root to ``node`` in the public path format."""
+        layout = self.layout
+        return [layout.encode_move(index, delta, self.slide_moves)
+                for index, delta in self.moves(node)]
+
+    def depth(self, node):
+        depth = 0
+        parents = self.parents
+        while parents[node] >= 0:
+            node = parents[node]
+            depth += 1
+        return depth
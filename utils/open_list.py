@@ -0,0 +1,133 @@
+"""
+Open lists for the best-first solvers (UCS, A*).
+
+Both classes keep ``best_g``, the cheapest known cost of every state seen so
+far, and only accept a push that improves it. Successors that are already
+queued or expanded at a better or equal cost are refused at push time
+instead of piling up in the queue and being discarded on pop.
+
+- ``BucketOpenList``: Dial's bucket queue for small integer priorities (step
+  counts, vehicle lengths, integer heuristics). Push, pop and decrease-key
+  are O(1) (pop amortised over the empty buckets it skips), and every state
+  is queued at most once: an improved push moves its entry to the new bucket.
+- ``HeapOpenList``: binary heap for any priority (e.g. float heuristics). An
+  improved push adds a new entry; the old one is skipped on pop (lazy
+  deletion).
+
+Entries within one bucket pop last-in first-out, which among equal f values
+favours the deeper, more recently generated nodes.
+"""
+
+import heapq
+
+
+class BucketOpenList:
+    """Dial's bucket queue with decrease-key, for non-negative integer priorities."""
+
+    __slots__ = ('best_g', 'buckets', 'slots', 'low')
+
+    def __init__(self):
+        self.best_g = {}    # key -> cheapest g seen (queued or already expanded)
+        self.buckets = []   # buckets[priority]: list of [key, g, item]
+        self.slots = {}     # key -> (priority, index in bucket) of queued states
+        self.low = 0        # no queued state has a priority below this
+
+    def __len__(self):
+        return len(self.slots)
+
+    def push(self, key, priority, g, item):
+        """Queue ``key`` unless it is known at cost <= ``g``; returns whether it was queued."""
+        old_g = self.best_g.get(key)
+        if old_g is not None and old_g <= g:
+            return False
+        self.best_g[key] = g
+        slot = self.slots.get(key)
+        if slot is not None:
+            self._remove(*slot)
+
+        buckets = self.buckets
+        while len(buckets) <= priority:
+            buckets.append([])
+        bucket = buckets[priority]
+        self.slots[key] = (priority, len(bucket))
+        bucket.append([key, g, item])
+        if priority < self.low:
+            self.low = priority  # possible with inconsistent heuristics
+        return True
+
+    def _remove(self, priority, index):
+        # Move the last entry of the bucket into the freed place
+        bucket = self.buckets[priority]
+        last = bucket.pop()
+        if index < len(bucket):
+            bucket[index] = last
+            self.slots[last[0]] = (priority, index)
+
+    def pop(self):
+        """Remove and return ``(priority, key, g, item)`` with the lowest priority, or None."""
+        if not self.slots:
+            return None
+        buckets = self.buckets
+        low = self.low
+        while not buckets[low]:
+            low += 1
+        self.low = low
+        key, g, item = buckets[low].pop()
+        del self.slots[key]
+        return low, key, g, item
+
+    def entries(self):
+        """``(key, g, item)`` of every queued state."""
+        for bucket in self.buckets:
+            for key, g, item in bucket:
+                yield key, g, item
+
+
+class HeapOpenList:
+    """Binary heap with lazy deletion, for priorities of any type."""
+
+    __slots__ = ('best_g', 'heap', 'counter')
+
+    def __init__(self):
+        self.best_g = {}
+        self.heap = []      # (priority, counter, key, g, item)
+        self.counter = 0    # FIFO among equal priorities
+
+    def __len__(self):
+        """Number of heap entries, including stale ones not popped yet."""
+        return len(self.heap)
+
+    def push(self, key, priority, g, item):
+        """Queue ``key`` unless it is known at cost <= ``g``; returns whether it was queued."""
+        old_g = self.best_g.get(key)
+        if old_g is not None and old_g <= g:
+            return False
+        self.best_g[key] = g
+        self.counter += 1
+        heapq.heappush(self.heap, (priority, self.counter, key, g, item))
+        return True
+
+    def pop(self):
+        """Remove and return ``(priority, key, g, item)`` with the lowest priority.
+
+        Returns None once only stale entries were left.
+        """
+        heap = self.heap
+        best_g = self.best_g
+        while heap:
+            priority, _, key, g, item = heapq.heappop(heap)
+            if g == best_g[key]:
+                return priority, key, g, item
+        return None
+
+    def entries(self):
+        """``(key, g, item)`` of every queued state, skipping stale entries."""
+        best_g = self.best_g
+        for _, _, key, g, item in self.heap:
+            if g == best_g[key]:
+                yield key, g, item
+
+
+def make_open_list(integer_priorities=True):
+    """The fastest open list for the kind of priorities the solver uses."""
+    return BucketOpenList() if integer_priorities else HeapOpenList()
@@ -0,0 +1,64 @@
+"""
+Rate-limited progress events from running solvers.
+
+Every solver takes an optional ``progress`` callback. While searching it
+calls ``reporter.due(nodes_expanded)`` (a bit test) and only every
+``CHECK_EVERY`` expansions reads the clock; an event is sent at most once
+per ``interval`` seconds. Reporting therefore costs nothing measurable, and
+nothing at all when ``progress`` is None.
+
+A callback receives one ``ProgressEvent``. Fields a solver does not track
+are None. A callback may set the solver's ``cancel_flag`` to stop a run that
+is clearly going nowhere.
+"""
+
+import time
+from collections import namedtuple
+
+ProgressEvent = namedtuple('ProgressEvent', [
+    'algorithm',       # solver name
+    'nodes_expanded',
+    'frontier',        # open list / queue / layer size (DFS, IDA*: current depth)
+    'depth',           # depth of the node being expanded
+    'bound',           # f value (A*) or f-bound (IDA*)
+    'best_g',          # largest g (cost so far) settled
+    'elapsed',         # seconds since the solver started
+])
+
+# Expansions between two clock reads (a power of two, see ``due``)
+CHECK_EVERY = 1024
+
+
+class ProgressReporter:
+    """Sends ``ProgressEvent`` objects to a callback at most every ``interval`` seconds."""
+
+    __slots__ = ('callback', 'algorithm', 'interval', 'start', 'last')
+
+    def __init__(self, callback, algorithm, interval=0.1):
+        self.callback = callback
+        self.algorithm = algorithm
+        self.interval = interval
+        self.start = time.perf_counter()
+        self.last = self.start
+
+    @staticmethod
+    def due(nodes_expanded):
+        """Cheap pre-check done on every expansion."""
+        return not nodes_expanded & (CHECK_EVERY - 1)
+
+    def report(self, nodes_expanded, frontier=None, depth=None, bound=None, best_g=None,
+               force=False):
+        """Send an event if ``interval`` has passed (or ``force``)."""
+        now = time.perf_counter()
+        if not force and now - self.last < self.interval:
+            return
+        self.last = now
+        self.callback(ProgressEvent(self.algorithm, nodes_expanded, frontier, depth,
+                                    bound, best_g, now - self.start))
+
+
+def make_reporter(progress, algorithm, interval=0.1):
+    """A ``ProgressReporter`` for ``progress``, or None when there is no callback."""
+    if progress is None:
+        return None
+    return ProgressReporter(progress, algorithm, interval)
@@ -0,0 +1,163 @@
+"""
+Binary puzzle packs: many puzzles in one file, any of them loadable in O(1).
+
+A pack is written once from text maps or puzzle databases
+(``python -m solver pack``) and read through ``mmap``:
+
+- header: magic ``RHPK``, format version, number of puzzles and the offset
+  of the index,
+- records, one per puzzle: name, board (rows, columns, exit side, exit
+  line) and, per vehicle, its id, length, orientation, line, target flag and
+  position,
+- index: one little-endian uint64 record offset per puzzle.
+
+``PuzzlePack(path)[i]`` seeks straight to record ``i`` through the index and
+decodes only that record into a ``PuzzleRecord``.
+"""
+
+import mmap
+import struct
+import sys
+
+from .board import Board, EXIT_SIDES
+from .loader import FORMATS, PuzzleRecord, iter_puzzles
+
+MAGIC = b'RHPK'
+VERSION = 1
+PACK_SUFFIX = '.rhpk'
+
+_HEADER = struct.Struct('<4sBxxxQQ')   # magic, version, puzzle count, index offset
+_OFFSET = struct.Struct('<Q')
+_NAME = struct.Struct('<H')
+_BOARD = struct.Struct('<BBBBB')        # rows, cols, exit side, exit line, vehicle count
+_VEHICLE = struct.Struct('<BBBBB')      # length, orientation, line, target, position
+
+
+def encode_record(record):
+    """Bytes of one ``PuzzleRecord`` inside a pack."""
+    board, vehicles = record.signature
+    name = (record.name or '').encode('utf-8')
+    parts = [_NAME.pack(len(name)), name,
+             _BOARD.pack(board.rows, board.cols, EXIT_SIDES.index(board.exit_side),
+                         board.exit_line, len(vehicles))]
+    for (vehicle_id, length, orientation, line, is_target), pos in zip(vehicles, record.positions):
+        vehicle_id = vehicle_id.encode('utf-8')
+        parts.append(bytes((len(vehicle_id),)) + vehicle_id)
+        parts.append(_VEHICLE.pack(length, ord(orientation), line, is_target, pos))
+    return b''.join(parts)
+
+
+def write_pack(records, file_name):
+    """Write an iterable of ``PuzzleRecord`` to a pack file; returns the number written."""
+    offsets = []
+    with open(file_name, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, 0))
+        for record in records:
+            offsets.append(f.tell())
+            f.write(encode_record(record))
+        index_offset = f.tell()
+        for offset in offsets:
+            f.write(_OFFSET.pack(offset))
+        # The header is only filled in once every record is on disk
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, len(offsets), index_offset))
+    return len(offsets)
+
+
+class PuzzlePack:
+    """Read-only view of a pack file with O(1) access to every puzzle."""
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        with open(file_name, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < _HEADER.size:
+            self.close()
+            raise ValueError(f"{file_name} is not a puzzle pack")
+        magic, version, self.count, self.index_offset = _HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{file_name} is not a version {VERSION} puzzle pack")
+        self._boards = {}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(f"Puzzle {index} is outside the pack ({self.count} puzzles)")
+        offset, = _OFFSET.unpack_from(self.data, self.index_offset + index * _OFFSET.size)
+        return self._decode(offset)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def _decode(self, offset):
+        data = self.data
+        name_length, = _NAME.unpack_from(data, offset)
+        offset += _NAME.size
+        name = data[offset:offset + name_length].decode('utf-8')
+        offset += name_length
+
+        board_fields = data[offset:offset + _BOARD.size - 1]
+        count = data[offset + _BOARD.size - 1]
+        offset += _BOARD.size
+        board = self._boards.get(board_fields)
+        if board is None:
+            rows, cols, side, line = board_fields
+            board = self._boards[board_fields] = Board(rows, cols, EXIT_SIDES[side], line)
+
+        vehicles = []
+        positions = []
+        for _ in range(count):
+            id_length = data[offset]
+            vehicle_id = data[offset + 1:offset + 1 + id_length].decode('utf-8')
+            offset += 1 + id_length
+            length, orientation, line, is_target, pos = _VEHICLE.unpack_from(data, offset)
+            offset += _VEHICLE.size
+            vehicles.append((vehicle_id, length, chr(orientation), line, bool(is_target)))
+            positions.append(pos)
+        return PuzzleRecord(name, (board, tuple(vehicles)), tuple(positions))
+
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def add_arguments(parser):
+    parser.add_argument('inputs', nargs='+', help="map files or puzzle databases (any text format)")
+    parser.add_argument('-o', '--output', required=True, help=f"pack file to write (e.g. puzzles{PACK_SUFFIX})")
+    parser.add_argument('--format', choices=FORMATS, default=None,
+                        help="input format (default: detected per file)")
+
+
+def main(args):
+    skipped = []
+
+    def records():
+        for file_name in args.inputs:
+            def skip(line_number, message, file_name=file_name):
+                skipped.append(f"{file_name}:{line_number}: {message}")
+            yield from iter_puzzles(file_name, args.format, on_error=skip)
+
+    try:
+        count = write_pack(records(), args.output)
+    except (OSError, struct.error) as e:
+        print(f"Cannot write {args.output}: {e}", file=sys.stderr)
+        return 2
+    for message in skipped[:20]:
+        print(f"Skipped {message}", file=sys.stderr)
+    if len(skipped) > 20:
+        print(f"... and {len(skipped) - 20} more", file=sys.stderr)
+    print(f"{count} puzzles written to {args.output}", file=sys.stderr)
+    return 0
@@ -0,0 +1,27 @@
+"""
+Solver results that are not an answer.
+
+A solver returns ``(cost, nodes_expanded, path)``; cost None with an empty
+path means the puzzle has no solution, and None means the run was cancelled.
+A search that gives up without a path proves neither, so it
+returns ``IncompleteResult(nodes_expanded)`` instead: it unpacks like a
+"no solution" tuple, but ``is_incomplete`` tells it apart, so callers can
+report it separately and never cache it as a proof.
+"""
+
+
+class IncompleteResult(tuple):
+    """``(None, nodes_expanded, [])`` of a search that gave up without a path."""
+
+    __slots__ = ()
+
+    def __new__(cls, nodes_expanded):
+        return super().__new__(cls, (None, nodes_expanded, []))
+
+    def __getnewargs__(self):
+        # Sent between processes (solver.worker), so it must survive pickling
+        return (self[1],)
+
+
+def is_incomplete(result):
+    return isinstance(result, IncompleteResult)
@@ -0,0 +1,135 @@
+"""
+Low-overhead instrumentation that solvers report into.
+
+Every solver takes an optional ``stats`` argument. When it is a
+``SearchStats``, the solver keeps plain integer counters while it searches
+and copies them into the object when it returns, so leaving stats on costs
+a few integer additions per node.
+
+Per-phase timing (move generation, hashing, queue operations, heuristic) needs
+a clock read around every phase and is only done when the object was created
+with ``timed=True``. Deep memory tracing with ``tracemalloc`` is a separate,
+explicit opt-in of the caller (see ``traced_peak``), because it slows
+allocation-heavy solvers several-fold.
+"""
+
+import sys
+import time
+import tracemalloc
+
+PHASES = ('movegen', 'hashing', 'queue', 'heuristic')
+
+# Clock used for phase timing
+clock = time.perf_counter
+
+
+class SearchStats:
+    """Counters and optional phase timings of one solver run."""
+
+    def __init__(self, timed=False):
+        self.timed = timed
+        self.nodes_generated = 0
+        self.nodes_expanded = 0
+        self.duplicates = 0  # generated states that were already known
+        self.peak_frontier = 0
+        self.peak_visited = 0
+        self.bytes_per_state = None
+        self.phase_times = dict.fromkeys(PHASES, 0.0)
+        self.wall_time = None
+        self.peak_memory = None  # bytes, only in deep-memory mode
+
+    def add_time(self, phase, seconds):
+        self.phase_times[phase] += seconds
+
+    def update(self, generated=0, expanded=0, duplicates=0, frontier=0, visited=0):
+        """Add a solver's final counters (frontier and visited are peaks)."""
+        self.nodes_generated += generated
+        self.nodes_expanded += expanded
+        self.duplicates += duplicates
+        self.peak_frontier = max(self.peak_frontier, frontier)
+        self.peak_visited = max(self.peak_visited, visited)
+
+    def estimate_state_bytes(self, visited=None, key=None, node_bytes=0, frontier_entry=None):
+        """Estimate the memory kept per stored state.
+
+        Adds up the packed key, the amortised slot of the ``visited``
+        container, ``node_bytes`` of parent-pointer storage and the size of a
+        sample frontier entry (tuple plus the objects it holds).
+        """
+        total = node_bytes
+        if key is not None:
+            total += sys.getsizeof(key)
+        if visited:
+            total += sys.getsizeof(visited) / len(visited)
+        if frontier_entry is not None:
+            total += sys.getsizeof(frontier_entry)
+            total += sum(sys.getsizeof(item) for item in frontier_entry
+                         if not isinstance(item, (int, float)))
+        self.bytes_per_state = round(total, 1)
+
+    def as_dict(self):
+        data = {
+            'nodes_generated': self.nodes_generated,
+            'nodes_expanded': self.nodes_expanded,
+            'duplicates': self.duplicates,
+            'peak_frontier': self.peak_frontier,
+            'peak_visited': self.peak_visited,
+            'bytes_per_state': self.bytes_per_state,
+        }
+        if self.timed:
+            data['phase_times'] = {phase: round(t, 6) for phase, t in self.phase_times.items()}
+        if self.wall_time is not None:
+            data['wall_time'] = round(self.wall_time, 6)
+        if self.peak_memory is not None:
+            data['peak_memory'] = self.peak_memory
+        return data
+
+    def update_from_dict(self, data):
+        """Add counters produced by ``as_dict`` (e.g. sent back by a worker process)."""
+        self.update(data['nodes_generated'], data['nodes_expanded'], data['duplicates'],
+                    data['peak_frontier'], data['peak_visited'])
+        self.bytes_per_state = data['bytes_per_state']
+        for phase, seconds in data.get('phase_times', {}).items():
+            self.phase_times[phase] += seconds
+        if 'wall_time' in data:
+            self.wall_time = data['wall_time']
+        if 'peak_memory' in data:
+            self.peak_memory = data['peak_memory']
+
+    def summary_lines(self):
+        """Human readable lines for logs."""
+        lines = [f"Nodes generated: {self.nodes_generated}",
+                 f"Duplicates: {self.duplicates}",
+                 f"Peak frontier: {self.peak_frontier}",
+                 f"Peak visited: {self.peak_visited}"]
+        if self.bytes_per_state is not None:
+            lines.append(f"Bytes per state (est.): {self.bytes_per_state}")
+        if self.timed:
+            lines.append("Phase times: " + ", ".join(
+                f"{phase} {t:.3f}s" for phase, t in self.phase_times.items()))
+        if self.peak_memory is not None:
+            lines.append(f"Memory (tracemalloc peak): {self.peak_memory / 1024:.2f} KB")
+        return lines
+
+
+def run_solver(solver, state, stats=None, deep_memory=False, **kwargs):
+    """Call ``solver(state, stats=stats, **kwargs)`` and record its wall time.
+
+    With ``deep_memory`` the call runs under tracemalloc and the traced peak
+    is stored in ``stats.peak_memory``; expect it to be much slower.
+    """
+    if stats is None:
+        stats = SearchStats()
+    if getattr(solver, 'runs_remotely', False):
+        # Timing and tracing happen in the worker process (see solver.worker)
+        return solver(state, stats=stats, deep_memory=deep_memory, **kwargs)
+    if deep_memory:
+        tracemalloc.start()
+    start = clock()
+    try:
+        return solver(state, stats=stats, **kwargs)
+    finally:
+        stats.wall_time = clock() - start
+        if deep_memory:
+            stats.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
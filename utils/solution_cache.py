@@ -0,0 +1,221 @@
+"""
+Content-addressed cache of solver results.
+
+A result ``(cost, nodes_expanded, path)`` is stored under a sha256 of the
+initial state (layout signature plus packed key), the algorithm, the cost
+model, the move mode and any extra solver options, so the same puzzle hits
+the same entry whatever map file or run it came from.
+
+There are two tiers:
+
+- memory: an LRU ``OrderedDict`` holding the most recent entries,
+- disk: a sqlite table under ``cache/``, evicted least-recently-used when it
+  grows past ``max_disk_bytes``.
+
+Paths read from disk are replayed on the initial state before being trusted;
+an entry whose path does not solve the puzzle (or has the wrong cost) is
+dropped.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .moves import path_cost
+from .results import is_incomplete
+from .search_stats import run_solver
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'cache', 'solutions.sqlite3')
+
+
+def cache_key(state, algorithm, cost_model=None, slide_moves=False, options=None):
+    """Canonical sha256 key of one solve request."""
+    text = repr((state.layout.signature, state.key, algorithm, cost_model,
+                 bool(slide_moves), sorted((options or {}).items())))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def verify_result(state, result, cost_model=None):
+    """True if a cached path really solves ``state`` (and has the stored cost)."""
+    cost, _, path = result
+    if cost is None:
+        return not path
+    current = state
+    for move in path:
+        current = current.move_vehicle(*move)
+        if current is None:
+            return False
+    if not current.is_solved():
+        return False
+    return cost_model is None or path_cost(state, path, cost_model) == cost
+
+
+class SolutionCache:
+    """Memory LRU in front of a size-capped sqlite store."""
+
+    def __init__(self, path=CACHE_PATH, memory_entries=256, max_disk_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # The GUI solves and warms up from worker threads
+        self._lock = threading.Lock()
+
+        self._db = None
+        if path is not None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("""CREATE TABLE IF NOT EXISTS solutions (
+                                    key TEXT PRIMARY KEY,
+                                    cost INTEGER,
+                                    nodes INTEGER,
+                                    path TEXT NOT NULL,
+                                    size INTEGER NOT NULL,
+                                    last_used REAL NOT NULL)""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get(self, state, algorithm, cost_model=None, slide_moves=False, options=None):
+        """Cached ``(cost, nodes_expanded, path)`` of a solve request, or None."""
+        key = cache_key(state, algorithm, cost_model, slide_moves, options)
+        with self._lock:
+            result = self.memory.get(key)
+            if result is not None:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return result
+
+            result = self._load(key)
+            if result is not None and not verify_result(state, result, cost_model):
+                self._db.execute("DELETE FROM solutions WHERE key = ?", (key,))
+                self._db.commit()
+                result = None
+            if result is None:
+                self.misses += 1
+                return None
+
+            self._remember(key, result)
+            self.hits += 1
+            return result
+
+    def put(self, state, algorithm, result, cost_model=None, slide_moves=False, options=None):
+        """Store a finished solver result.
+
+        Cancels (None) and searches that gave up (``IncompleteResult``) prove
+        nothing and are ignored.
+        """
+        if result is None or is_incomplete(result):
+            return
+        key = cache_key(state, algorithm, cost_model, slide_moves, options)
+        cost, nodes_expanded, path = result
+        result = (cost, nodes_expanded, [tuple(move) for move in path])
+        with self._lock:
+            self._remember(key, result)
+            if self._db is None:
+                return
+            path_text = json.dumps(result[2], separators=(',', ':'))
+            self._db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?)",
+                             (key, cost, nodes_expanded, path_text,
+                              len(key) + len(path_text) + 16, time.time()))
+            self._evict()
+            self._db.commit()
+
+    def solve(self, solver, state, algorithm=None, cost_model=None, cancel_flag=None,
+              slide_moves=False, stats=None, deep_memory=False, progress=None,
+              on_solution=None, **options):
+        """Return ``(result, cached)``; run ``solver`` only on a cache miss.
+
+        ``cost_model`` is only passed on to solvers when it is given, so
+        solvers without a cost model keep working. ``stats``,
+        ``deep_memory`` (see ``utils.search_stats.run_solver``) and the
+        ``progress`` / ``on_solution`` callbacks only apply to a real run and
+        are not part of the cache key.
+        """
+        if algorithm is None:
+            algorithm = f"{solver.__module__}.{solver.__name__}"
+        result = self.get(state, algorithm, cost_model, slide_moves, options)
+        if result is not None:
+            return result, True
+
+        kwargs = dict(options)
+        if cost_model is not None:
+            kwargs['cost_model'] = cost_model
+        if progress is not None:
+            kwargs['progress'] = progress
+        if on_solution is not None:
+            kwargs['on_solution'] = on_solution
+        if stats is not None or deep_memory:
+            result = run_solver(solver, state, stats, deep_memory, cancel_flag=cancel_flag,
+                                slide_moves=slide_moves, **kwargs)
+        else:
+            result = solver(state, cancel_flag=cancel_flag, slide_moves=slide_moves, **kwargs)
+        if not (cancel_flag and cancel_flag.is_set()):
+            self.put(state, algorithm, result, cost_model, slide_moves, options)
+        return result, False
+
+    def warm_up(self, solvers, states, slide_modes=(False, True), cancel_flag=None):
+        """Pre-solve every state with every solver in a background daemon thread.
+
+        ``solvers`` maps algorithm names to solver functions and ``states``
+        is a list of initial states. Returns the started thread; set
+        ``cancel_flag`` to stop it early.
+        """
+        def run():
+            for state in states:
+                for slide_moves in slide_modes:
+                    for name, solver in solvers.items():
+                        if cancel_flag and cancel_flag.is_set():
+                            return
+                        try:
+                            self.solve(solver, state, name, cancel_flag=cancel_flag,
+                                       slide_moves=slide_moves)
+                        except Exception as e:
+                            print(f"Warm-up of {name} failed: {e}")
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def _remember(self, key, result):
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _load(self, key):
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT cost, nodes, path FROM solutions WHERE key = ?",
+                               (key,)).fetchone()
+        if row is None:
+            return None
+        self._db.execute("UPDATE solutions SET last_used = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+        cost, nodes_expanded, path_text = row
+        return cost, nodes_expanded, [tuple(move) for move in json.loads(path_text)]
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM solutions").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        for key, size in self._db.execute(
+                "SELECT key, size FROM solutions ORDER BY last_used").fetchall():
+            self._db.execute("DELETE FROM solutions WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_disk_bytes:
+                break
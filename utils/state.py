@@ -1,65 +1,98 @@
-from .vehicle import Vehicle
+from .layout import get_layout
+from .moves import generate
 
 class State:
-    def __init__(self, vehicles):
-        self.vehicles = vehicles
-        self.target_vehicle_id = None
-        
-        self.board = []
-        for i in range(6):
-            row = []
-            for j in range(6):
-                row.append(None)
-            self.board.append(row)
-        
-        for vehicle in vehicles:
-            if vehicle.is_target:
-                self.target_vehicle_id = vehicle.id
-            
-            positions = vehicle.get_occupied_possitions()
-            for row, col in positions:
-                self.board[row][col] = vehicle.id
-    
+    # A state is only a shared layout plus a packed position key; the vehicle
+    # list and the 6x6 board are built lazily for code that still needs them.
+    __slots__ = ('layout', 'key', 'occupancy', '_vehicles', '_board')
+
+    def __init__(self, vehicles, layout=None):
+        self.layout = layout if layout is not None else get_layout(vehicles)
+        positions = self.layout.positions_of(vehicles)
+        self.key = self.layout.pack(positions)
+        self.occupancy = self.layout.engine.occupancy(positions)
+        self._vehicles = vehicles
+        self._board = None
+
+    @classmethod
+    def from_key(cls, layout, key, occupancy=None):
+        """Build a state directly from a packed key without any Vehicle objects."""
+        state = cls.__new__(cls)
+        state.layout = layout
+        state.key = key
+        if occupancy is None:
+            occupancy = layout.engine.occupancy(layout.unpack(key))
+        state.occupancy = occupancy
+        state._vehicles = None
+        state._board = None
+        return state
+
+    @property
+    def engine(self):
+        return self.layout.engine
+
+    @property
+    def positions(self):
+        return self.layout.unpack(self.key)
+
+    @property
+    def vehicles(self):
+        if self._vehicles is None:
+            layout = self.layout
+            self._vehicles = [layout.make_vehicle(index, pos)
+                              for index, pos in enumerate(layout.unpack(self.key))]
+        return self._vehicles
+
+    @property
+    def target_vehicle_id(self):
+        target_index = self.layout.target_index
+        return None if target_index is None else self.layout.ids[target_index]
+
+    @property
+    def board(self):
+        if self._board is None:
+            size = self.layout.board
+            board = []
+            for i in range(size.rows):
+                row = []
+                for j in range(size.cols):
+                    row.append(None)
+                board.append(row)
+
+            for vehicle in self.vehicles:
+                positions = vehicle.get_occupied_possitions()
+                for row, col in positions:
+                    board[row][col] = vehicle.id
+            self._board = board
+        return self._board
+
     def get_vehicle_by_id(self, id):
-        for vehicle in self.vehicles:
-            if vehicle.id == id:
-                return vehicle 
-        return None
+        index = self.layout.index_by_id.get(id)
+        if index is None:
+            return None
+        return self.vehicles[index]
 
     def display(self):
         print("=== Rush Hour Board ===")
-        for i in range(6):
+        size = self.layout.board
+        for i in range(size.rows):
             print(f"{i} ", end="")
-            for j in range(6):
+            for j in range(size.cols):
                 if self.board[i][j] is None:
                     print(". ", end="")
                 else:
                     print(f"{self.board[i][j]} ", end="")
             print()  # New line after each row
         print()
-        print(f"Target vehicle: {self.target_vehicle_id}")
-    
+        print(f"Target vehicle: {self.target_vehicle_id} (exit: {size.exit_side} {size.exit_line})")
+
     def copy(self):
-        copied_vehicles = []
-        for vehicle in self.vehicles:
-            copied_vehicle = Vehicle(vehicle.id, vehicle.row, vehicle.col, 
-                                   vehicle.length, vehicle.orientation, vehicle.is_target)
-            copied_vehicles.append(copied_vehicle)
-        
-        return State(copied_vehicles)
-    
+        # States are immutable, a copy only needs its own lazy caches
+        return State.from_key(self.layout, self.key, self.occupancy)
+
     def is_solved(self):
         """Check if the puzzle is solved (target vehicle reached exit)."""
-        if not self.target_vehicle_id:
-            return False
-        
-        target_vehicle = self.get_vehicle_by_id(self.target_vehicle_id)
-        if not target_vehicle:
-            return False
-        
-        if target_vehicle.orientation == 'H' and target_vehicle.col + target_vehicle.length >= 6 and target_vehicle.row == 2:
-            return True
-        return False
+        return self.layout.is_goal(self.key)
 
     def to_string(self):
         vehicle_positions = []
@@ -67,80 +100,59 @@ class State:
             vehicle_positions.append(f"{vehicle.id}:{vehicle.row},{vehicle.col}")
         return "|".join(sorted(vehicle_positions))
 
-    def get_all_possible_moves(self):
+    def get_all_possible_moves(self, slide_moves=False):
+        layout = self.layout
         possible_moves = []
-        
-        for vehicle in self.vehicles:
-            valid_directions = vehicle.get_possible_moves()
-            
-            for direction in valid_directions:
-                # Check if move is valid (no collision with other vehicles)
-                if self.is_move_valid(vehicle.id, direction):
-                    possible_moves.append((vehicle.id, direction))
+        for index, delta in self.get_moves(slide_moves):
+            possible_moves.append(layout.encode_move(index, delta, slide_moves))
         return possible_moves
 
-    def is_move_valid(self, vehicle_id, direction):
-        vehicle = self.get_vehicle_by_id(vehicle_id)
-        if not vehicle:
-            return False
-        
-        # Get the moved vehicle's new positions
-        moved_vehicle = vehicle.move(direction)
-        new_positions = moved_vehicle.get_occupied_possitions()
-        
-        # Check collision with other vehicles
-        for other_vehicle in self.vehicles:
-            if other_vehicle.id != vehicle_id:
-                other_positions = other_vehicle.get_occupied_possitions()
-                
-                # Check for overlap
-                for pos in new_positions:
-                    if pos in other_positions:
-                        return False  # Collision detected
-        
-        return True
-
-    def move_vehicle(self, vehicle_id, direction):
-        vehicle = self.get_vehicle_by_id(vehicle_id)
-        if not vehicle or not self.is_move_valid(vehicle_id, direction):
+    def get_moves(self, slide_moves=False):
+        """Legal moves as (vehicle index, delta); slides cover every free distance."""
+        return generate(self, slide_moves)
+
+    def is_move_valid(self, vehicle_id, direction, distance=1):
+        return self.move_vehicle(vehicle_id, direction, distance) is not None
+
+    def move_vehicle(self, vehicle_id, direction, distance=1):
+        layout = self.layout
+        index = layout.index_by_id.get(vehicle_id)
+        if index is None:
+            return None
+
+        delta = layout.delta_of(index, direction)
+        if delta is None or distance < 1:
             return None
-        
-        # Create new vehicles list with moved vehicle
-        new_vehicles = []
-        for v in self.vehicles:
-            if v.id == vehicle_id:
-                new_vehicles.append(v.move(direction))
-            else:
-                new_vehicles.append(v)
-        
-        return State(new_vehicles)
-    
+
+        return self.apply_move(index, delta * distance)
+
+    def apply_move(self, index, delta):
+        """Return the successor after moving vehicle ``index`` by ``delta`` cells, or None."""
+        layout = self.layout
+        engine = layout.engine
+        shift = layout.shift(index)
+        pos = (self.key >> shift) & ((1 << layout.bits) - 1)
+        new_pos = pos + delta
+        if new_pos < 0 or new_pos > engine.max_positions[index]:
+            return None
+
+        # Every cell swept on the way must be free, not only the final ones
+        masks = engine.masks[index]
+        vacated = self.occupancy & ~masks[pos]
+        step = 1 if delta > 0 else -1
+        for p in range(pos + step, new_pos + step, step):
+            if vacated & masks[p]:
+                return None
+
+        return State.from_key(layout, self.key + (delta << shift), vacated | masks[new_pos])
+
     def __hash__(self):
         """Make State objects hashable for use in sets and as dict keys."""
-        #return hash(self.to_string())
-        vehicle_data = []
-        for vehicle in self.vehicles: 
-            v_data = (vehicle.id, vehicle.row, vehicle.col, vehicle.length, vehicle.orientation)
-            vehicle_data.append(v_data)
-        return hash(tuple(sorted(vehicle_data)))
-    
+        return hash(self.key)
+
     def __eq__(self, other):
         """Define equality for State objects."""
         if not isinstance(other, State):
             return False
-        
-        #return self.to_string() == other.to_string()
-        self_data = []
-        other_data = []
-        
-        for vehicle in self.vehicles: 
-            v_data = (vehicle.id, vehicle.row, vehicle.col, vehicle.length, vehicle.orientation)
-            self_data.append(v_data)
-            
-        for vehicle in other.vehicles: 
-            v_data = (vehicle.id, vehicle.row, vehicle.col, vehicle.length, vehicle.orientation)
-            other_data.append(v_data)
-            
-        return sorted(self_data) == sorted(other_data)
-    
-        
\ No newline at end of file
+
+        return self.key == other.key and self.layout is other.layout
@@ -0,0 +1,45 @@
+"""
+Precomputed playback of a solution path.
+
+``PlaybackTimeline`` replays a path once, keeping the packed key of every
+step and the internal move leading to it. Seeking to any step is then a
+list lookup plus ``State.from_key`` instead of replaying the path from the
+start, so stepping back and forth through an N-move solution costs O(N)
+in total instead of O(N²).
+"""
+
+from .state import State
+
+
+class PlaybackTimeline:
+    """Packed keys of every step of a solution, for O(1) seeking."""
+
+    __slots__ = ('layout', 'keys', 'moves')
+
+    def __init__(self, initial_state, path):
+        layout = initial_state.layout
+        self.layout = layout
+        key = initial_state.key
+        self.keys = [key]    # keys[i]: state after i moves
+        self.moves = []      # moves[i]: (index, delta) going from step i to i + 1
+        for move in path:
+            decoded = layout.decode_move(move)
+            if decoded is None:
+                raise ValueError(f"Invalid move in solution path: {move}")
+            index, delta = decoded
+            key += delta << layout.shift(index)
+            self.keys.append(key)
+            self.moves.append(decoded)
+
+    def __len__(self):
+        """Number of moves (the last step)."""
+        return len(self.moves)
+
+    def state_at(self, step):
+        """State after ``step`` moves (clamped to the timeline)."""
+        step = max(0, min(step, len(self.moves)))
+        return State.from_key(self.layout, self.keys[step])
+
+    def position(self, step, index):
+        """Position of vehicle ``index`` after ``step`` moves."""
+        return self.layout.unpack(self.keys[step])[index]
@@ -1,50 +1,32 @@
 import os
-from .vehicle import Vehicle
+from .loader import iter_puzzles
 
 def import_map(map_id):
     # Get the project root directory
     current_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(current_dir)
-    file_name = os.path.join(project_root, "map", f"map{map_id}.txt")
-    
+    # A number loads map/mapN.txt, a name such as "test_simple" loads map/test_simple.txt
+    name = f"map{map_id}" if str(map_id).isdigit() else str(map_id)
+    file_name = os.path.join(project_root, "map", f"{name}.txt")
+    return load_map_file(file_name)
+
+def load_map_file(file_name):
+    # Read the vehicles of the first puzzle of a map file, in any format of utils.loader:
+    #   ("X", 2, 0, 2, "H", 1)        one vehicle per line (mapN.txt)
+    #   A: [(2, 1), (2, 2)]           one vehicle per line as its cells (test_*.txt)
+    #   AA...B....B...                one whole board per line
+    # Optional directive lines before the vehicles change the board:
+    #   size 8 8          (rows, columns; default 6 6)
+    #   exit bottom 3     (right/left + row, or top/bottom + column; default: right, middle row)
+    def warn(line_number, message):
+        print(f"Warning: {file_name}:{line_number}: {message}")
+
     try:
-        with open(file_name, "r") as f:
-            lines = f.readlines()
+        record = next(iter_puzzles(file_name, on_error=warn), None)
     except FileNotFoundError:
         print(f"Error: Map file {file_name} not found!")
         return None
     
-    vehicles = []
-
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        
-        try:
-            # Remove parentheses and split by comma
-            line = line.strip('()')
-            parts = [part.strip().strip('"') for part in line.split(',')]
-            
-            if len(parts) != 6:
-                print(f"Warning: Invalid line format: {line}")
-                continue
-            
-            # Extract data
-            vehicle_id = parts[0].strip('"')
-            row = int(parts[1])
-            col = int(parts[2])
-            length = int(parts[3])
-            orientation = parts[4].strip('"')
-            is_target = bool(int(parts[5]))
-            
-            # Create Vehicle object
-            vehicle = Vehicle(vehicle_id, row, col, length, orientation, is_target)
-            vehicles.append(vehicle)
-            
-        except (ValueError, IndexError) as e:
-            print(f"Error parsing line '{line}': {e}")
-            continue
-    
-    return vehicles
-
+    if record is None:
+        return []
+    return record.vehicles()
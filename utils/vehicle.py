@@ -1,18 +1,23 @@
+from .board import STANDARD_BOARD
+
 class Vehicle:
-    def __init__(self, id, row, col, length, orientation, is_target):
+    def __init__(self, id, row, col, length, orientation, is_target, board=None):
         self.id = id
         self.row = row
         self.col = col
         self.length = length 
         self.orientation = orientation
         self.is_target = is_target
+        # Board the vehicle is on (size and exit); the classic 6x6 board by default
+        self.board = board if board is not None else STANDARD_BOARD
+        rows, cols = self.board.rows, self.board.cols
         
         # Validate input parameters
         if row < 0 or col < 0:
             raise ValueError(f"Position cannot be negative: row={row}, col={col}")
         
-        if row >= 6 or col >= 6:
-            raise ValueError(f"Position out of bounds: row={row}, col={col}. Board is 6x6 (0-5)")
+        if row >= rows or col >= cols:
+            raise ValueError(f"Position out of bounds: row={row}, col={col}. Board is {rows}x{cols}")
         
         if length < 2:
             raise ValueError(f"Vehicle length must be at least 2, got {length}")
@@ -21,14 +26,14 @@ class Vehicle:
             raise ValueError(f"Orientation must be 'H' or 'V', got '{orientation}'")
         
         # Check if vehicle fits on the board
-        if orientation.upper() == 'H' and col + length > 6:
+        if orientation.upper() == 'H' and col + length > cols:
             raise ValueError(f"Horizontal vehicle extends beyond board: col={col}, length={length}")
-        elif orientation.upper() == 'V' and row + length > 6:
+        elif orientation.upper() == 'V' and row + length > rows:
             raise ValueError(f"Vertical vehicle extends beyond board: row={row}, length={length}")
 
     def copy(self):
         """Create a copy of this vehicle"""
-        return Vehicle(self.id, self.row, self.col, self.length, self.orientation, self.is_target)
+        return Vehicle(self.id, self.row, self.col, self.length, self.orientation, self.is_target, self.board)
 
     def get_occupied_possitions(self):
         positions_list = []
@@ -50,23 +55,23 @@ class Vehicle:
         if direction == 'LEFT':
             return self.col > 0
         elif direction == 'RIGHT':
-            return self.col + self.length < 6
+            return self.col + self.length < self.board.cols
         elif direction == 'UP':
             return self.row > 0
         elif direction == 'DOWN':
-            return self.row + self.length < 6
+            return self.row + self.length < self.board.rows
         
         return False
 
     def move(self, direction):
         if direction == 'LEFT':
-            return Vehicle(self.id, self.row, self.col - 1, self.length, self.orientation, self.is_target)
+            return Vehicle(self.id, self.row, self.col - 1, self.length, self.orientation, self.is_target, self.board)
         elif direction == 'RIGHT':
-            return Vehicle(self.id, self.row, self.col + 1, self.length, self.orientation, self.is_target)
+            return Vehicle(self.id, self.row, self.col + 1, self.length, self.orientation, self.is_target, self.board)
         elif direction == 'UP':
-            return Vehicle(self.id, self.row - 1, self.col, self.length, self.orientation, self.is_target)
+            return Vehicle(self.id, self.row - 1, self.col, self.length, self.orientation, self.is_target, self.board)
         else:  # direction == 'DOWN'
-            return Vehicle(self.id, self.row + 1, self.col, self.length, self.orientation, self.is_target)
+            return Vehicle(self.id, self.row + 1, self.col, self.length, self.orientation, self.is_target, self.board)
 
         
     def get_possible_moves(self):